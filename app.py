@@ -1,23 +1,26 @@
 import streamlit as st
 import google.generativeai as genai
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel
-from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
-from operator import itemgetter
-from PIL import Image 
-from langchain_core.messages import HumanMessage 
-import base64
 import json
-import io
-from gtts import gTTS 
-import random # Added for random lawyer selection
 
 # --- IMPORT DOCUMENT GENERATOR ---
 from document_generator import show_document_generator 
+from coalesce import SingleFlight
+
+# --- IMPORT APP FLOWS (Streamlit-free, shared with load_test.py) ---
+from rag_pipeline import DB_FAISS_PATH, NO_DOCUMENT, load_embeddings, load_retriever, build_rag_chain, answer_question
+from explain_pipeline import UNREADABLE_TEXT, explain_document
+from voice_pipeline import ASR_BACKEND, answer_voice_question, answer_voice_turn
+from lawyer_match import FALLBACK_BRIEF, analyze_case, brief_document_text, find_lawyers
+from case_classifier import CaseClassifier
+from case_brief import RunningCaseBrief
+from tts import synthesize, get_tts_cache, audio_format
+from conversation_memory import ConversationMemory
+from session_index import SessionDocumentIndex
+from image_preprocess import preprocess_image
+from audio_preprocess import preprocess_audio
+from explain_cache import ExplainCache, file_hash
 
 # --- CONFIGURATION & PAGE SETUP ---
 st.set_page_config(
@@ -83,134 +86,79 @@ except Exception as e:
     st.error(f"Error configuring: {e}. Please check your API key in Streamlit Secrets.")
     st.stop()
 
-DB_FAISS_PATH = "vectorstores/db_faiss"
 MODEL_NAME = "gemini-2.5-flash" 
 
-# --- MOCK LAWYER DATABASE (For Tab 5) ---
-LAWYER_DIRECTORY = [
-    {"name": "Adv. Priya Sharma", "location": "Delhi/NCR", "specialization": "Family Law", "experience": "12 Years", "languages": "Hindi, English", "phone": "+91-98765XXXXX"},
-    {"name": "Adv. Rajesh Kumar", "location": "Mumbai", "specialization": "Property Dispute", "experience": "15 Years", "languages": "Marathi, Hindi, English", "phone": "+91-91234XXXXX"},
-    {"name": "Adv. Sneha Reddy", "location": "Bangalore", "specialization": "Corporate Law", "experience": "8 Years", "languages": "Kannada, Telugu, English", "phone": "+91-99887XXXXX"},
-    {"name": "Adv. Amit Verma", "location": "Lucknow", "specialization": "Criminal Law", "experience": "20 Years", "languages": "Hindi, Urdu", "phone": "+91-98712XXXXX"},
-    {"name": "Adv. Kavita Iyer", "location": "Chennai", "specialization": "Consumer Rights", "experience": "10 Years", "languages": "Tamil, English", "phone": "+91-94455XXXXX"},
-    {"name": "Adv. Vikram Singh", "location": "Chandigarh", "specialization": "Cyber Crime", "experience": "7 Years", "languages": "Punjabi, Hindi, English", "phone": "+91-98140XXXXX"}
-]
-
-
-# --- RAG PROMPT TEMPLATE ---
-rag_prompt_template = """
-You are 'Nyay-Saathi,' a kind legal friend.
-A common Indian citizen is asking for help.
-You have two sources of information. Prioritize the MOST relevant one.
-1. CONTEXT_FROM_GUIDES: (General guides from a database)
-{context}
-
-2. DOCUMENT_CONTEXT: (Specific text from a document the user uploaded)
-{document_context}
-
-Answer the user's 'new question' based on the most relevant context.
-If the 'new question' is a follow-up, use the 'chat history' to understand it.
-Do not use any legal jargon.
-Give a simple, step-by-step action plan in the following language: {language}.
-If no context is relevant, just say "I'm sorry, I don't have enough information on that. Please contact NALSA."
-
-CHAT HISTORY:
-{chat_history}
-
-NEW QUESTION:
-{question}
-
-Your Simple, Step-by-Step Action Plan (in {language}):
-"""
-
 # --- LOAD THE MODEL & VECTOR STORE ---
 @st.cache_resource
 def get_models_and_db():
     try:
-        embeddings = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2',
-                                           model_kwargs={'device': 'cpu'})
-        db = FAISS.load_local(DB_FAISS_PATH, embeddings, allow_dangerous_deserialization=True)
+        embeddings = load_embeddings()
+        retriever = load_retriever(embeddings, db_path=DB_FAISS_PATH)
         llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.5)
-        
-        retriever = db.as_retriever(
-            search_type="similarity_score_threshold",
-            search_kwargs={
-                "k": 3,
-                "score_threshold": 0.3 
-            }
-        )
-        
-        return retriever, llm
+        return retriever, llm, embeddings
     except Exception as e:
         st.error(f"Error loading models or vector store: {e}")
         st.error("Did you run 'ingest.py' and push the 'vectorstores' folder to GitHub?")
         st.stop()
 
-retriever, llm = get_models_and_db()
+retriever, llm, embeddings = get_models_and_db()
 
 @st.cache_resource
 def get_genai_model():
     return genai.GenerativeModel(MODEL_NAME)
 
+@st.cache_resource
+def get_explain_cache():
+    return ExplainCache()
+
+@st.cache_resource
+def get_case_classifier():
+    return CaseClassifier(embeddings)
+
+# Shared across all sessions in this process so identical in-flight requests collapse.
+@st.cache_resource
+def get_singleflight():
+    return SingleFlight()
+
 # --- HELPER FUNCTION: Text to Speech ---
-def text_to_speech(text, language):
-    """Converts text to audio bytes using gTTS."""
+def text_to_speech(text, language, on_first_segment=None, on_rest=None):
+    """Converts text to audio bytes using the configured TTS backend."""
     try:
-        lang_code_map = {
-            "Simple English": "en",
-            "Hindi (in Roman script)": "hi", 
-            "Kannada": "kn",
-            "Tamil": "ta",
-            "Telugu": "te",
-            "Marathi": "mr"
-        }
-        lang_code = lang_code_map.get(language, "en")
-        
-        tts = gTTS(text=text, lang=lang_code, slow=False)
-        fp = io.BytesIO()
-        tts.write_to_fp(fp)
-        return fp
+        return synthesize(text, language, on_first_segment, on_rest)
     except Exception as e:
         st.error(f"Error generating audio: {e}")
         return None
 
-def format_docs(docs):
-    return "\n\n".join(doc.page_content for doc in docs)
+
+def play_speech(text, language):
+    """Audio player(s) for `text`. The first sentence can play while the rest is synthesized;
+    the rest then gets a second player, so the one already playing is never replaced."""
+    first_slot, rest_slot = st.empty(), st.empty()
+    started = []
+
+    def play_first(first):
+        started.append(True)
+        first_slot.audio(first, format=audio_format())
+
+    audio_bytes = text_to_speech(text, language, on_first_segment=play_first,
+                                 on_rest=lambda rest: rest_slot.audio(rest, format=audio_format()))
+    if audio_bytes and not started:
+        first_slot.audio(audio_bytes, format=audio_format())
 
 # --- THE RAG CHAIN ---
-rag_prompt = PromptTemplate.from_template(rag_prompt_template)
-
-rag_chain_with_sources = RunnableParallel(
-    {
-        "context": itemgetter("question") | retriever,
-        "question": itemgetter("question"),
-        "language": itemgetter("language"),
-        "chat_history": itemgetter("chat_history"),
-        "document_context": itemgetter("document_context")
-    }
-) | {
-    "answer": (
-        {
-            "context": (lambda x: format_docs(x["context"])),
-            "question": itemgetter("question"),
-            "language": itemgetter("language"),
-            "chat_history": itemgetter("chat_history"),
-            "document_context": itemgetter("document_context")
-        }
-        | rag_prompt
-        | llm
-        | StrOutputParser()
-    ),
-    "sources": itemgetter("context")
-}
+rag_chain_with_sources = build_rag_chain(retriever, llm)
 
 # --- SESSION STATE INITIALIZATION ---
 if "app_started" not in st.session_state:
     st.session_state.app_started = False
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "conversation_memory" not in st.session_state:
+    st.session_state.conversation_memory = ConversationMemory()
 if "document_context" not in st.session_state:
-    st.session_state.document_context = "No document uploaded."
+    st.session_state.document_context = NO_DOCUMENT
+if "document_index" not in st.session_state:
+    st.session_state.document_index = None
 if "uploaded_file_bytes" not in st.session_state:
     st.session_state.uploaded_file_bytes = None
 if "uploaded_file_type" not in st.session_state:
@@ -222,18 +170,31 @@ if "file_uploader_key" not in st.session_state:
 # Initialize AI Brief
 if "case_brief" not in st.session_state:
     st.session_state.case_brief = None
+# Kept up to date in the background after each chat turn / explanation (Tab 5 reads it)
+if "running_brief" not in st.session_state:
+    st.session_state.running_brief = RunningCaseBrief()
 if "recommended_lawyer_type" not in st.session_state:
     st.session_state.recommended_lawyer_type = "General"
 
 
+def reset_document_index():
+    """Frees the per-session document index (embeddings of the uploaded document)."""
+    if st.session_state.document_index is not None:
+        st.session_state.document_index.close()
+    st.session_state.document_index = None
+
+
 # --- "START NEW SESSION" BUTTON ---
 def clear_session():
     st.session_state.messages = []
-    st.session_state.document_context = "No document uploaded."
+    st.session_state.conversation_memory = ConversationMemory()
+    st.session_state.document_context = NO_DOCUMENT
+    reset_document_index()
     st.session_state.uploaded_file_bytes = None
     st.session_state.uploaded_file_type = None
     st.session_state.samjhao_explanation = None
     st.session_state.case_brief = None # Clear brief
+    st.session_state.running_brief = RunningCaseBrief()
     st.session_state.file_uploader_key += 1 
 
 
@@ -269,6 +230,26 @@ else:
 
     st.divider()
 
+    # --- PERFORMANCE COUNTERS (SIDEBAR) ---
+    with st.sidebar.expander("⚙️ Performance"):
+        sf_stats = get_singleflight().stats()
+        st.caption("Request coalescing (identical in-flight calls)")
+        st.write(f"Calls: {sf_stats['calls']} | Upstream: {sf_stats['executed']} | Collapsed: {sf_stats['collapsed']}")
+        explain_stats = get_explain_cache().stats()
+        st.caption("Explain cache (extracted text + explanations)")
+        st.write(f"Hit rate: {explain_stats['hit_rate']:.0%} | Size: {explain_stats['bytes'] / 1024:.0f} KB")
+        tts_stats = get_tts_cache().stats()
+        st.caption("Audio (TTS) cache")
+        st.write(f"Hit rate: {tts_stats['hit_rate']:.0%} | Memory hits: {tts_stats['memory_hits']} | "
+                 f"Disk hits: {tts_stats['disk_hits']} | Synthesized: {tts_stats['misses']}")
+        last_tokens = next((m.get("prompt_tokens") for m in reversed(st.session_state.messages)
+                            if m.get("prompt_tokens")), None)
+        if last_tokens:
+            st.caption("Last 'What to do' prompt (estimated tokens)")
+            st.write(f"Total: {last_tokens['total']} / {last_tokens['budget']} | Guides: {last_tokens['guides']} | "
+                     f"Document: {last_tokens['document']} (of {last_tokens['document_raw']}) | "
+                     f"History: {last_tokens['chat_history']}")
+
     # --- THE TAB-BASED LAYOUT ---
     # Updated tabs list
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -296,15 +277,21 @@ else:
                 st.session_state.uploaded_file_bytes = new_file_bytes
                 st.session_state.uploaded_file_type = uploaded_file.type
                 st.session_state.samjhao_explanation = None 
-                st.session_state.document_context = "No document uploaded." 
+                st.session_state.document_context = NO_DOCUMENT 
+                reset_document_index()
+                # The brief describes the previous document; start over for the new one.
+                st.session_state.running_brief = RunningCaseBrief()
         
         if st.session_state.uploaded_file_bytes is not None:
             file_bytes = st.session_state.uploaded_file_bytes
             file_type = st.session_state.uploaded_file_type
             
             if "image" in file_type:
-                image = Image.open(io.BytesIO(file_bytes)) 
-                st.image(image, caption="Your Uploaded Document", use_column_width=True)
+                # Rotated, cropped, grayscale and downscaled once per upload (cached by content hash)
+                processed = preprocess_image(file_bytes)
+                if processed["mime_type"]:
+                    file_bytes, file_type = processed["bytes"], processed["mime_type"]
+                st.image(processed["thumbnail"] or file_bytes, caption="Your Uploaded Document", use_column_width=True)
             elif "pdf" in file_type:
                 st.info("PDF file uploaded. Click 'Ask!' to explain.")
             
@@ -318,31 +305,41 @@ else:
                     try:
                         model = get_genai_model()
 
-                        prompt_text_multi = f"""
-                        You are an AI assistant. The user has uploaded a document (MIME type: {file_type}).
-                        Perform two tasks:
-                        1. Extract all raw text from the document.
-                        2. Explain the document in simple, everyday {language}.
-
-                        Respond with ONLY a JSON object in this format:
-                        {{
-                          "raw_text": "The raw extracted text...",
-                          "explanation": "Your simple {language} explanation..."
-                        }}
-                        """
-
-                        data_part = {'mime_type': file_type, 'data': file_bytes}
-                        response = model.generate_content([prompt_text_multi, data_part])
-                        clean_response_text = response.text.strip().replace("```json", "").replace("```", "")
-
                         try:
-                            response_json = json.loads(clean_response_text)
-                            st.session_state.samjhao_explanation = response_json.get("explanation", "Unable to extract explanation.")
-                            st.session_state.document_context = response_json.get("raw_text", "Unable to extract text.")
+                            page_progress = st.progress(0.0) if "pdf" in file_type else None
+
+                            def report_pages(done, total):
+                                page_progress.progress(done / max(total, 1), text=f"Read {done} of {total} pages")
+
+                            streamed_explanation = st.empty()
+
+                            def show_partial(text):
+                                streamed_explanation.markdown(text + " ▌")
+
+                            explanation, raw_text = explain_document(
+                                model, file_bytes, file_type, language, singleflight=get_singleflight(),
+                                progress=report_pages if page_progress else None, cache=get_explain_cache(),
+                                on_update=show_partial
+                            )
+                            streamed_explanation.empty()
+                            st.session_state.samjhao_explanation = explanation
+                            reset_document_index()
+                            if raw_text == UNREADABLE_TEXT:
+                                # Cut off before the text arrived: explain only, no document context.
+                                st.session_state.document_context = NO_DOCUMENT
+                            else:
+                                st.session_state.document_context = raw_text
+                                st.session_state.document_index = SessionDocumentIndex.build(raw_text, embeddings)
+                                st.session_state.running_brief.add_document(
+                                    brief_document_text(raw_text, st.session_state.document_index),
+                                    model, get_case_classifier(),
+                                    digest=file_hash(st.session_state.uploaded_file_bytes)
+                                )
                         except json.JSONDecodeError:
                             st.error("The AI response was not in the expected format. Please try again.")
                             st.session_state.samjhao_explanation = None
-                            st.session_state.document_context = "No document uploaded."
+                            st.session_state.document_context = NO_DOCUMENT
+                            reset_document_index()
 
                     except Exception as e:
                         st.error(f"An error occurred: {e}")
@@ -354,11 +351,10 @@ else:
             
             st.markdown("---")
             st.write("🔊 **Listen to this explanation:**")
-            audio_bytes = text_to_speech(st.session_state.samjhao_explanation, language)
-            if audio_bytes:
-                st.audio(audio_bytes, format="audio/mp3")
+            # The first sentence starts playing while the rest is synthesized.
+            play_speech(st.session_state.samjhao_explanation, language)
         
-        if st.session_state.document_context != "No document uploaded." and st.session_state.samjhao_explanation:
+        if st.session_state.document_context != NO_DOCUMENT and st.session_state.samjhao_explanation:
             st.success("Context Saved! You can now ask questions about this document in the 'What to do' tab.")
 
 
@@ -372,15 +368,25 @@ else:
         with col2:
             if st.button("Clear Chat ♻️"):
                 st.session_state.messages = []
+                st.session_state.conversation_memory = ConversationMemory()
+                st.session_state.running_brief = RunningCaseBrief()
+                if st.session_state.document_context != NO_DOCUMENT:
+                    st.session_state.running_brief.add_document(
+                        brief_document_text(st.session_state.document_context, st.session_state.document_index),
+                        get_genai_model(), get_case_classifier(),
+                        digest=file_hash(st.session_state.uploaded_file_bytes)
+                    )
                 st.rerun()
 
-        if st.session_state.document_context != "No document uploaded.":
+        if st.session_state.document_context != NO_DOCUMENT:
             with st.container():
                 st.info(f"**Context Loaded:** I have your uploaded document in memory. Feel free to ask questions about it!")
 
         for i, message in enumerate(st.session_state.messages):
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+                if message.get("answer_mode") == "extractive":
+                    st.caption("⚡ Quick answer built from the guides (the AI was busy or slow).")
                 
                 guides_sources = message.get("sources_from_guides")
                 doc_context_used = message.get("source_from_document")
@@ -411,45 +417,26 @@ else:
 
             with st.spinner("Your friend is checking the guides..."):
                 try:
-                    chat_history_str = "\n".join([f"{m['role']}: {m['content']}" for m in st.session_state.messages[-5:-1]])
-                    current_doc_context = st.session_state.document_context
-
-                    invoke_payload = {
-                        "question": prompt,
-                        "language": language,
-                        "chat_history": chat_history_str,
-                        "document_context": current_doc_context
-                    }
-
-                    response_dict = rag_chain_with_sources.invoke(invoke_payload)
-                    response = response_dict["answer"]
-                    docs = response_dict["sources"]
-
-                    used_document = False
-                    if not docs and current_doc_context != "No document uploaded.":
-                        audit_model = get_genai_model()
-                        audit_prompt = f"""
-                        You are an auditor.
-                        Question: "{prompt}"
-                        Answer: "{response}"
-                        Context: "{current_doc_context[:2000]}" 
-                        
-                        Did the "Answer" come primarily from the "Context"?
-                        Respond with ONLY the word 'YES' or 'NO'.
-                        """
-                        try:
-                            audit_response = audit_model.generate_content(audit_prompt)
-                            if "YES" in audit_response.text.upper():
-                                used_document = True
-                        except:
-                            pass 
-
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": response,
-                        "sources_from_guides": docs,
-                        "source_from_document": used_document
-                    })
+                    assistant_message = answer_question(
+                        rag_chain_with_sources,
+                        get_genai_model(),
+                        prompt,
+                        language,
+                        st.session_state.messages,
+                        st.session_state.document_context,
+                        singleflight=get_singleflight(),
+                        retriever=retriever,
+                        memory=st.session_state.conversation_memory,
+                        document_index=st.session_state.document_index
+                    )
+                    st.session_state.messages.append(assistant_message)
+                    # Folds older turns into the running summary off the render path.
+                    st.session_state.conversation_memory.add_turn(
+                        prompt, assistant_message["content"], get_genai_model()
+                    )
+                    st.session_state.running_brief.add_turn(
+                        prompt, assistant_message["content"], get_genai_model(), get_case_classifier()
+                    )
 
                     st.rerun()
 
@@ -475,19 +462,37 @@ else:
                 with st.spinner("Listening and thinking..."):
                     try:
                         model = get_genai_model()
-                        audio_bytes = audio_value.getvalue()
-                        prompt_text = f"Listen to this user audio. You are 'Nyay-Saathi', a helpful Indian legal assistant. Answer the user's question in simple {language}. Keep the answer short, helpful, and friendly."
-                        
-                        response = model.generate_content([prompt_text, {"mime_type": "audio/wav", "data": audio_bytes}])
-                        response_text = response.text
+                        if ASR_BACKEND == "whisper":
+                            # Transcribed locally, then answered like a typed question (guides + history).
+                            transcript, assistant_message = answer_voice_turn(
+                                rag_chain_with_sources, model, audio_value.getvalue(), language,
+                                st.session_state.messages, st.session_state.document_context,
+                                singleflight=get_singleflight(),
+                                retriever=retriever,
+                                memory=st.session_state.conversation_memory,
+                                document_index=st.session_state.document_index
+                            )
+                            st.session_state.messages.append(assistant_message)
+                            st.session_state.conversation_memory.add_turn(
+                                transcript, assistant_message["content"], model
+                            )
+                            st.session_state.running_brief.add_turn(
+                                transcript, assistant_message["content"], model, get_case_classifier()
+                            )
+                            response_text = assistant_message["content"]
+                            st.caption(f"You asked: {transcript}")
+                        else:
+                            clip = preprocess_audio(audio_value.getvalue())
+                            response_text = answer_voice_question(model, clip["bytes"], language, clip["mime_type"])
+                            if clip["seconds"] is not None:
+                                st.caption(f"Sent {clip['seconds']:.1f}s of speech "
+                                           f"({len(clip['bytes']) // 1024} KB, was {clip['original_bytes'] // 1024} KB).")
                         
                         st.success("Nyay-Saathi says:")
                         st.markdown(response_text)
                         
                         st.write("🔊 **Listen to the answer:**")
-                        tts_audio = text_to_speech(response_text, language)
-                        if tts_audio:
-                            st.audio(tts_audio, format="audio/mp3")
+                        play_speech(response_text, language)
                     except Exception as e:
                         st.error(f"Error processing audio: {e}")
 
@@ -503,7 +508,7 @@ else:
         st.divider()
 
         # Check if we have any context to work with
-        has_context = len(st.session_state.messages) > 0 or st.session_state.document_context != "No document uploaded."
+        has_context = len(st.session_state.messages) > 0 or st.session_state.document_context != NO_DOCUMENT
 
         if not has_context:
             st.info("Please chat with Nyay-Saathi in the 'What to do' tab or upload a document first. We need information to match you with a lawyer!")
@@ -512,38 +517,26 @@ else:
             
             with col_match:
                 st.subheader("Step 1: AI Analysis")
+                st.text_input("Your city or district (optional)", key="lawyer_place",
+                              help="Lawyers nearest to you are shown first.")
                 if st.button("Generate Case Brief & Find Match", type="primary"):
                     with st.spinner("AI is analyzing your case details..."):
                         try:
-                            # Gather Context
-                            chat_summary = "\n".join([m["content"] for m in st.session_state.messages])
-                            doc_summary = st.session_state.document_context[:2000] # Limit length
-                            
                             model = get_genai_model()
-                            match_prompt = f"""
-                            Analyze this user's legal situation based on their chat and documents.
-                            
-                            Chat History: {chat_summary}
-                            Document Context: {doc_summary}
-                            
-                            Output a JSON object with these 2 fields:
-                            1. "summary": A 3-sentence professional summary of the legal issue for a lawyer to read.
-                            2. "category": ONE of these exact categories: "Family Law", "Property Dispute", "Criminal Law", "Consumer Rights", "Corporate Law", "Cyber Crime". If unsure, use "General".
-
-                            JSON:
-                            """
-                            
-                            response = model.generate_content(match_prompt)
-                            cleaned_json = response.text.strip().replace("```json", "").replace("```", "")
-                            data = json.loads(cleaned_json)
-                            
-                            st.session_state.case_brief = data["summary"]
-                            st.session_state.recommended_lawyer_type = data["category"]
+                            summary, category = analyze_case(
+                                model, st.session_state.messages, st.session_state.document_context,
+                                memory=st.session_state.conversation_memory,
+                                document_index=st.session_state.document_index,
+                                classifier=get_case_classifier(),
+                                running_brief=st.session_state.running_brief
+                            )
+                            st.session_state.case_brief = summary
+                            st.session_state.recommended_lawyer_type = category
                             
                         except Exception as e:
                             st.error(f"AI Analysis failed: {e}")
                             # Fallback
-                            st.session_state.case_brief = "User needs legal assistance based on recent inquiries."
+                            st.session_state.case_brief = FALLBACK_BRIEF
                             st.session_state.recommended_lawyer_type = "General"
 
             with col_display:
@@ -557,18 +550,23 @@ else:
                     st.markdown("---")
                     st.subheader(f"Recommended {st.session_state.recommended_lawyer_type} Lawyers")
                     
-                    # Filter Mock Database
-                    found_lawyers = [l for l in LAWYER_DIRECTORY if l["specialization"] == st.session_state.recommended_lawyer_type]
+                    # Ranked lookup in the lawyer directory (lawyer_store)
+                    found_lawyers, exact_match = find_lawyers(
+                        st.session_state.recommended_lawyer_type,
+                        place=st.session_state.get("lawyer_place") or None, language=language
+                    )
                     
-                    # If no exact match, show random ones (Fallback)
-                    if not found_lawyers:
-                        found_lawyers = random.sample(LAWYER_DIRECTORY, 2)
-                        st.warning(f"No specific {st.session_state.recommended_lawyer_type} experts in our demo database. Showing top rated lawyers:")
+                    # If no exact match, the best-ranked lawyers of any specialization are shown
+                    # (nearest to the city, speaking the user's language, most experienced)
+                    if not exact_match:
+                        st.warning(f"No specific {st.session_state.recommended_lawyer_type} experts in our directory. "
+                                   "Showing the closest matches of any specialization:")
 
                     for lawyer in found_lawyers:
+                        distance = f" · {lawyer['distance_km']:.0f} km away" if lawyer["distance_km"] is not None else ""
                         st.markdown(f"""
                         <div class="lawyer-card">
-                            <h4>{lawyer['name']} <span style="font-size:0.8em; color:#00FFD1;">({lawyer['location']})</span></h4>
+                            <h4>{lawyer['name']} <span style="font-size:0.8em; color:#00FFD1;">({lawyer['location']}{distance})</span></h4>
                             <p><strong>Specialization:</strong> {lawyer['specialization']} | <strong>Exp:</strong> {lawyer['experience']}</p>
                             <p><strong>Languages:</strong> {lawyer['languages']}</p>
                             <a href="tel:{lawyer['phone']}" style="text-decoration:none;">
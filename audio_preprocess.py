@@ -0,0 +1,169 @@
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import wave
+from math import gcd
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from memory_cache import MemoryLRU
+
+# --- VOICE CLIP PREPROCESSING ---
+# Browser recordings are 44.1/48 kHz PCM with silence at both ends. Speech models work
+# at 16 kHz mono, so we downmix, resample, trim silence and encode compactly before upload.
+# st.audio_input returns the same recording on every rerun until the user records again,
+# so the processed clip is kept by hash and the resample and Opus encode (an ffmpeg
+# subprocess) run once per recording.
+
+TARGET_RATE = 16000
+FRAME_SECONDS = 0.03
+SPEECH_PAD_SECONDS = 0.15   # kept around detected speech so word edges are not clipped
+MAX_PAUSE_SECONDS = 0.6     # longer pauses inside the clip are shortened to this
+MIN_SPEECH_DB = -50.0       # dBFS; frames quieter than this are never speech
+SPEECH_OVER_FLOOR_DB = 10.0
+CACHE_ENTRIES = 16
+# "auto" uses Opus when ffmpeg is installed and 16 kHz PCM WAV otherwise; "opus" or "wav" force one.
+VOICE_CODEC = os.environ.get("NYAY_VOICE_CODEC", "auto")
+OPUS_BITRATE = "24k"
+
+_cache = MemoryLRU(CACHE_ENTRIES)
+
+
+def read_wav(audio_bytes):
+    """(float32 samples of shape (frames, channels) in [-1, 1], sample rate)."""
+    with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+        channels, width, rate = reader.getnchannels(), reader.getsampwidth(), reader.getframerate()
+        raw = reader.readframes(reader.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 3:
+        padded = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (padded[:, 0].astype(np.int32) | padded[:, 1].astype(np.int32) << 8
+                | padded[:, 2].astype(np.int32) << 16)
+        samples = np.where(ints >= 1 << 23, ints - (1 << 24), ints).astype(np.float32) / (1 << 23)
+    else:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2 ** 31
+    return samples[: len(samples) // channels * channels].reshape(-1, channels), rate
+
+
+def to_mono_16k(samples, rate):
+    mono = samples.mean(axis=1)
+    if rate == TARGET_RATE:
+        return mono
+    divisor = gcd(TARGET_RATE, rate)
+    return resample_poly(mono, TARGET_RATE // divisor, rate // divisor).astype(np.float32)
+
+
+def speech_frames(mono, rate=TARGET_RATE):
+    """Energy VAD: a boolean per FRAME_SECONDS frame, relative to the clip's noise floor."""
+    size = int(rate * FRAME_SECONDS)
+    count = len(mono) // size
+    if count == 0:
+        return np.zeros(0, dtype=bool)
+    frames = mono[: count * size].reshape(count, size)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    floor = np.percentile(energy_db, 10)
+    return energy_db > max(floor + SPEECH_OVER_FLOOR_DB, MIN_SPEECH_DB)
+
+
+def trim_silence(mono, rate=TARGET_RATE):
+    """Drops leading/trailing silence and shortens long pauses. Returns the clip unchanged if no speech is found."""
+    speech = speech_frames(mono, rate)
+    if not speech.any():
+        return mono
+    size = int(rate * FRAME_SECONDS)
+    pad = int(SPEECH_PAD_SECONDS / FRAME_SECONDS)
+    keep = speech.copy()
+    for i in np.flatnonzero(speech):
+        keep[max(0, i - pad): i + pad + 1] = True
+    # Inside the clip, keep at most MAX_PAUSE_SECONDS of each remaining silent run.
+    max_pause = int(MAX_PAUSE_SECONDS / FRAME_SECONDS)
+    first, last = np.flatnonzero(keep)[[0, -1]]
+    run = 0
+    for i in range(first, last + 1):
+        if keep[i]:
+            run = 0
+        else:
+            run += 1
+            keep[i] = run <= max_pause
+    keep[:first] = False
+    kept = [mono[i * size:(i + 1) * size] for i in np.flatnonzero(keep)]
+    if last == len(speech) - 1:
+        kept.append(mono[len(speech) * size:])  # partial frame at the end
+    return np.concatenate(kept)
+
+
+def encode_wav(mono, rate=TARGET_RATE):
+    pcm = (np.clip(mono, -1, 1) * 32767).astype("<i2").tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm)
+    return buf.getvalue()
+
+
+def encode_opus(mono, rate=TARGET_RATE):
+    pcm = (np.clip(mono, -1, 1) * 32767).astype("<i2").tobytes()
+    result = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "pipe:0",
+         "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip", "-f", "ogg", "pipe:1"],
+        input=pcm, capture_output=True, timeout=30, check=True,
+    )
+    return result.stdout
+
+
+def _codec():
+    if VOICE_CODEC == "auto":
+        return "opus" if shutil.which("ffmpeg") else "wav"
+    return VOICE_CODEC
+
+
+def speech_samples(audio_bytes):
+    """(16 kHz mono float32 speech, trimmed and peak-normalized; original duration in seconds)."""
+    samples, rate = read_wav(audio_bytes)
+    trimmed = trim_silence(to_mono_16k(samples, rate))
+    peak = float(np.max(np.abs(trimmed))) if len(trimmed) else 0.0
+    if peak > 0:
+        trimmed = trimmed * (0.9 / peak)
+    return trimmed.astype(np.float32), len(samples) / rate
+
+
+def _process(audio_bytes):
+    trimmed, original_seconds = speech_samples(audio_bytes)
+    if _codec() == "opus":
+        data, mime_type = encode_opus(trimmed), "audio/ogg"
+    else:
+        data, mime_type = encode_wav(trimmed), "audio/wav"
+    return {
+        "bytes": data,
+        "mime_type": mime_type,
+        "seconds": len(trimmed) / TARGET_RATE,
+        "original_seconds": original_seconds,
+        "original_bytes": len(audio_bytes),
+    }
+
+
+def preprocess_audio(audio_bytes):
+    """Returns the processed clip (see _process), cached by SHA-256 of the original bytes.
+
+    If the clip cannot be decoded as PCM WAV, the original bytes are passed through unchanged.
+    """
+    key = hashlib.sha256(audio_bytes).hexdigest()
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        result = _process(audio_bytes)
+    except Exception:
+        result = {"bytes": audio_bytes, "mime_type": "audio/wav", "seconds": None,
+                  "original_seconds": None, "original_bytes": len(audio_bytes)}
+    result["sha256"] = key
+    _cache.set(key, result)
+    return result
@@ -0,0 +1,237 @@
+"""Batch question answering: a CSV/JSONL of citizen questions in, a JSONL of answers out.
+
+All questions are embedded in one pass and searched against the FAISS index in a
+single batched call, with the same k and score threshold as the app's retriever.
+Questions that retrieve the same guide sections are grouped and sent one after
+another, so their prompts share a prefix. Repeated questions in the same language
+are answered once. LLM calls run with bounded concurrency and fall back to the
+extractive answer on errors.
+
+Each answer is appended to the output as soon as it is ready, with its sources.
+Re-running the same command skips rows already in the output, so an interrupted
+batch resumes where it stopped.
+
+Input rows need a "question" column. "id" and "language" are optional; the row
+number and Simple English are used when they are missing.
+
+Usage:
+    python batch_qa.py ngo_questions.csv -o answers.jsonl --concurrency 8
+    python batch_qa.py questions.jsonl -o answers.jsonl --answer-mode extractive   # no LLM calls
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from importlib.metadata import PackageNotFoundError, version
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from langchain_core.runnables import RunnableLambda
+
+from coalesce import normalize_prompt
+from fast_answer import build_action_plan
+from rag_pipeline import (ANSWER_MODE, NO_DOCUMENT, RETRIEVER_K, RETRIEVER_SCORE_THRESHOLD, build_rag_chain,
+                          load_embeddings, load_vectorstore, source_metadata)
+from row_io import read_rows
+
+BATCH_CONCURRENCY = int(os.environ.get("NYAY_BATCH_CONCURRENCY", "8"))
+DEFAULT_LANGUAGE = "Simple English"
+MODEL_NAME = os.environ.get("NYAY_MODEL_NAME", "gemini-2.5-flash")
+
+logger = logging.getLogger("nyay.batch_qa")
+
+
+# --- INPUT / RESUME ---
+def prepare_rows(rows):
+    """([(id, question, language)] for rows with a question, [(id, error)] for rows that are not objects).
+
+    Ids default to the row number.
+    """
+    prepared, invalid = [], []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            invalid.append((str(number), f"row is a JSON {type(row).__name__}, not an object"))
+            continue
+        question = str(row.get("question") or "").strip()
+        if question:
+            prepared.append((str(row.get("id") or number), question, row.get("language") or DEFAULT_LANGUAGE))
+    return prepared, invalid
+
+
+def completed_ids(out_path):
+    """Ids already answered in `out_path`. A line cut off by an interrupt is ignored."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def _ends_mid_line(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+# --- BATCHED RETRIEVAL ---
+# Searching every question in one FAISS call needs two LangChain FAISS internals
+# (_normalize_L2 and _select_relevance_score_fn), so it only runs on the
+# langchain-community versions it was checked against. Other versions go through the
+# public similarity_search_with_relevance_scores, one question at a time.
+BATCHED_FAISS_VERSIONS = ("0.3.", "0.4.")
+
+try:
+    LANGCHAIN_COMMUNITY_VERSION = version("langchain-community")
+except PackageNotFoundError:
+    LANGCHAIN_COMMUNITY_VERSION = ""
+_batched_search = LANGCHAIN_COMMUNITY_VERSION.startswith(BATCHED_FAISS_VERSIONS)
+if not _batched_search:
+    logger.warning("langchain-community %s is not a version batched FAISS search was checked against; "
+                   "searching one question at a time", LANGCHAIN_COMMUNITY_VERSION or "(not installed)")
+
+
+def batch_retrieve(db, questions, k=RETRIEVER_K, score_threshold=RETRIEVER_SCORE_THRESHOLD):
+    """[(doc ids, docs)] per question, from one embedding pass and one FAISS search.
+
+    Same results as the app's similarity_score_threshold retriever, without one
+    embed + search round trip per question.
+    """
+    if not (_batched_search and hasattr(db, "_normalize_L2") and hasattr(db, "_select_relevance_score_fn")):
+        return [_retrieve_one(db, question, k, score_threshold) for question in questions]
+    vectors = np.asarray(db.embeddings.embed_documents(list(questions)), dtype=np.float32)
+    if db._normalize_L2:
+        import faiss
+        faiss.normalize_L2(vectors)
+    scores, indices = db.index.search(vectors, k)
+    relevance = db._select_relevance_score_fn()
+    results = []
+    for row_scores, row_indices in zip(scores, indices):
+        ids = [db.index_to_docstore_id[i] for score, i in zip(row_scores, row_indices)
+               if i != -1 and relevance(float(score)) >= score_threshold]
+        results.append((tuple(ids), [db.docstore.search(doc_id) for doc_id in ids]))
+    return results
+
+
+def _retrieve_one(db, question, k, score_threshold):
+    docs = [doc for doc, _ in db.similarity_search_with_relevance_scores(question, k=k, score_threshold=score_threshold)]
+    return tuple(doc.id or doc.page_content for doc in docs), docs
+
+
+# --- ANSWERING ---
+def answer_batch(rows, out_path, db, llm=None, concurrency=BATCH_CONCURRENCY, mode=ANSWER_MODE, progress=None):
+    """Answers `rows` (dicts with "question", optional "id"/"language") into JSONL at `out_path`.
+
+    `llm` is the chat model used in the RAG chain; with mode "extractive" (or no llm)
+    answers come from the retrieved sections only. `progress(done, total)` is called
+    as answers are written. Returns a report dict.
+    """
+    start = time.perf_counter()
+    done = completed_ids(out_path)
+    prepared, failed = prepare_rows(rows)
+    todo = [row for row in prepared if row[0] not in done]
+
+    # One job per distinct (question, language); duplicates reuse its answer.
+    jobs = {}
+    for row_id, question, language in todo:
+        jobs.setdefault((normalize_prompt(question), language), []).append((row_id, question, language))
+    questions = [members[0][1] for members in jobs.values()]
+    retrieved = dict(zip(questions, batch_retrieve(db, questions))) if questions else {}
+    # Same retrieved sections -> adjacent in the queue, so prompts share their context prefix.
+    order = sorted(jobs, key=lambda key: retrieved[jobs[key][0][1]][0])
+
+    chain = None
+    if llm is not None and mode != "extractive":
+        chain = build_rag_chain(RunnableLambda(lambda question: retrieved[question][1]), llm)
+
+    def _answer(key):
+        _, question, language = jobs[key][0]
+        docs = retrieved[question][1]
+        if chain is not None:
+            try:
+                response = chain.invoke({
+                    "question": question,
+                    "language": language,
+                    "chat_history": "",
+                    "document_context": NO_DOCUMENT,
+                })
+                return key, response["answer"], response["sources"], "llm"
+            except Exception:
+                if mode == "llm":
+                    raise
+        answer, _ = build_action_plan(question, docs, language)
+        return key, answer, docs, "extractive"
+
+    written = 0
+    cut_off = _ends_mid_line(out_path)
+    with open(out_path, "a", encoding="utf-8") as out:
+        if cut_off:
+            out.write("\n")  # the previous run stopped mid-line
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch-qa") as pool:
+            futures = {pool.submit(_answer, key): key for key in order}
+            for future in as_completed(futures):
+                try:
+                    key, answer, docs, answer_mode = future.result()
+                except Exception as e:
+                    failed.extend((row_id, str(e)) for row_id, _, _ in jobs[futures[future]])
+                    continue
+                for row_id, question, language in jobs[key]:
+                    out.write(json.dumps({
+                        "id": row_id,
+                        "question": question,
+                        "language": language,
+                        "answer": answer,
+                        "sources": source_metadata(docs),
+                        "answer_mode": answer_mode,
+                    }, ensure_ascii=False) + "\n")
+                    written += 1
+                out.flush()
+                if progress is not None:
+                    progress(written, len(todo))
+
+    seconds = time.perf_counter() - start
+    return {
+        "answered": written,
+        "skipped": len(done),
+        "unique_questions": len(jobs),
+        "context_groups": len({retrieved[q][0] for q in questions}),
+        "errors": failed,  # [(row id, error)]
+        "seconds": seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("questions", help="CSV or JSONL file with a 'question' column.")
+    parser.add_argument("-o", "--output", default="answers.jsonl", help="JSONL file to write (appended to).")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="LLM calls in flight.")
+    parser.add_argument("--answer-mode", choices=["llm", "auto", "extractive"], default=ANSWER_MODE)
+    args = parser.parse_args(argv)
+
+    with open(args.questions, "rb") as f:
+        rows = read_rows(f.read(), args.questions)
+    db = load_vectorstore(load_embeddings())
+    llm = None
+    if args.answer_mode != "extractive":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.5)
+
+    report = answer_batch(rows, args.output, db, llm, args.concurrency, args.answer_mode,
+                          progress=lambda done, total: print(f"\r{done}/{total}", end="", flush=True))
+    print(f"\n{report['answered']} answers ({report['unique_questions']} unique questions, "
+          f"{report['context_groups']} context groups, {report['skipped']} already done) "
+          f"in {report['seconds']:.1f}s -> {args.output}")
+    for row_id, error in report["errors"]:
+        print(f"  failed {row_id}: {error}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark: local Whisper transcription vs. sending the clip straight to Gemini.
+
+For each clip it reports seconds of speech and, per second of audio,
+  - whisper:  local faster-whisper transcription on CPU (the text then goes
+              through the normal RAG turn, which is cacheable)
+  - gemini:   the current direct-audio voice call
+
+Without --live, the Gemini call is modelled as in bench_voice_audio.py. The
+Whisper part always runs for real and is skipped if faster-whisper is missing.
+
+Usage:
+    python bench_asr.py                                  # synthetic recordings
+    python bench_asr.py --wav question.wav --model small
+    GOOGLE_API_KEY=... python bench_asr.py --live --wav question.wav
+"""
+import argparse
+import os
+import time
+
+import voice_pipeline
+from audio_preprocess import preprocess_audio
+from bench_voice_audio import ModelledGemini, synthetic_clips
+from languages import lang_code_map
+
+
+def time_whisper(whisper, data, language, repeat):
+    timings = []
+    for _ in range(repeat):
+        voice_pipeline._transcripts.clear()
+        start = time.perf_counter()
+        transcript = voice_pipeline.transcribe_clip(data, language, whisper)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2], transcript
+
+
+def per_second(elapsed, seconds):
+    """Seconds of processing per second of audio; "-" for clips with no duration (undecodable or silent)."""
+    return f"{elapsed / seconds:>12.3f}" if seconds else f"{'-':>12}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", action="append", default=[], help="Recorded WAV clip(s) to benchmark.")
+    parser.add_argument("--language", default="Simple English", choices=sorted(lang_code_map))
+    parser.add_argument("--model", default=voice_pipeline.WHISPER_MODEL, help="faster-whisper model size.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--base-latency", type=float, default=1.5, help="Modelled seconds per Gemini call.")
+    parser.add_argument("--uplink-kbps", type=float, default=512, help="Modelled user uplink in kbit/s.")
+    parser.add_argument("--audio-cost", type=float, default=0.05, help="Modelled model seconds per audio second.")
+    parser.add_argument("--live", action="store_true", help="Call real Gemini (needs GOOGLE_API_KEY).")
+    args = parser.parse_args(argv)
+
+    clips = {os.path.basename(p): open(p, "rb").read() for p in args.wav} if args.wav else synthetic_clips()
+
+    whisper = None
+    try:
+        from faster_whisper import WhisperModel
+        start = time.perf_counter()
+        whisper = WhisperModel(args.model, device="cpu", compute_type=voice_pipeline.WHISPER_COMPUTE_TYPE)
+        print(f"loaded whisper {args.model} in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"skipping whisper: {e}")
+
+    if args.live:
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+        gemini = genai.GenerativeModel("gemini-2.5-flash")
+
+    print(f"{'clip':<18}{'audio s':>8}{'whisper s':>10}{'w s/audio s':>12}{'gemini s':>9}{'g s/audio s':>12}")
+    rows = []
+    for name, data in clips.items():
+        clip = preprocess_audio(data)
+        seconds = clip["seconds"] or 0.0
+        row = {"clip": name, "audio_s": seconds}
+        if whisper is not None:
+            row["whisper_s"], row["transcript"] = time_whisper(whisper, data, args.language, args.repeat)
+        model = gemini if args.live else ModelledGemini(args.base_latency, args.uplink_kbps, args.audio_cost)
+        if not args.live:
+            model.clip_seconds = seconds
+        start = time.perf_counter()
+        voice_pipeline.answer_voice_question(model, clip["bytes"], args.language, clip["mime_type"])
+        row["gemini_s"] = time.perf_counter() - start + (0 if args.live else model.seconds)
+        rows.append(row)
+
+        whisper_s = row.get("whisper_s")
+        print(f"{name:<18}{seconds:>8.1f}"
+              + (f"{whisper_s:>10.2f}{per_second(whisper_s, seconds)}" if whisper_s is not None else f"{'-':>10}{'-':>12}")
+              + f"{row['gemini_s']:>9.2f}{per_second(row['gemini_s'], seconds)}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark: Find Lawyer case categorization, local centroid classifier vs. the Gemini JSON call.
+
+Runs a labelled set of case descriptions (none of them among the classifier's own
+examples) through
+  - classifier:  CaseClassifier nearest centroid, every case
+  - confident:   the same, only cases it is confident about (the rest would go to the LLM)
+  - llm:         the old JSON prompt (--live only; otherwise its latency is --llm-latency)
+  - hybrid:      classifier when confident, else the LLM
+and reports accuracy, share of cases decided, and median ms per case, plus the margin
+CaseClassifier calibrated for the embedder. Run it with the real MiniLM embeddings
+(and --live) to check the "confident" row is as accurate as the LLM; if it is not,
+raise case_classifier.TARGET_PRECISION or set NYAY_LOCAL_CATEGORY=0.
+
+Usage:
+    python bench_case_classifier.py                       # MiniLM from the HF cache, modelled LLM latency
+    python bench_case_classifier.py --live                # also calls Gemini (GOOGLE_API_KEY)
+    python bench_case_classifier.py --stub-embeddings     # hashed bag-of-words, no model download
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from case_classifier import CaseClassifier
+
+EVAL_CASES = [
+    ("Family Law", "My husband has filed for divorce and wants to take my daughter away."),
+    ("Family Law", "After my mother passed away my uncle is claiming her jewellery and house."),
+    ("Family Law", "My wife's family keeps demanding more dowry and she has gone back to her parents."),
+    ("Family Law", "We are separated for two years; how much monthly maintenance can I ask for my kids?"),
+    ("Family Law", "I want to get a guardianship certificate for my younger sister."),
+    ("Family Law", "My father married again and his second wife wants all the pension."),
+    ("Family Law", "My husband threatens and slaps me every day when he is drunk."),
+    ("Family Law", "Can I get custody of my grandson after my son's death?"),
+    ("Property Dispute", "The house owner kept two months' advance and says I damaged the walls."),
+    ("Property Dispute", "My cousin has occupied the ancestral farm and grows crops on my share."),
+    ("Property Dispute", "The developer delayed handing over my apartment and keeps asking for more money."),
+    ("Property Dispute", "The revenue office has the wrong survey number on my khata."),
+    ("Property Dispute", "My landlord cut the electricity to make me vacate the room."),
+    ("Property Dispute", "A person is claiming my plot using a forged power of attorney."),
+    ("Property Dispute", "The society is not transferring the flat to my name after I bought it."),
+    ("Property Dispute", "The tenant in my shop has not paid rent for a year."),
+    ("Criminal Law", "The police picked up my husband at night and are not letting us see him."),
+    ("Criminal Law", "The station house officer will not write down my complaint about the assault."),
+    ("Criminal Law", "My neighbour filed a false case of attempt to murder against my father."),
+    ("Criminal Law", "A gang snatched my chain and pushed me off the scooter."),
+    ("Criminal Law", "I have received a notice to appear at the police station for questioning."),
+    ("Criminal Law", "How do I get bail for my brother arrested in a fight?"),
+    ("Criminal Law", "Someone keeps following my sister home from college and shouting at her."),
+    ("Criminal Law", "The court issued a non-bailable warrant against me for missing a hearing."),
+    ("Consumer Rights", "The washing machine I bought stopped working in a week and the dealer ignores me."),
+    ("Consumer Rights", "The mobile company keeps charging me for a plan I never activated."),
+    ("Consumer Rights", "The private school took the full year's fees and then shut down."),
+    ("Consumer Rights", "My health insurer is refusing to pay for my surgery."),
+    ("Consumer Rights", "The courier lost my parcel and is not giving compensation."),
+    ("Consumer Rights", "The car service centre damaged my engine and wants me to pay."),
+    ("Consumer Rights", "The e-commerce site delivered a fake product and closed my return request."),
+    ("Consumer Rights", "The electricity board sent a bill ten times higher than usual."),
+    ("Corporate Law", "My co-founder has transferred the company's clients to his new firm."),
+    ("Corporate Law", "We supplied goods to a distributor and they have not paid for six months."),
+    ("Corporate Law", "How do I convert my proprietorship into an LLP?"),
+    ("Corporate Law", "The factory owner has not given our wages and provident fund."),
+    ("Corporate Law", "I was removed as a director without a board meeting."),
+    ("Corporate Law", "The vendor breached our service agreement and we want damages."),
+    ("Corporate Law", "My employer is holding back my relieving letter and final settlement."),
+    ("Corporate Law", "Our startup needs a shareholder agreement with the new investor."),
+    ("Cyber Crime", "Someone took a loan in my name using my Aadhaar and PAN online."),
+    ("Cyber Crime", "A man I met on a dating app is asking for money or he will leak my pictures."),
+    ("Cyber Crime", "My WhatsApp was taken over and messages asking for money went to my friends."),
+    ("Cyber Crime", "I clicked a link in an SMS about my electricity bill and lost fifty thousand rupees."),
+    ("Cyber Crime", "A fake page is using my shop's name and cheating customers."),
+    ("Cyber Crime", "Somebody morphed my photo and posted it in a group."),
+    ("Cyber Crime", "I paid for a work-from-home task on Telegram and they took all my money."),
+    ("Cyber Crime", "My daughter is being bullied with abusive comments on YouTube."),
+]
+
+
+def _ms(seconds):
+    return seconds * 1000
+
+
+def make_llm_categorizer(model_name):
+    import google.generativeai as genai
+    from lawyer_match import build_match_prompt
+
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    model = genai.GenerativeModel(model_name)
+
+    def categorize(text):
+        response = model.generate_content(build_match_prompt(text, "No document uploaded."))
+        try:
+            return json.loads(response.text.strip().replace("```json", "").replace("```", ""))["category"]
+        except (ValueError, KeyError):
+            return "General"  # the JSON parse failures this replaces count as misses
+    return categorize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stub-embeddings", action="store_true", help="Hashed bag-of-words instead of MiniLM.")
+    parser.add_argument("--live", action="store_true", help="Call Gemini for the llm and hybrid rows.")
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="Modelled Gemini call seconds (without --live).")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    args = parser.parse_args(argv)
+
+    if args.stub_embeddings:
+        from load_test import StubEmbeddings
+        embeddings = StubEmbeddings()
+    else:
+        from rag_pipeline import load_embeddings
+        embeddings = load_embeddings()
+    classifier = CaseClassifier(embeddings)
+    start = time.perf_counter()
+    classifier.centroids
+    print(f"centroids: {len(classifier.labels)} categories in {_ms(time.perf_counter() - start):.0f} ms")
+
+    predictions, timings = [], []
+    for label, text in EVAL_CASES:
+        start = time.perf_counter()
+        category, confident = classifier.classify([text])
+        timings.append(time.perf_counter() - start)
+        predictions.append((label, category, confident))
+
+    llm_labels, llm_timings = None, []
+    if args.live:
+        categorize = make_llm_categorizer(args.model)
+        llm_labels = []
+        for _, text in EVAL_CASES:
+            start = time.perf_counter()
+            llm_labels.append(categorize(text))
+            llm_timings.append(time.perf_counter() - start)
+    llm_ms = _ms(statistics.median(llm_timings)) if llm_timings else _ms(args.llm_latency)
+    classifier_ms = _ms(statistics.median(timings))
+
+    total = len(EVAL_CASES)
+    confident = [p for p in predictions if p[2]]
+    rows = [
+        ("classifier", sum(p[0] == p[1] for p in predictions) / total, 1.0, classifier_ms),
+        ("confident", sum(p[0] == p[1] for p in confident) / len(confident) if confident else 0.0,
+         len(confident) / total, classifier_ms),
+    ]
+    deferred = 1 - len(confident) / total
+    if llm_labels is not None:
+        rows.append(("llm", sum(l == p[0] for l, p in zip(llm_labels, predictions)) / total, 1.0, llm_ms))
+        hybrid = [p[1] if p[2] else l for l, p in zip(llm_labels, predictions)]
+        rows.append(("hybrid", sum(h == p[0] for h, p in zip(hybrid, predictions)) / total, 1.0,
+                     classifier_ms + deferred * llm_ms))
+    else:
+        rows.append(("llm", None, 1.0, llm_ms))
+        rows.append(("hybrid", None, 1.0, classifier_ms + deferred * llm_ms))
+
+    print(f"calibrated min_margin {classifier.min_margin:.3f} (min_similarity {classifier.min_similarity:.2f},"
+          f" target precision {classifier.target_precision:.0%})")
+    print(f"{'mode':<12}{'accuracy':>10}{'decided':>9}{'ms/case':>10}")
+    for mode, accuracy, decided, ms in rows:
+        accuracy_text = f"{accuracy:>10.1%}" if accuracy is not None else f"{'-':>10}"
+        print(f"{mode:<12}{accuracy_text}{decided:>9.0%}{ms:>10.2f}")
+    print("LLM latency is " + ("measured" if args.live else f"modelled at {args.llm_latency:.1f}s")
+          + "; hybrid ms is the expected time per case, including the share sent to the LLM.")
+    for label, category, is_confident in predictions:
+        if category != label and is_confident:
+            print(f"  confident miss: expected {label}, got {category}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark: document-rendering API throughput on one process (doc_api.py).
+
+Starts the API in a background thread and drives it with keep-alive HTTP clients.
+For every DOC_CONFIG template it sends
+  - unique:    values that differ on every request (each one is rendered)
+  - repeated:  the same few payloads over and over (served from the PDF cache)
+and reports requests/s, median and p95 latency, and process CPU ms per request.
+Deployments render with the Noto fonts and uharfbuzz (requirements.txt, packages.txt),
+so measure with them: --font-dir, NYAY_FONT_DIR or fonts-noto-core, plus
+--multilingual for names and addresses in Indic scripts. Without the fonts the API
+falls back to core fonts, which is several times faster and not what users get;
+the run is labelled as such.
+
+Usage:
+    python bench_doc_api.py --font-dir fonts --multilingual
+    python bench_doc_api.py --font-dir fonts --requests 2000 --clients 4
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+
+import doc_api
+import pdf_engine
+from bench_pdf_render import field_values
+from doc_templates import DOC_CONFIG
+
+
+def payloads(count, unique, multilingual=False):
+    doc_types = list(DOC_CONFIG)
+    out = []
+    for i in range(count):
+        doc_type = doc_types[i % len(doc_types)]
+        values = field_values(doc_type, multilingual=multilingual)
+        values.pop("date")
+        first_field = DOC_CONFIG[doc_type]["fields"][0]["id"]
+        values[first_field] = f"{values[first_field]} {i if unique else i % 4}"
+        out.append(json.dumps({"doc_type": doc_type, "values": values}).encode("utf-8"))
+    return out
+
+
+def run_clients(port, bodies, clients):
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def client(share):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine = []
+        for body in share:
+            start = time.perf_counter()
+            conn.request("POST", "/documents/render", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = response.read()
+            mine.append(time.perf_counter() - start)
+            if response.status != 200 or not data.startswith(b"%PDF"):
+                failures.append(response.status)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(bodies[i::clients],)) for i in range(clients)]
+    wall, cpu = time.perf_counter(), time.process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, failures, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode.")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent keep-alive connections.")
+    parser.add_argument("--font-dir", help="Directory with the Noto TTF files.")
+    parser.add_argument("--multilingual", action="store_true",
+                        help="Fill text fields with Hindi, Kannada, Tamil and Telugu values.")
+    args = parser.parse_args(argv)
+    if args.font_dir:
+        pdf_engine.FONT_DIRS = [args.font_dir]
+
+    server = doc_api.make_server("127.0.0.1", 0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if pdf_engine.unicode_fonts_available():
+        fonts = "Noto (Unicode), shaping " + ("on" if pdf_engine.TEXT_SHAPING else "off (no uharfbuzz)")
+    else:
+        fonts = "core (latin-1) -- NOT the deployed renderer; pass --font-dir with the Noto fonts"
+    print(f"fonts: {fonts}; {'multilingual' if args.multilingual else 'English'} values, "
+          f"{args.clients} clients, {args.requests} requests per mode")
+
+    run_clients(port, payloads(len(DOC_CONFIG), True, args.multilingual), 1)  # warm-up: fonts, caches
+    print(f"{'mode':<10}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'CPU ms':>8}{'errors':>8}")
+    rows = []
+    try:
+        for mode in ("unique", "repeated"):
+            doc_api._pdf_cache.clear()
+            latencies, failures, wall, cpu = run_clients(port, payloads(args.requests, mode == "unique", args.multilingual), args.clients)
+            latencies.sort()
+            row = {
+                "mode": mode,
+                "rps": len(latencies) / wall,
+                "p50_ms": statistics.median(latencies) * 1000,
+                "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+                "cpu_ms": cpu / len(latencies) * 1000,
+                "errors": len(failures),
+            }
+            rows.append(row)
+            print(f"{mode:<10}{row['rps']:>8.0f}{row['p50_ms']:>8.1f}{row['p95_ms']:>8.1f}"
+                  f"{row['cpu_ms']:>8.2f}{row['errors']:>8}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: lawyer matching latency, indexed SQLite store vs. linear scan.
+
+Builds a synthetic directory of --lawyers advocates spread around Indian cities
+(population-weighted, a few km of jitter) and times random queries for
+  - specialization:           category only
+  - +place:                   category ranked by distance to a city
+  - +place+language:          as above, preferring lawyers who speak the user's language
+  - linear:                   the old list-of-dicts scan on an exact specialization
+reporting median / p95 / max ms per match.
+
+Usage:
+    python bench_lawyer_match.py --lawyers 100000 --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from lawyer_store import LawyerStore
+
+SPECIALIZATIONS = ["Family Law", "Property Dispute", "Criminal Law", "Consumer Rights", "Corporate Law",
+                   "Cyber Crime", "Labour Law", "Tax Law"]
+LANGUAGES = ["Simple English", "Hindi (in Roman script)", "Kannada", "Tamil", "Telugu", "Marathi"]
+# city: (lat, lon, weight, regional languages)
+CITIES = {
+    "Delhi": (28.61, 77.21, 20, "Hindi, Punjabi"), "Mumbai": (19.08, 72.88, 18, "Marathi, Hindi"),
+    "Bangalore": (12.97, 77.59, 12, "Kannada, Tamil"), "Chennai": (13.08, 80.27, 10, "Tamil"),
+    "Hyderabad": (17.39, 78.49, 10, "Telugu, Urdu"), "Kolkata": (22.57, 88.36, 10, "Bengali, Hindi"),
+    "Pune": (18.52, 73.86, 7, "Marathi"), "Ahmedabad": (23.02, 72.57, 7, "Gujarati, Hindi"),
+    "Lucknow": (26.85, 80.95, 6, "Hindi, Urdu"), "Jaipur": (26.91, 75.79, 5, "Hindi"),
+    "Patna": (25.59, 85.14, 5, "Hindi"), "Chandigarh": (30.73, 76.78, 4, "Punjabi, Hindi"),
+    "Bhopal": (23.26, 77.41, 4, "Hindi"), "Kochi": (9.93, 76.27, 4, "Malayalam"),
+    "Guwahati": (26.14, 91.74, 3, "Assamese, Hindi"), "Bhubaneswar": (20.30, 85.82, 3, "Odia"),
+    "Nagpur": (21.15, 79.09, 3, "Marathi, Hindi"), "Mysore": (12.30, 76.64, 2, "Kannada"),
+    "Madurai": (9.93, 78.12, 2, "Tamil"), "Vijayawada": (16.51, 80.65, 2, "Telugu"),
+    "Dharwad": (15.46, 75.01, 1, "Kannada"), "Ranchi": (23.34, 85.31, 2, "Hindi"),
+}
+
+
+def synthetic_rows(count, seed=0):
+    rng = random.Random(seed)
+    names = list(CITIES)
+    weights = [CITIES[c][2] for c in names]
+    rows = []
+    for i in range(count):
+        city = rng.choices(names, weights)[0]
+        lat, lon, _, regional = CITIES[city]
+        languages = regional.split(", ")[:rng.randint(1, 2)] + (["English"] if rng.random() < 0.7 else [])
+        rows.append({
+            "name": f"Adv. Lawyer {i}", "specialization": rng.choice(SPECIALIZATIONS),
+            "city": city, "district": f"{city} District {rng.randint(1, 4)}", "state": "",
+            "lat": lat + rng.gauss(0, 0.08), "lon": lon + rng.gauss(0, 0.08),
+            "experience_years": rng.randint(1, 35), "languages": ", ".join(languages),
+            "phone": f"+91-9{rng.randint(0, 99999):05d}XXXXX", "available": int(rng.random() < 0.8),
+        })
+    return rows
+
+
+def linear_match(directory, category):
+    return [l for l in directory if l["specialization"] == category]
+
+
+def timed(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(*query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lawyers", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    rows = synthetic_rows(args.lawyers)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = LawyerStore.build(rows, os.path.join(tmp, "lawyers.sqlite3"))
+        print(f"built {args.lawyers} lawyers in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(store.path) / 1e6:.1f} MB)")
+
+        rng = random.Random(1)
+        queries = [(rng.choice(SPECIALIZATIONS + ["General"]), rng.choice(list(CITIES)), rng.choice(LANGUAGES))
+                   for _ in range(args.queries)]
+        modes = {
+            "specialization": (lambda s, p, l: store.match(s), queries),
+            "+place": (lambda s, p, l: store.match(s, place=p), queries),
+            "+place+language": (lambda s, p, l: store.match(s, place=p, language=l), queries),
+            "linear": (lambda s, p, l: linear_match(rows, s), queries[:200]),
+        }
+        for fn, qs in modes.values():
+            fn(*qs[0])  # warm-up
+        print(f"{'mode':<18}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}")
+        results = {}
+        for mode, (fn, qs) in modes.items():
+            timings = timed(fn, qs)
+            results[mode] = {
+                "p50_ms": statistics.median(timings) * 1000,
+                "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+                "max_ms": timings[-1] * 1000,
+            }
+            r = results[mode]
+            print(f"{mode:<18}{r['p50_ms']:>8.3f}{r['p95_ms']:>8.3f}{r['max_ms']:>8.3f}")
+        store.close()
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark: local PDF text-layer extraction vs. sending the whole PDF to Gemini.
+
+For each PDF it reports bytes uploaded and end-to-end Explain latency for
+  - multimodal: the old path, whole PDF bytes in one transcribe+explain call
+  - local:      text layer read with pypdf, OCR only for scanned pages,
+                then a text-only explain call
+
+Without --live, Gemini is modelled as base latency + upload time on a slow
+link + per-page vision cost, so the local extraction time is real and the
+network part is deterministic.
+
+Usage:
+    python bench_pdf_extract.py                       # synthetic text / scanned / mixed PDFs
+    python bench_pdf_extract.py --pdf notice.pdf --uplink-kbps 256
+    GOOGLE_API_KEY=... python bench_pdf_extract.py --live --pdf notice.pdf
+"""
+import argparse
+import io
+import json
+import os
+import time
+
+from explain_pipeline import explain_multimodal, explain_pdf
+from pdf_extract import extract_pages
+
+
+class ModelledGemini:
+    """Latency model: base + bytes over the uplink + vision seconds per PDF page sent."""
+
+    def __init__(self, base_s, uplink_kbps, vision_page_s):
+        self.base_s = base_s
+        self.uplink_kbps = uplink_kbps
+        self.vision_page_s = vision_page_s
+        self.bytes_sent = 0
+        self.seconds = 0.0
+
+    def generate_content(self, contents, **kwargs):
+        parts = contents if isinstance(contents, list) else [contents]
+        sent = 0
+        pages = 0
+        for part in parts:
+            if isinstance(part, dict):
+                sent += len(part["data"])
+                pages += len(extract_pages(part["data"]))
+            else:
+                sent += len(part.encode("utf-8"))
+        self.bytes_sent += sent
+        self.seconds += self.base_s + sent * 8 / (self.uplink_kbps * 1000) + pages * self.vision_page_s
+
+        class _Response:
+            text = json.dumps({"raw_text": "...", "explanation": "..."}) if pages else "Explanation."
+        return _Response()
+
+
+class CountingGemini:
+    """Wraps a real genai model and counts uploaded bytes."""
+
+    def __init__(self, model):
+        self.model = model
+        self.bytes_sent = 0
+
+    def generate_content(self, contents, **kwargs):
+        parts = contents if isinstance(contents, list) else [contents]
+        for part in parts:
+            self.bytes_sent += len(part["data"]) if isinstance(part, dict) else len(part.encode("utf-8"))
+        return self.model.generate_content(contents, **kwargs)
+
+
+def synthetic_pdfs(pages):
+    from fpdf import FPDF
+    from PIL import Image, ImageDraw
+
+    def text_page(pdf, n):
+        pdf.add_page()
+        pdf.set_font("Helvetica", size=11)
+        pdf.multi_cell(0, 6, f"Page {n}. " + "The tenant shall pay the monthly rent before the fifth day. " * 30)
+
+    def scanned_page(pdf, n):
+        image = Image.new("L", (1700, 2200), 245)
+        draw = ImageDraw.Draw(image)
+        for y in range(150, 2050, 45):
+            draw.line([(150, y), (1500, y)], fill=30, width=6)
+        buf = io.BytesIO()
+        image.save(buf, format="JPEG", quality=85)
+        pdf.add_page()
+        pdf.image(buf, x=0, y=0, w=210)
+
+    result = {}
+    for name, kinds in {
+        "text": ["text"] * pages,
+        "scanned": ["scan"] * pages,
+        "mixed": ["text" if i % 3 else "scan" for i in range(pages)],
+    }.items():
+        pdf = FPDF()
+        for n, kind in enumerate(kinds, start=1):
+            (text_page if kind == "text" else scanned_page)(pdf, n)
+        result[f"{name}-{pages}p"] = bytes(pdf.output())
+    return result
+
+
+def run(pdfs, make_model, live):
+    rows = []
+    for name, data in pdfs.items():
+        row = {"pdf": name, "size_kb": len(data) / 1024}
+        for strategy in ("multimodal", "local"):
+            model = make_model()
+            start = time.perf_counter()
+            try:
+                if strategy == "multimodal":
+                    explain_multimodal(model, data, "application/pdf", "Simple English")
+                else:
+                    explain_pdf(model, data, "Simple English")
+            except Exception as e:
+                row[f"{strategy}_error"] = str(e)
+            local_s = time.perf_counter() - start
+            total = local_s if live else local_s + model.seconds
+            row[f"{strategy}_kb_sent"] = model.bytes_sent / 1024
+            row[f"{strategy}_s"] = total
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", action="append", default=[], help="PDF file(s) to benchmark.")
+    parser.add_argument("--pages", type=int, default=6, help="Pages per synthetic PDF.")
+    parser.add_argument("--base-latency", type=float, default=2.0, help="Modelled seconds per Gemini call.")
+    parser.add_argument("--uplink-kbps", type=float, default=512, help="Modelled user uplink in kbit/s.")
+    parser.add_argument("--vision-page-seconds", type=float, default=2.5, help="Modelled vision cost per PDF page.")
+    parser.add_argument("--live", action="store_true", help="Call real Gemini (needs GOOGLE_API_KEY).")
+    args = parser.parse_args(argv)
+
+    if args.pdf:
+        pdfs = {os.path.basename(p): open(p, "rb").read() for p in args.pdf}
+    else:
+        pdfs = synthetic_pdfs(args.pages)
+
+    if args.live:
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+        make_model = lambda: CountingGemini(genai.GenerativeModel("gemini-2.5-flash"))
+    else:
+        make_model = lambda: ModelledGemini(args.base_latency, args.uplink_kbps, args.vision_page_seconds)
+
+    rows = run(pdfs, make_model, args.live)
+    print(f"{'pdf':<16}{'size KB':>9}{'multi KB':>10}{'local KB':>10}{'multi s':>9}{'local s':>9}")
+    for r in rows:
+        print(f"{r['pdf']:<16}{r['size_kb']:>9.1f}{r['multimodal_kb_sent']:>10.1f}{r['local_kb_sent']:>10.1f}"
+              f"{r['multimodal_s']:>9.2f}{r['local_s']:>9.2f}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
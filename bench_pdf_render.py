@@ -0,0 +1,114 @@
+"""Benchmark: document PDF render time and size, core fonts vs. cached Unicode fonts.
+
+For every DOC_CONFIG template, filled once with English values and once with
+names/addresses in Hindi, Kannada, Tamil and Telugu, it reports median ms per
+document and output KB for
+  - legacy:    core Arial, text forced through latin-1 (Indic text becomes '?')
+  - uncached:  Noto TTFs added from disk on every document (plain fpdf2 add_font)
+  - cached:    pdf_engine, fonts reduced and parsed once per process
+
+The Unicode modes need the Noto fonts listed in pdf_engine.FONT_FILES in --font-dir.
+
+Usage:
+    python bench_pdf_render.py --font-dir fonts
+    python bench_pdf_render.py --repeat 50         # fonts from NYAY_FONT_DIR / fonts-noto-core
+"""
+import argparse
+import statistics
+import time
+
+from fpdf import FPDF
+
+import pdf_engine
+from doc_templates import DOC_CONFIG, render_document
+
+MULTILINGUAL = ["रमेश कुमार", "ರಮೇಶ್ ಕುಮಾರ್", "ரமேஷ் குமார்", "రమేష్ కుమార్", "१२, गांधी रोड, पुणे"]
+
+
+def field_values(doc_type, multilingual):
+    values = {}
+    for i, field in enumerate(DOC_CONFIG[doc_type]["fields"]):
+        ftype = field.get("type", "text")
+        if ftype == "number":
+            values[field["id"]] = 15000
+        elif ftype == "date":
+            values[field["id"]] = "2026-01-01"
+        elif multilingual:
+            values[field["id"]] = MULTILINGUAL[i % len(MULTILINGUAL)]
+        else:
+            values[field["id"]] = f"Sample {field['label']}"
+    values["date"] = "January 01, 2026"
+    return values
+
+
+def render_legacy(text, doc_type):
+    font_dirs = pdf_engine.FONT_DIRS
+    pdf_engine.FONT_DIRS = []  # no fonts found -> core-font path
+    try:
+        return pdf_engine.create_pdf_bytes(text, doc_type)
+    finally:
+        pdf_engine.FONT_DIRS = font_dirs
+
+
+def render_uncached(text, doc_type):
+    pdf = FPDF()
+    families = [pdf_engine.BASE_FAMILY] + [f for f, p in pdf_engine.SCRIPT_PATTERNS.items() if p.search(text)]
+    families = [f for f in families if pdf_engine._font_path(f, "") is not None]
+    for family in families:
+        path = pdf_engine._font_path(family, "")
+        for style in ("", "B"):
+            pdf.add_font(family, style, pdf_engine._font_path(family, style) or path)
+    if len(families) > 1:
+        pdf.set_fallback_fonts(families[1:], exact_match=False)
+    if pdf_engine.TEXT_SHAPING:
+        pdf.set_text_shaping(True)
+    pdf.add_page()
+    pdf.set_font(pdf_engine.BASE_FAMILY, "B", 14)
+    pdf.cell(0, 10, doc_type.upper(), 0, 1, "C")
+    pdf.set_font(pdf_engine.BASE_FAMILY, size=11)
+    pdf.multi_cell(0, 7, text)
+    return bytes(pdf.output())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--font-dir", help="Directory with the Noto TTF files (default: pdf_engine.FONT_DIRS).")
+    parser.add_argument("--repeat", type=int, default=10, help="Renders per template and mode.")
+    args = parser.parse_args(argv)
+    if args.font_dir:
+        pdf_engine.FONT_DIRS = [args.font_dir]
+
+    modes = {"legacy": render_legacy}
+    if pdf_engine.unicode_fonts_available():
+        modes.update({"uncached": render_uncached, "cached": pdf_engine.create_pdf_bytes})
+    else:
+        print(f"No {pdf_engine.FONT_FILES['notosans']['']} in {pdf_engine.FONT_DIRS}: only the legacy mode runs.")
+
+    print(f"{'values':<14}{'mode':<10}{'ms/doc':>8}{'p95 ms':>8}{'KB':>7}{'docs/s':>8}")
+    rows = []
+    for multilingual in (False, True):
+        texts = {t: render_document(t, field_values(t, multilingual)) for t in DOC_CONFIG}
+        for mode, render in modes.items():
+            timings, sizes = [], []
+            for doc_type, text in texts.items():
+                render(text, doc_type)  # warm-up: first use parses/reduces fonts
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    sizes.append(len(render(text, doc_type)))
+                    timings.append(time.perf_counter() - start)
+            timings.sort()
+            row = {
+                "values": "multilingual" if multilingual else "english",
+                "mode": mode,
+                "ms": statistics.median(timings) * 1000,
+                "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+                "kb": statistics.mean(sizes) / 1024,
+            }
+            rows.append(row)
+            print(f"{row['values']:<14}{mode:<10}{row['ms']:>8.1f}{row['p95_ms']:>8.1f}{row['kb']:>7.1f}"
+                  f"{1000 / row['ms']:>8.1f}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Benchmark: QA API (qa_api.py) requests/s against a stub LLM.
+
+Starts qa_api with the real RAG chain around a stub chat model (fixed time to first
+token, then streamed words) and a keyword retriever, in `--workers` uvicorn
+processes, and drives it with `--concurrency` async clients. Reports, for
+  - answer:  POST /v1/answer (full JSON reply)
+  - stream:  POST /v1/answer/stream (NDJSON), with time to first token
+requests/s and median / p95 latency. Numbers measure our server, not Gemini.
+
+Usage:
+    python bench_qa_api.py --requests 500 --concurrency 50 --llm-latency 0.2
+    python bench_qa_api.py --workers 4 --answer-mode llm
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from load_test import LANGUAGES, QUESTIONS, Latency, StubGenerativeModel, make_stub_retriever
+
+TOKENS_PER_ANSWER = 40
+
+
+def make_streaming_stub_llm(first_token_seconds, token_seconds):
+    """A Runnable that streams a deterministic answer word by word, like a chat model."""
+    from langchain_core.runnables import RunnableGenerator
+
+    def _words(prompt_value):
+        tag = abs(hash(prompt_value.to_string())) % 10 ** 8
+        return [f"Step {i % 5 + 1} ({tag}): keep your papers safe. " for i in range(TOKENS_PER_ANSWER)]
+
+    def _stream(inputs):
+        for prompt_value in inputs:
+            time.sleep(first_token_seconds)
+            for i, word in enumerate(_words(prompt_value)):
+                if i:
+                    time.sleep(token_seconds)
+                yield word
+
+    async def _astream(inputs):
+        async for prompt_value in inputs:
+            await asyncio.sleep(first_token_seconds)
+            for i, word in enumerate(_words(prompt_value)):
+                if i:
+                    await asyncio.sleep(token_seconds)
+                yield word
+
+    return RunnableGenerator(_stream, _astream)
+
+
+def stub_app():
+    """uvicorn factory: qa_api with stub components; latencies come from the environment."""
+    import qa_api
+    from coalesce import SingleFlight
+    from rag_pipeline import build_rag_chain
+
+    first = float(os.environ["BENCH_LLM_LATENCY"])
+    per_token = float(os.environ["BENCH_TOKEN_LATENCY"])
+    retriever = make_stub_retriever()
+    return qa_api.create_app({
+        "retriever": retriever,
+        "chain": build_rag_chain(retriever, make_streaming_stub_llm(first, per_token)),
+        "model": StubGenerativeModel(Latency(first)),
+        "singleflight": SingleFlight(),
+    })
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def payloads(count):
+    # Distinct questions, so singleflight never collapses requests.
+    return [{
+        "question": f"{QUESTIONS[i % len(QUESTIONS)]} (case {i})",
+        "language": LANGUAGES[i % len(LANGUAGES)],
+        "chat_history": [{"role": "user", "content": QUESTIONS[(i + 1) % len(QUESTIONS)]},
+                         {"role": "assistant", "content": "1. Stay calm. 2. Collect your papers."}],
+    } for i in range(count)]
+
+
+async def _one(http, path, body):
+    """(latency, time to first token or None, ok) for one request."""
+    start = time.perf_counter()
+    first_token, ok = None, False
+    if path.endswith("/stream"):
+        async with http.stream("POST", path, json=body) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "token" and first_token is None:
+                    first_token = time.perf_counter() - start
+                ok = event["type"] == "done"
+    else:
+        response = await http.post(path, json=body)
+        ok = response.status_code == 200 and bool(response.json().get("answer"))
+    return time.perf_counter() - start, first_token, ok
+
+
+async def drive(base_url, path, bodies, concurrency):
+    """Sends `bodies` with `concurrency` requests in flight; returns (results, wall seconds)."""
+    pending = list(reversed(bodies))
+    results = []
+
+    async def client(http):
+        while pending:
+            body = pending.pop()
+            try:
+                results.append(await _one(http, path, body))
+            except httpx.HTTPError:
+                results.append((0.0, None, False))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        return results, time.perf_counter() - start
+
+
+def start_server(port, args):
+    env = dict(os.environ, BENCH_LLM_LATENCY=str(args.llm_latency), BENCH_TOKEN_LATENCY=str(args.token_latency),
+               NYAY_ANSWER_MODE=args.answer_mode)
+    env.pop("NYAY_QA_API_KEY", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench_qa_api:stub_app", "--factory", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("qa_api did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub time to first token (s).")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Stub delay between tokens (s).")
+    parser.add_argument("--answer-mode", choices=["llm", "auto", "extractive"], default="llm",
+                        help="NYAY_ANSWER_MODE for the server.")
+    args = parser.parse_args(argv)
+
+    port = _free_port()
+    server = start_server(port, args)
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"{args.workers} worker(s), {args.concurrency} in flight, stub LLM {args.llm_latency * 1000:.0f} ms "
+          f"+ {TOKENS_PER_ANSWER} tokens x {args.token_latency * 1000:.0f} ms, mode {args.answer_mode}")
+    print(f"{'endpoint':<10}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'TTFT ms':>9}{'errors':>8}")
+    rows = []
+    try:
+        asyncio.run(drive(base_url, "/v1/answer", payloads(min(20, args.requests)), 5))  # warm-up
+        for name, path in (("answer", "/v1/answer"), ("stream", "/v1/answer/stream")):
+            results, wall = asyncio.run(drive(base_url, path, payloads(args.requests), args.concurrency))
+            latencies = sorted(r[0] for r in results)
+            first_tokens = [r[1] for r in results if r[1] is not None]
+            row = {
+                "endpoint": name,
+                "rps": len(results) / wall,
+                "p50_ms": statistics.median(latencies) * 1000,
+                "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+                "ttft_ms": statistics.median(first_tokens) * 1000 if first_tokens else None,
+                "errors": sum(not r[2] for r in results),
+            }
+            rows.append(row)
+            ttft = f"{row['ttft_ms']:>9.0f}" if row["ttft_ms"] is not None else f"{'-':>9}"
+            print(f"{name:<10}{row['rps']:>8.1f}{row['p50_ms']:>8.0f}{row['p95_ms']:>8.0f}{ttft}{row['errors']:>8}")
+    finally:
+        server.terminate()
+        server.wait()
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark: TTS backends, synthesis latency and CPU cost per second of audio.
+
+For each available backend (gtts needs internet, espeak needs espeak-ng on PATH)
+and each app language it synthesizes a short legal explanation, segment by
+segment through the same worker pool as the app but without the audio cache,
+and reports
+  - latency:      wall seconds until the stitched audio is ready
+  - cpu/audio-s:  CPU seconds (this process + child processes) per audio second
+  - rtf:          real-time factor, latency / audio seconds (lower is better)
+
+Usage:
+    python bench_tts.py                         # every backend that works here
+    python bench_tts.py --backend espeak --repeat 5
+"""
+import argparse
+import io
+import resource
+import time
+import wave
+
+import tts
+
+SAMPLES = {
+    "Simple English": "Your landlord must give you written notice before asking you to leave. "
+                      "Keep a copy of every rent receipt. You can approach the rent controller if the notice is unfair.",
+    "Hindi (in Roman script)": "Makaan maalik ko aapko ghar khaali karne se pehle likhit notice dena hoga. "
+                               "Har kiraaye ki raseed ki ek copy rakhein.",
+    "Kannada": "ನಿಮ್ಮ ಮನೆ ಮಾಲೀಕರು ಲಿಖಿತ ನೋಟಿಸ್ ನೀಡಬೇಕು. ಪ್ರತಿ ಬಾಡಿಗೆ ರಸೀದಿಯ ಪ್ರತಿಯನ್ನು ಇಟ್ಟುಕೊಳ್ಳಿ.",
+    "Tamil": "உங்கள் வீட்டு உரிமையாளர் எழுத்து மூலம் அறிவிப்பு கொடுக்க வேண்டும். ஒவ்வொரு வாடகை ரசீதின் நகலையும் வைத்திருங்கள்.",
+    "Telugu": "మీ ఇంటి యజమాని రాతపూర్వక నోటీసు ఇవ్వాలి. ప్రతి అద్దె రసీదు కాపీని ఉంచుకోండి.",
+    "Marathi": "घरमालकाने तुम्हाला लेखी नोटीस दिली पाहिजे. प्रत्येक भाड्याच्या पावतीची प्रत ठेवा.",
+}
+
+_MPEG_BITRATES = {  # kbit/s by bitrate index, Layer III
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MPEG_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def mp3_seconds(data):
+    """Duration of an MPEG Layer III stream by walking its frame headers."""
+    seconds, i = 0.0, 0
+    while i + 4 <= len(data):
+        if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+            i += 1
+            continue
+        version = (data[i + 1] >> 3) & 3  # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+        bitrate_index = data[i + 2] >> 4
+        rate_index = (data[i + 2] >> 2) & 3
+        if version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+            i += 1
+            continue
+        bitrate = _MPEG_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        rate = _MPEG_RATES[version][rate_index]
+        samples = 1152 if version == 3 else 576
+        padding = (data[i + 2] >> 1) & 1
+        i += samples // 8 * bitrate // rate + padding
+        seconds += samples / rate
+    return seconds
+
+
+def wav_seconds(data):
+    with wave.open(io.BytesIO(data), "rb") as reader:
+        frames = len(reader.readframes(reader.getnframes()))
+        return frames / (reader.getsampwidth() * reader.getnchannels()) / reader.getframerate()
+
+
+def cpu_seconds():
+    own = time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own + children.ru_utime + children.ru_stime
+
+
+def synthesize_uncached(backend, text, language):
+    lang_code = tts.lang_code_map[language]
+    segments = tts.split_segments(tts.strip_markdown(text))
+    parts = list(tts._segment_pool.map(lambda segment: backend.synthesize(segment, lang_code), segments))
+    return backend.join(parts)
+
+
+def run(backend, repeat):
+    rows = []
+    for language, text in SAMPLES.items():
+        row = {"backend": backend.name, "language": language}
+        try:
+            latencies, cpu, audio_s = [], 0.0, 0.0
+            for _ in range(repeat):
+                cpu_start, start = cpu_seconds(), time.perf_counter()
+                audio = synthesize_uncached(backend, text, language)
+                latencies.append(time.perf_counter() - start)
+                cpu += cpu_seconds() - cpu_start
+                audio_s += mp3_seconds(audio) if backend.mime == "audio/mp3" else wav_seconds(audio)
+            latencies.sort()
+            row.update({
+                "latency_s": latencies[len(latencies) // 2],
+                "audio_s": audio_s / repeat,
+                "cpu_per_audio_s": cpu / audio_s if audio_s else None,
+                "rtf": sum(latencies) / audio_s if audio_s else None,
+                "kb": len(audio) / 1024,
+            })
+        except Exception as e:
+            row["error"] = str(e)
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", action="append", choices=sorted(tts.TTS_BACKENDS),
+                        help="Backend(s) to benchmark (default: all that are available).")
+    parser.add_argument("--repeat", type=int, default=3, help="Syntheses per language.")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for name in args.backend or sorted(tts.TTS_BACKENDS):
+        try:
+            backend = tts.TTS_BACKENDS[name]()
+        except Exception as e:
+            print(f"skipping {name}: {e}")
+            continue
+        rows.extend(run(backend, args.repeat))
+
+    print(f"{'backend':<8}{'language':<25}{'latency s':>10}{'audio s':>9}{'cpu/audio s':>12}{'rtf':>7}{'KB':>8}")
+    for r in rows:
+        if "error" in r:
+            print(f"{r['backend']:<8}{r['language']:<25}  error: {r['error']}")
+            continue
+        print(f"{r['backend']:<8}{r['language']:<25}{r['latency_s']:>10.3f}{r['audio_s']:>9.2f}"
+              f"{r['cpu_per_audio_s']:>12.4f}{r['rtf']:>7.3f}{r['kb']:>8.1f}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
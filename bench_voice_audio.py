@@ -0,0 +1,141 @@
+"""Benchmark: Voice Mode upload size and latency, raw WAV vs. preprocessed clip.
+
+For each clip it reports size and duration before and after preprocessing
+(mono, 16 kHz, silence trimmed, Opus or 16 kHz WAV), the local preprocessing
+time, and the end-to-end voice answer latency for
+  - raw:       the recorded WAV as the browser sends it
+  - processed: preprocess_audio output
+
+Without --live, Gemini is modelled as base latency + upload time on a slow link
++ audio seconds * per-second cost, so the preprocessing time is real and the
+network part is deterministic.
+
+Usage:
+    python bench_voice_audio.py                         # synthetic recordings
+    python bench_voice_audio.py --wav question.wav --uplink-kbps 256
+    GOOGLE_API_KEY=... python bench_voice_audio.py --live --wav question.wav
+"""
+import argparse
+import io
+import os
+import time
+import wave
+
+import numpy as np
+
+import audio_preprocess
+from voice_pipeline import answer_voice_question
+
+
+class ModelledGemini:
+    """Latency model: base + bytes over the uplink + seconds of audio listened to."""
+
+    def __init__(self, base_s, uplink_kbps, audio_cost_s):
+        self.base_s = base_s
+        self.uplink_kbps = uplink_kbps
+        self.audio_cost_s = audio_cost_s
+        self.clip_seconds = 0.0  # set by the caller; Opus is not decoded here
+        self.seconds = 0.0
+
+    def generate_content(self, contents, **kwargs):
+        prompt, part = contents
+        sent = len(prompt.encode("utf-8")) + len(part["data"])
+        self.seconds += self.base_s + sent * 8 / (self.uplink_kbps * 1000)
+        self.seconds += self.audio_cost_s * self.clip_seconds
+
+        class _Response:
+            text = "Answer."
+        return _Response()
+
+
+def synthetic_clips():
+    """Phone-like recordings: 48 kHz stereo / 44.1 kHz mono, voiced bursts between silences."""
+    rng = np.random.default_rng(7)
+
+    def clip(rate, channels, lead_s, bursts, tail_s):
+        parts = [0.003 * rng.standard_normal(int(lead_s * rate))]
+        for speech_s, pause_s in bursts:
+            t = np.arange(int(speech_s * rate)) / rate
+            pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)
+            voiced = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / rate) / k for k in range(1, 6))
+            parts.append(0.2 * voiced * (0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 3 * t))))
+            parts.append(0.003 * rng.standard_normal(int(pause_s * rate)))
+        parts.append(0.003 * rng.standard_normal(int(tail_s * rate)))
+        mono = np.concatenate(parts)
+        pcm = (np.clip(np.repeat(mono[:, None], channels, axis=1), -1, 1) * 32767).astype("<i2")
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as writer:
+            writer.setnchannels(channels)
+            writer.setsampwidth(2)
+            writer.setframerate(rate)
+            writer.writeframes(pcm.tobytes())
+        return buf.getvalue()
+
+    return {
+        "short-48k-stereo": clip(48000, 2, 1.5, [(3.0, 0.4)], 2.0),
+        "long-44k-mono": clip(44100, 1, 1.0, [(4.0, 1.5), (5.0, 2.0), (3.0, 0.3)], 2.5),
+        "pausy-48k-mono": clip(48000, 1, 2.0, [(2.0, 3.0), (2.0, 3.0)], 1.0),
+    }
+
+
+def run(clips, make_model, live):
+    rows = []
+    for name, data in clips.items():
+        audio_preprocess._cache.clear()
+        start = time.perf_counter()
+        clip = audio_preprocess.preprocess_audio(data)
+        preprocess_s = time.perf_counter() - start
+        row = {
+            "clip": name,
+            "raw_kb": len(data) / 1024,
+            "raw_s": clip["original_seconds"],
+            "kb": len(clip["bytes"]) / 1024,
+            "s": clip["seconds"],
+            "mime_type": clip["mime_type"],
+            "preprocess_ms": preprocess_s * 1000,
+        }
+        for strategy, payload, mime_type, seconds in (
+            ("raw", data, "audio/wav", clip["original_seconds"]),
+            ("processed", clip["bytes"], clip["mime_type"], clip["seconds"]),
+        ):
+            model = make_model()
+            if not live:
+                model.clip_seconds = seconds or 0.0
+            start = time.perf_counter()
+            answer_voice_question(model, payload, "Simple English", mime_type)
+            elapsed = time.perf_counter() - start
+            if strategy == "processed":
+                elapsed += preprocess_s
+            row[f"{strategy}_latency_s"] = elapsed if live else elapsed + model.seconds
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", action="append", default=[], help="Recorded WAV clip(s) to benchmark.")
+    parser.add_argument("--base-latency", type=float, default=1.5, help="Modelled seconds per Gemini call.")
+    parser.add_argument("--uplink-kbps", type=float, default=512, help="Modelled user uplink in kbit/s.")
+    parser.add_argument("--audio-cost", type=float, default=0.05, help="Modelled model seconds per audio second.")
+    parser.add_argument("--live", action="store_true", help="Call real Gemini (needs GOOGLE_API_KEY).")
+    args = parser.parse_args(argv)
+
+    clips = {os.path.basename(p): open(p, "rb").read() for p in args.wav} if args.wav else synthetic_clips()
+    if args.live:
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+        make_model = lambda: genai.GenerativeModel("gemini-2.5-flash")
+    else:
+        make_model = lambda: ModelledGemini(args.base_latency, args.uplink_kbps, args.audio_cost)
+
+    rows = run(clips, make_model, args.live)
+    print(f"{'clip':<18}{'raw KB':>8}{'raw s':>7}{'KB':>7}{'s':>6}  {'codec':<10}{'prep ms':>8}"
+          f"{'raw lat s':>10}{'prep lat s':>11}")
+    for r in rows:
+        print(f"{r['clip']:<18}{r['raw_kb']:>8.0f}{r['raw_s'] or 0:>7.1f}{r['kb']:>7.0f}{r['s'] or 0:>6.1f}  "
+              f"{r['mime_type']:<10}{r['preprocess_ms']:>8.1f}{r['raw_latency_s']:>10.2f}{r['processed_latency_s']:>11.2f}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
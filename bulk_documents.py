@@ -0,0 +1,119 @@
+"""Bulk document generation: one DOC_CONFIG document per CSV/JSON/JSONL row, written into a ZIP.
+
+Every row is validated before any rendering starts. Valid rows are rendered in a
+process pool and streamed into the ZIP as they finish; invalid rows and render
+failures are listed in errors.csv inside the ZIP and in the returned report.
+
+Usage:
+    python bulk_documents.py "Affidavit/Self-Declaration" camp_rows.csv -o affidavits.zip
+    python bulk_documents.py --list
+"""
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from doc_templates import DOC_CONFIG, render_document, validate_values
+from pdf_engine import create_pdf_bytes
+from row_io import read_rows
+
+BULK_MAX_WORKERS = int(os.environ.get("NYAY_BULK_MAX_WORKERS", str(os.cpu_count() or 2)))
+BULK_CHUNK_SIZE = 8
+
+
+# --- RENDERING ---
+def _slug(text, limit=40):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(text)).strip("_")[:limit] or "row"
+
+
+def _render(job):
+    """Runs in a worker process: (row number, file name, PDF bytes or None, error or None)."""
+    number, doc_type, values = job
+    try:
+        pdf = create_pdf_bytes(render_document(doc_type, values), doc_type)
+    except Exception as e:
+        return number, None, None, f"render failed: {e}"
+    first_field = DOC_CONFIG[doc_type]["fields"][0]["id"]
+    return number, f"{number:05d}_{_slug(values[first_field])}.pdf", pdf, None
+
+
+def generate_batch(doc_type, rows, out, workers=BULK_MAX_WORKERS, progress=None):
+    """Validates `rows`, renders them in parallel and writes a ZIP to `out` (path or file object).
+
+    `progress(done, total)` is called as documents finish. Returns a report dict with
+    documents, errors [(row number, message)], seconds and docs_per_second.
+    """
+    if doc_type not in DOC_CONFIG:
+        raise ValueError(f"Unknown document type: {doc_type!r}")
+    start = time.perf_counter()
+    jobs, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        values, error = validate_values(doc_type, row)
+        if error:
+            errors.append((number, error))
+        else:
+            jobs.append((number, doc_type, values))
+
+    written = 0
+    # PDF streams are already compressed; storing them keeps the ZIP step cheap.
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as archive:
+        if jobs:
+            # "spawn": forking a server process that holds threads and DB handles is unsafe.
+            with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs))),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                for number, name, pdf, error in pool.map(_render, jobs, chunksize=BULK_CHUNK_SIZE):
+                    if error:
+                        errors.append((number, error))
+                    else:
+                        archive.writestr(name, pdf)
+                        written += 1
+                    if progress is not None:
+                        progress(written + len(errors), len(rows))
+        if errors:
+            errors.sort()
+            report = io.StringIO()
+            writer = csv.writer(report)
+            writer.writerow(["row", "error"])
+            writer.writerows(errors)
+            archive.writestr("errors.csv", report.getvalue())
+
+    seconds = time.perf_counter() - start
+    return {
+        "documents": written,
+        "errors": errors,
+        "seconds": seconds,
+        "docs_per_second": written / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("doc_type", nargs="?", help="A DOC_CONFIG document type (see --list).")
+    parser.add_argument("rows", nargs="?", help="CSV, JSON or JSONL file with one row per document.")
+    parser.add_argument("-o", "--output", default="documents.zip", help="ZIP file to write.")
+    parser.add_argument("--workers", type=int, default=BULK_MAX_WORKERS)
+    parser.add_argument("--list", action="store_true", help="List document types and their fields.")
+    args = parser.parse_args(argv)
+
+    if args.list or not (args.doc_type and args.rows):
+        for doc_type, config in DOC_CONFIG.items():
+            print(f"{doc_type}: {', '.join(field['id'] for field in config['fields'])}")
+        return None
+
+    with open(args.rows, "rb") as f:
+        rows = read_rows(f.read(), args.rows)
+    report = generate_batch(args.doc_type, rows, args.output, workers=args.workers)
+    print(f"{report['documents']} documents in {report['seconds']:.2f}s "
+          f"({report['docs_per_second']:.1f} docs/s) -> {args.output}")
+    for number, error in report["errors"]:
+        print(f"  row {number}: {error}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
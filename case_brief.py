@@ -0,0 +1,143 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from case_classifier import CATEGORY_EXAMPLES, GENERAL
+from conversation_memory import MAX_TURN_CHARS, _clip
+
+# --- RUNNING CASE BRIEF ---
+# The Find Lawyer brief is kept up to date while the user chats: after every answered
+# turn or explained document, a background worker folds just the new information into
+# the current brief with one small LLM call, which also names the category (the local
+# classifier overrides it when confident). Pressing "Generate Case Brief" then shows
+# the brief at once instead of re-reading the whole history.
+
+BRIEF_WAIT_SECONDS = 8.0    # how long the button waits for an update still in progress
+MAX_DOCUMENT_CHARS = 2000
+
+_brief_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="case-brief")
+
+BRIEF_UPDATE_PROMPT = """
+You maintain a short professional brief of a citizen's legal matter, for a lawyer to read.
+Update the brief with the new information below. Keep the facts (parties, dates, places, amounts,
+documents, deadlines) and what the citizen wants. Ignore greetings and general advice.
+Also pick the ONE category that fits the matter best: {categories}. If none fits, pick "General".
+
+Answer in exactly this format, in English:
+CATEGORY: <category name>
+BRIEF: <the updated brief, exactly 3 sentences>
+
+CURRENT BRIEF:
+{brief}
+
+NEW INFORMATION:
+{new_information}
+"""
+
+
+def update_brief(model, brief, new_information):
+    """Folds the `new_information` strings into `brief` with one LLM call. Raises on model errors.
+
+    Returns (brief, category); category is None when the model's answer names none.
+    """
+    categories = list(CATEGORY_EXAMPLES)
+    prompt = BRIEF_UPDATE_PROMPT.format(categories=", ".join(categories), brief=brief or "(empty)",
+                                        new_information="\n\n".join(new_information))
+    text = model.generate_content(prompt).text.strip()
+    category, lines = None, []
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().upper() == "CATEGORY" and category is None:
+            category = next((c for c in categories if c.lower() in value.lower()), GENERAL)
+        elif key.strip().upper() == "BRIEF":
+            lines.append(value.strip())
+        else:
+            lines.append(line.strip())
+    text = " ".join(line for line in lines if line)
+    if not text:
+        raise ValueError("Empty brief from model")
+    return text, category
+
+
+class RunningCaseBrief:
+    """Brief and category for one session, updated from a worker thread."""
+
+    def __init__(self):
+        self.brief = None
+        self.category = GENERAL
+        self._pending = []         # new information not yet folded into the brief
+        self._pieces = []          # user messages and document text, for the classifier
+        self._lock = threading.Lock()
+        self._updating = False
+        self._future = None
+        self.error = None
+        self.document_digest = None  # the uploaded file already folded in
+
+    def add_turn(self, user, assistant, model, classifier=None):
+        """Records a finished chat turn and schedules a brief update off the render path."""
+        info = f"User: {_clip(user, MAX_TURN_CHARS)}\nAssistant: {_clip(assistant, MAX_TURN_CHARS)}"
+        self._add(info, user, model, classifier)
+
+    def add_document(self, text, model, classifier=None, digest=None):
+        """Records an uploaded document (its key passages) and schedules a brief update.
+
+        With the file's `digest`, the same file explained again (e.g. in another
+        language) is not folded in a second time.
+        """
+        if digest is not None:
+            if digest == self.document_digest:
+                return
+            self.document_digest = digest
+        clipped = _clip(text, MAX_DOCUMENT_CHARS)
+        self._add(f"Uploaded document: {clipped}", clipped, model, classifier)
+
+    def _add(self, info, piece, model, classifier):
+        with self._lock:
+            self._pending.append(info)
+            self._pieces.append(piece)
+            self.error = None
+            if not self._updating:
+                self._updating = True
+                self._future = _brief_pool.submit(self._update, model, classifier)
+
+    def _update(self, model, classifier):
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+                brief, pieces = self.brief, list(self._pieces)
+                if not pending:
+                    self._updating = False
+                    return
+            try:
+                new_brief, llm_category = update_brief(model, brief, pending)
+                local_category = classifier.decide(pieces) if classifier is not None else None
+            except Exception as e:
+                # Leave the information pending; the button falls back to a full analysis.
+                with self._lock:
+                    self.error = e
+                    self._updating = False
+                return
+            with self._lock:
+                self.brief = new_brief
+                self.category = local_category or llm_category or self.category
+                del self._pending[:len(pending)]
+
+    def ready(self):
+        """True when the brief covers everything recorded so far."""
+        with self._lock:
+            return self.brief is not None and not self._pending
+
+    def snapshot(self):
+        """(brief, category) as of the last finished update."""
+        with self._lock:
+            return self.brief, self.category
+
+    def wait(self, timeout=None):
+        """Waits for the update in progress; returns ready()."""
+        future = self._future
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except FutureTimeout:
+                pass
+        return self.ready()
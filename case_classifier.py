@@ -0,0 +1,182 @@
+import os
+import threading
+
+import numpy as np
+
+# --- LOCAL CASE CATEGORY CLASSIFIER ---
+# Picks the Find Lawyer category with the MiniLM embedder the app already has loaded:
+# each category is the normalized mean (centroid) of a few example case descriptions,
+# and a case goes to the nearest centroid. Only when the best match is weak or close
+# to the runner-up is the category left to the LLM.
+#
+# The margin a prediction needs is calibrated for the loaded embedder when the centroids
+# are built: each example is classified against centroids built without it, and the
+# margin is the lowest at which those held-out predictions are still TARGET_PRECISION
+# accurate. An embedder that cannot reach that precision never decides locally.
+# NYAY_LOCAL_CATEGORY=0 sends every case to the LLM.
+
+GENERAL = "General"
+
+CATEGORY_EXAMPLES = {
+    "Family Law": [
+        "My husband wants a divorce and I want custody of our children.",
+        "My wife left the house and is not letting me meet my son.",
+        "I need maintenance from my husband after separation.",
+        "My in-laws harass me for dowry and threaten to throw me out.",
+        "How do we register our marriage and change my surname?",
+        "My father died without a will and my brothers refuse to give me a share.",
+        "I want to adopt a child from my relative.",
+        "My husband beats me; can I get a protection order for domestic violence?",
+    ],
+    "Property Dispute": [
+        "My landlord is not returning my security deposit after I vacated.",
+        "The landlord is forcing me to leave the house without notice.",
+        "My neighbour has built a wall on my land.",
+        "The builder has not given possession of my flat after five years.",
+        "There is a dispute over the boundary of our agricultural land.",
+        "Someone made a fake sale deed of my plot and got it registered.",
+        "My tenant has stopped paying rent and will not vacate.",
+        "I need my name in the land records mutation after my father's death.",
+    ],
+    "Criminal Law": [
+        "The police arrested my brother without telling us why.",
+        "The police refused to register my FIR.",
+        "I have been falsely accused of theft and need bail.",
+        "Someone attacked me on the road and I was injured.",
+        "My son is in jail and we need anticipatory bail.",
+        "A man is stalking my daughter and threatening her.",
+        "I got a summons from the magistrate court in a cheating case.",
+        "My cheque bounced and they filed a criminal complaint against me.",
+    ],
+    "Consumer Rights": [
+        "A shop sold me a broken phone and refuses to replace it.",
+        "The company is not honouring the warranty on my fridge.",
+        "The hospital overcharged me and gave a wrong bill.",
+        "My online order never arrived and the seller will not refund.",
+        "The insurance company rejected my claim without reason.",
+        "The airline cancelled my flight and did not refund the ticket.",
+        "The bank charged hidden fees on my account.",
+        "I want to file a complaint in the consumer forum against a service provider.",
+    ],
+    "Corporate Law": [
+        "My business partner took money from our company account.",
+        "How do I register a private limited company?",
+        "A client has not paid invoices for our company's work.",
+        "There is a dispute between the directors and shareholders.",
+        "I need a contract drafted for a business deal with a supplier.",
+        "My employer has not paid salary for three months.",
+        "The company terminated me without notice or settlement.",
+        "We want to close our partnership firm and divide the assets.",
+    ],
+    "Cyber Crime": [
+        "Someone is threatening me online with my photos.",
+        "Money was stolen from my bank account through a fake UPI link.",
+        "My social media account was hacked and misused.",
+        "A person created a fake profile of me on Instagram.",
+        "I received an OTP fraud call and lost money.",
+        "Someone is blackmailing me with private videos.",
+        "My email was hacked and they are sending messages to my contacts.",
+        "I was cheated in an online job offer scam.",
+    ],
+}
+
+LOCAL_DECISIONS = os.environ.get("NYAY_LOCAL_CATEGORY", "1") == "1"
+MIN_SIMILARITY = 0.30   # cosine similarity to the best centroid (floor)
+MIN_MARGIN = 0.03       # best minus second-best similarity (floor under the calibrated margin)
+TARGET_PRECISION = 0.95
+MAX_PIECES = 12
+PIECE_CHARS = 1000
+
+
+def _unit(vector):
+    return vector / max(np.linalg.norm(vector), 1e-12)
+
+
+class CaseClassifier:
+    """Nearest-centroid classifier over an Embeddings model (embed_documents)."""
+
+    def __init__(self, embeddings, examples=CATEGORY_EXAMPLES, min_similarity=MIN_SIMILARITY,
+                 min_margin=None, target_precision=TARGET_PRECISION, local_decisions=LOCAL_DECISIONS):
+        self.embeddings = embeddings
+        self.local_decisions = local_decisions
+        self.examples = examples
+        self.min_similarity = min_similarity
+        self.target_precision = target_precision
+        self._min_margin = min_margin  # None: calibrated with the centroids
+        self.labels = list(examples)
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    def _embed(self, texts):
+        vectors = np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @property
+    def centroids(self):
+        """(categories, dim) matrix, embedded once on first use."""
+        self._build()
+        return self._centroids
+
+    @property
+    def min_margin(self):
+        """Margin a confident prediction needs; calibrated on first use unless given."""
+        self._build()
+        return self._min_margin
+
+    def _build(self):
+        with self._lock:
+            if self._centroids is not None:
+                return
+            vectors = [self._embed(self.examples[label]) for label in self.labels]
+            centroids = np.stack([_unit(v.sum(axis=0)) for v in vectors])
+            if self._min_margin is None:
+                self._min_margin = self._calibrate(vectors, centroids)
+            self._centroids = centroids
+
+    def _calibrate(self, vectors, centroids):
+        """Lowest margin (>= MIN_MARGIN) at which held-out examples reach target_precision."""
+        held_out = []  # (margin, correct)
+        for index, class_vectors in enumerate(vectors):
+            if len(class_vectors) < 2:
+                continue
+            total = class_vectors.sum(axis=0)
+            for vector in class_vectors:
+                scores = centroids @ vector
+                scores[index] = _unit(total - vector) @ vector
+                best, runner_up = np.sort(scores)[::-1][:2]
+                if best >= self.min_similarity:
+                    held_out.append((float(best - runner_up), int(np.argmax(scores)) == index))
+        held_out.sort(key=lambda item: -item[0])
+        margin, correct = float("inf"), 0
+        for count, (example_margin, is_correct) in enumerate(held_out, start=1):
+            correct += is_correct
+            if correct / count >= self.target_precision:
+                margin = example_margin
+        return max(margin, MIN_MARGIN)
+
+    def scores(self, pieces):
+        """{category: cosine similarity} for a case given as text pieces (messages, passages)."""
+        pieces = [p[:PIECE_CHARS] for p in pieces if p and p.strip()][-MAX_PIECES:]
+        if not pieces:
+            return {}
+        case = self._embed(pieces).mean(axis=0)
+        case /= max(np.linalg.norm(case), 1e-12)
+        return dict(zip(self.labels, (self.centroids @ case).tolist()))
+
+    def classify(self, pieces):
+        """(category, confident). Weak or ambiguous matches return confident=False."""
+        scores = self.scores(pieces)
+        if not scores:
+            return GENERAL, False
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        best, runner_up = ranked[0], ranked[1] if len(ranked) > 1 else (None, -1.0)
+        confident = best[1] >= self.min_similarity and best[1] - runner_up[1] >= self.min_margin
+        return best[0], confident
+
+    def decide(self, pieces):
+        """The category when local decisions are on and the match is confident, else None (ask the LLM)."""
+        if not self.local_decisions:
+            return None
+        category, confident = self.classify(pieces)
+        return category if confident else None
@@ -0,0 +1,83 @@
+import hashlib
+import threading
+
+
+# --- KEY HELPERS ---
+def normalize_prompt(text):
+    """Lower-cases and collapses whitespace so trivially different prompts share a key."""
+    return " ".join(str(text).casefold().split())
+
+
+def content_hash(data):
+    """SHA-256 of a str or bytes payload (documents, chat history, uploads)."""
+    if data is None:
+        data = b""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(kind, prompt, language, *context):
+    """Builds a coalescing key from the normalized prompt, language and context hashes."""
+    parts = [kind, normalize_prompt(prompt), language or ""]
+    parts.extend(content_hash(c) for c in context)
+    return content_hash("\x1f".join(parts))
+
+
+# --- SINGLEFLIGHT ---
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one upstream call.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running wait and receive the same result or
+    exception. Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {"calls": 0, "executed": 0, "collapsed": 0, "errors": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+                self._stats["executed"] += 1
+            else:
+                self._stats["collapsed"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = len(self._in_flight)
+        return snapshot
@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- ROLLING CONVERSATION MEMORY ---
+# Keeps prompt size flat in long chats: older turns are folded into a short running
+# summary by a background worker, and only the latest turn is sent verbatim.
+
+MAX_SUMMARY_CHARS = 1200
+MAX_VERBATIM_TURNS = 2      # upper bound if the summarizer falls behind
+MAX_TURN_CHARS = 1500       # per message, for the verbatim part
+
+_summary_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat-summary")
+
+SUMMARY_PROMPT = """
+You maintain a short running summary of a conversation between a citizen and 'Nyay-Saathi', a legal help assistant.
+Update the summary with the new exchanges below. Keep the facts of the user's situation (who, what, when, where,
+amounts, documents), what they asked and the key advice already given. Drop greetings and repetition.
+Write in English, at most 120 words, as plain sentences.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW EXCHANGES:
+{turns}
+
+UPDATED SUMMARY:
+"""
+
+
+def _clip(text, limit):
+    text = str(text)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _format_turns(turns):
+    return "\n".join(
+        f"user: {_clip(user, MAX_TURN_CHARS)}\nassistant: {_clip(assistant, MAX_TURN_CHARS)}"
+        for user, assistant in turns
+    )
+
+
+def summarize_turns(model, summary, turns):
+    """Folds `turns` into `summary` with one small LLM call; degrades to truncation on errors."""
+    if model is not None:
+        try:
+            prompt = SUMMARY_PROMPT.format(summary=summary or "(empty)", turns=_format_turns(turns))
+            response = model.generate_content(prompt)
+            text = response.text.strip()
+            if text:
+                return _clip(text, MAX_SUMMARY_CHARS)
+        except Exception:
+            pass
+    # No model / model failed: keep the user's side of the older turns, newest last.
+    folded = " ".join([summary] + [f"User said: {_clip(user, 300)}" for user, _ in turns]).strip()
+    return folded[-MAX_SUMMARY_CHARS:]
+
+
+class ConversationMemory:
+    """Running summary plus the most recent turn(s), safe to update from a worker thread."""
+
+    def __init__(self):
+        self.summary = ""
+        self._turns = []           # (user, assistant) not yet folded into the summary
+        self._lock = threading.Lock()
+        self._folding = False
+        self._future = None
+
+    def add_turn(self, user, assistant, model=None):
+        """Records a finished turn and schedules folding of the older ones in the background."""
+        with self._lock:
+            self._turns.append((user, assistant))
+            if len(self._turns) > 1 and not self._folding:
+                self._folding = True
+                self._future = _summary_pool.submit(self._fold, model)
+
+    def _fold(self, model):
+        while True:
+            with self._lock:
+                pending = list(self._turns[:-1])
+                summary = self.summary
+                if not pending:
+                    self._folding = False
+                    return
+            try:
+                new_summary = summarize_turns(model, summary, pending)
+            except BaseException:
+                with self._lock:
+                    self._folding = False
+                raise
+            with self._lock:
+                self.summary = new_summary
+                del self._turns[:len(pending)]
+
+    def render(self):
+        """The chat-history text for prompts: summary, then the latest turn verbatim."""
+        with self._lock:
+            summary = self.summary
+            recent = self._turns[-MAX_VERBATIM_TURNS:]
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation: {summary}")
+        if recent:
+            parts.append(_format_turns(recent))
+        return "\n".join(parts)
+
+    def wait(self, timeout=None):
+        """Blocks until the background summary is up to date (used by tools and tests)."""
+        future = self._future
+        if future is not None:
+            future.result(timeout=timeout)
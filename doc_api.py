@@ -0,0 +1,148 @@
+"""Headless document-rendering API: DOC_CONFIG templates in, PDF bytes out.
+
+Imports only the template registry and the PDF engine (no Streamlit, LangChain
+or torch), so it starts in well under a second and renders on one core.
+
+    GET  /health
+    GET  /documents                      -> {doc_type: [field ids]}
+    POST /documents/render               {"doc_type": ..., "values": {...}} -> application/pdf
+
+Set NYAY_DOC_API_KEY to require an "X-API-Key" header.
+
+Usage:
+    python doc_api.py --port 8502
+    curl -s localhost:8502/documents/render -d '{"doc_type": "Simple Will", "values": {...}}' -o will.pdf
+"""
+import argparse
+import hashlib
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from doc_templates import DOC_CONFIG, render_document, validate_values
+from memory_cache import MemoryLRU
+from pdf_engine import create_pdf_bytes
+
+DOC_API_HOST = os.environ.get("NYAY_DOC_API_HOST", "127.0.0.1")
+DOC_API_PORT = int(os.environ.get("NYAY_DOC_API_PORT", "8502"))
+DOC_API_KEY = os.environ.get("NYAY_DOC_API_KEY")
+DOC_API_CACHE_ENTRIES = int(os.environ.get("NYAY_DOC_API_CACHE_ENTRIES", "256"))
+MAX_BODY_BYTES = 256 * 1024
+
+_pdf_cache = MemoryLRU(DOC_API_CACHE_ENTRIES)
+
+
+def render_pdf(doc_type, values):
+    """(PDF bytes, None) or (None, error). Identical requests are served from a small LRU."""
+    if doc_type not in DOC_CONFIG:
+        return None, f"Unknown doc_type {doc_type!r}"
+    clean, error = validate_values(doc_type, values)
+    if error:
+        return None, error
+    key = hashlib.sha256(json.dumps([doc_type, clean], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    cached = _pdf_cache.get(key)
+    if cached is not None:
+        return cached, None
+    pdf = create_pdf_bytes(render_document(doc_type, clean), doc_type)
+    _pdf_cache.set(key, pdf)
+    return pdf, None
+
+
+class DocumentAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for partner clients
+    # Headers and body go out in separate writes; with Nagle on, each reply waits ~40 ms for an ACK.
+    disable_nagle_algorithm = True
+    server_version = "NyaySaathiDocs/1.0"
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        if DOC_API_KEY and self.headers.get("X-API-Key") != DOC_API_KEY:
+            self._send(401, {"error": "Missing or invalid X-API-Key"})
+            return False
+        return True
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/documents":
+            if self._authorized():
+                self._send(200, {t: [f["id"] for f in c["fields"]] for t, c in DOC_CONFIG.items()})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        # The body is not read on these errors, so the connection cannot be reused.
+        length_header = (self.headers.get("Content-Length") or "0").strip()
+        if not (length_header.isascii() and length_header.isdigit()):
+            self.close_connection = True
+            self._send(400, {"error": "Invalid Content-Length"})
+            return
+        length = int(length_header)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": "Request body too large"})
+            return
+        body = self.rfile.read(length)
+        if self.path != "/documents/render":
+            self._send(404, {"error": "Not found"})
+            return
+        if not self._authorized():
+            return
+        try:
+            request = json.loads(body or b"{}")
+            doc_type, values = request["doc_type"], request.get("values") or {}
+            if not isinstance(doc_type, str):
+                raise ValueError("doc_type must be a string")
+            if not isinstance(values, dict):
+                raise ValueError("values must be an object")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"Expected {{\"doc_type\": ..., \"values\": {{...}}}}: {e}"})
+            return
+        try:
+            pdf, error = render_pdf(doc_type, values)
+        except Exception as e:
+            self._send(500, {"error": f"Render failed: {e}"})
+            return
+        if error:
+            self._send(422, {"error": error})
+            return
+        file_name = doc_type.replace(" ", "_").replace("/", "_") + "_Draft.pdf"
+        self._send(200, pdf, "application/pdf", {"Content-Disposition": f'attachment; filename="{file_name}"'})
+
+    def log_message(self, format, *args):
+        pass  # per-request logging costs more than a cached render
+
+
+def make_server(host=DOC_API_HOST, port=DOC_API_PORT):
+    server = ThreadingHTTPServer((host, port), DocumentAPIHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=DOC_API_HOST)
+    parser.add_argument("--port", type=int, default=DOC_API_PORT)
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port)
+    print(f"Serving documents on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import hashlib
+import os
+
+from disk_cache import DiskLRU
+
+# --- EXPLAIN RESULT CACHE ---
+# Extracted text is keyed by the file's SHA-256; explanations by (file hash, language,
+# prompt version). Bump EXPLAIN_PROMPT_VERSION whenever the explain prompts change.
+
+EXPLAIN_PROMPT_VERSION = "2"
+EXPLAIN_CACHE_MB = float(os.environ.get("NYAY_EXPLAIN_CACHE_MB", "64"))
+
+
+def file_hash(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class ExplainCache:
+    def __init__(self, max_mb=EXPLAIN_CACHE_MB, store=None):
+        self.store = store or DiskLRU("explain", int(max_mb * 1024 * 1024))
+
+    def get_text(self, digest):
+        value = self.store.get(f"text:{digest}")
+        return value.decode("utf-8") if value is not None else None
+
+    def set_text(self, digest, raw_text):
+        self.store.set(f"text:{digest}", raw_text.encode("utf-8"))
+
+    def get_explanation(self, digest, language):
+        value = self.store.get(f"explanation:{digest}:{language}:{EXPLAIN_PROMPT_VERSION}")
+        return value.decode("utf-8") if value is not None else None
+
+    def set_explanation(self, digest, language, explanation):
+        self.store.set(f"explanation:{digest}:{language}:{EXPLAIN_PROMPT_VERSION}", explanation.encode("utf-8"))
+
+    def find_explanation(self, digest, languages):
+        """Any cached explanation of this file in one of `languages`, as (language, text)."""
+        for language in languages:
+            explanation = self.get_explanation(digest, language)
+            if explanation is not None:
+                return language, explanation
+        return None, None
+
+    def stats(self):
+        return self.store.stats()
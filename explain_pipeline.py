@@ -0,0 +1,218 @@
+import json
+
+from coalesce import make_key
+from explain_cache import file_hash
+from stream_json import IncrementalJSONObject
+from pdf_extract import extract_pdf_text, has_unreadable_pages
+from prompt_packer import truncate_to_tokens
+from languages import lang_code_map
+
+EXPLAIN_TEXT_TOKEN_LIMIT = 30000
+# Ask Gemini for real JSON rather than JSON-in-markdown.
+EXPLAIN_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+UNREADABLE_TEXT = "Unable to extract text."
+TRUNCATION_NOTE = "\n\n_(The explanation was cut off. Click 'Explain!' again for the full version.)_"
+MISSING_PAGES_NOTE = ("\n\n_(Page(s) {pages} could not be read, so this explanation leaves them out. "
+                      "Click 'Explain!' again to retry them.)_")
+
+
+# --- EXPLAIN ("ASK") FLOW ---
+def build_explain_prompt(file_type, language):
+    return f"""
+    You are an AI assistant. The user has uploaded a document (MIME type: {file_type}).
+    Perform two tasks:
+    1. Explain the document in simple, everyday {language}.
+    2. Extract all raw text from the document.
+
+    Respond with ONLY a JSON object in this format, with "explanation" first:
+    {{
+      "explanation": "Your simple {language} explanation...",
+      "raw_text": "The raw extracted text..."
+    }}
+    """
+
+
+def build_text_explain_prompt(text, language):
+    return f"""
+    You are an AI assistant. Below is the text of a legal document the user uploaded.
+    Explain the document in simple, everyday {language}.
+    Respond with ONLY the explanation.
+
+    DOCUMENT TEXT:
+    {truncate_to_tokens(text, EXPLAIN_TEXT_TOKEN_LIMIT)}
+    """
+
+
+def build_translate_prompt(explanation, language):
+    return f"""
+    Translate the following explanation of a legal document into simple, everyday {language}.
+    Keep the meaning and structure. Respond with ONLY the translation.
+
+    EXPLANATION:
+    {explanation}
+    """
+
+
+def parse_explain_response(text):
+    """Returns (explanation, raw_text). Raises json.JSONDecodeError on malformed output."""
+    clean_response_text = text.strip().replace("```json", "").replace("```", "")
+    response_json = json.loads(clean_response_text)
+    explanation = response_json.get("explanation", "Unable to extract explanation.")
+    raw_text = response_json.get("raw_text", UNREADABLE_TEXT)
+    return explanation, raw_text
+
+
+def _chunk_text(chunk):
+    try:
+        return chunk.text
+    except ValueError:
+        # Chunks without text parts (e.g. a final safety/finish chunk)
+        return ""
+
+
+def stream_text(model, prompt, on_update):
+    """Streams a text-only response, calling on_update(text_so_far). Keeps partial text if cut off."""
+    text = ""
+    try:
+        for chunk in model.generate_content(prompt, stream=True):
+            text += _chunk_text(chunk)
+            on_update(text)
+    except Exception:
+        if not text.strip():
+            raise
+        return text.strip() + TRUNCATION_NOTE
+    return text.strip()
+
+
+def explain_multimodal(model, file_bytes, file_type, language, on_update=None):
+    """One Gemini call that both explains and transcribes the upload. Returns (explanation, raw_text).
+
+    With `on_update`, the JSON reply is streamed and parsed incrementally: the
+    explanation is passed to on_update(explanation_so_far) as it arrives. If the
+    stream is cut off before raw_text is complete, the explanation received so far
+    is kept with TRUNCATION_NOTE and raw_text is UNREADABLE_TEXT.
+    """
+    prompt_text_multi = build_explain_prompt(file_type, language)
+    data_part = {'mime_type': file_type, 'data': file_bytes}
+    if on_update is None:
+        response = model.generate_content([prompt_text_multi, data_part],
+                                          generation_config=EXPLAIN_GENERATION_CONFIG)
+        return parse_explain_response(response.text)
+
+    parser = IncrementalJSONObject()
+    try:
+        for chunk in model.generate_content([prompt_text_multi, data_part],
+                                            generation_config=EXPLAIN_GENERATION_CONFIG, stream=True):
+            parser.feed(_chunk_text(chunk))
+            explanation = parser.get("explanation")
+            if explanation:
+                on_update(explanation)
+    except Exception:
+        if not parser.get("explanation"):
+            raise
+
+    explanation = parser.get("explanation")
+    if not explanation:
+        raise json.JSONDecodeError("No explanation in the model response", "", 0)
+    # A stream that stopped before raw_text finished leaves partial text; never use
+    # that as the document (it would be cached and indexed for questions).
+    if "raw_text" not in parser.completed:
+        return explanation.strip() + TRUNCATION_NOTE, UNREADABLE_TEXT
+    return explanation, parser.get("raw_text") or UNREADABLE_TEXT
+
+
+def explain_text(model, text, language, on_update=None):
+    """Text-only explanation of already extracted document text."""
+    prompt = build_text_explain_prompt(text, language)
+    if on_update is not None:
+        return stream_text(model, prompt, on_update)
+    response = model.generate_content(prompt)
+    return response.text.strip()
+
+
+def translate_explanation(model, explanation, language, on_update=None):
+    """Re-uses an explanation from another language: a short text-only call."""
+    prompt = build_translate_prompt(explanation, language)
+    if on_update is not None:
+        return stream_text(model, prompt, on_update)
+    response = model.generate_content(prompt)
+    return response.text.strip()
+
+
+def explain_pdf(model, pdf_bytes, language, progress=None, on_update=None):
+    """Reads the PDF text layer locally (OCR only for scanned pages), then explains the text.
+
+    Falls back to the single multimodal call if the PDF cannot be parsed, has no text
+    at all, or OCR failed on every scanned page. If only some pages could not be read,
+    the explanation says which.
+    """
+    try:
+        raw_text, stats = extract_pdf_text(model, pdf_bytes, progress=progress)
+    except Exception:
+        raw_text, stats = "", {}
+    unreadable = stats.get("unreadable_pages", [])
+    if not raw_text.strip() or (unreadable and len(unreadable) == stats["ocr_pages"]):
+        return explain_multimodal(model, pdf_bytes, "application/pdf", language, on_update)
+    explanation = explain_text(model, raw_text, language, on_update)
+    if unreadable:
+        explanation += MISSING_PAGES_NOTE.format(pages=", ".join(map(str, unreadable)))
+    return explanation, raw_text
+
+
+def is_cacheable(explanation, raw_text):
+    """False for results of a failed read: cut-off explanation, unread pages or no text."""
+    return (not explanation.endswith(TRUNCATION_NOTE)
+            and raw_text.strip() not in ("", UNREADABLE_TEXT)
+            and not has_unreadable_pages(raw_text))
+
+
+def explain_cached(model, file_bytes, file_type, language, cache, progress=None, on_update=None):
+    """explain_document() backed by an ExplainCache.
+
+    Same file + language: no model call. Same file, new language: translate a cached
+    explanation (or explain the cached text) instead of re-reading the upload.
+    """
+    digest = file_hash(file_bytes)
+    raw_text = cache.get_text(digest)
+    explanation = cache.get_explanation(digest, language)
+    if raw_text is not None and explanation is not None:
+        return explanation, raw_text
+
+    if raw_text is not None:
+        other_languages = [l for l in lang_code_map if l != language]
+        _, other = cache.find_explanation(digest, other_languages)
+        if other is not None:
+            explanation = translate_explanation(model, other, language, on_update)
+        else:
+            explanation = explain_text(model, raw_text, language, on_update)
+    elif "pdf" in file_type:
+        explanation, raw_text = explain_pdf(model, file_bytes, language, progress, on_update)
+    else:
+        explanation, raw_text = explain_multimodal(model, file_bytes, file_type, language, on_update)
+
+    # Never cache a cut-off stream or text with unread pages; a transient OCR or quota
+    # error should not make this file unreadable for everyone until the cache is wiped.
+    if is_cacheable(explanation, raw_text):
+        cache.set_text(digest, raw_text)
+        cache.set_explanation(digest, language, explanation)
+    return explanation, raw_text
+
+
+def explain_document(model, file_bytes, file_type, language, singleflight=None, progress=None, cache=None,
+                     on_update=None):
+    """Explains an uploaded image or PDF. Returns (explanation, raw_text).
+
+    `progress(pages_done, total_pages)` is reported while PDF pages are extracted,
+    and `on_update(explanation_so_far)` while the explanation streams in.
+    With an ExplainCache, results are re-used across sessions and languages.
+    """
+    if cache is not None:
+        run, args = explain_cached, (model, file_bytes, file_type, language, cache, progress, on_update)
+    elif "pdf" in file_type:
+        run, args = explain_pdf, (model, file_bytes, language, progress, on_update)
+    else:
+        run, args = explain_multimodal, (model, file_bytes, file_type, language, on_update)
+    if singleflight is not None:
+        explain_key = make_key("explain", file_type, language, file_bytes)
+        return singleflight.do(explain_key, run, *args)
+    return run(*args)
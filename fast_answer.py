@@ -0,0 +1,109 @@
+import math
+import re
+from collections import Counter
+
+# --- EXTRACTIVE "QUICK ANSWER" ENGINE ---
+# Builds an action plan from the retrieved guide sections alone, with no LLM call.
+# Used when Gemini is slow/over quota, or always when ANSWER_MODE is "extractive".
+
+MAX_PLAN_STEPS = 4
+MIN_SENTENCE_CHARS = 30
+MAX_SENTENCE_CHARS = 400
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "of", "to", "in", "on", "for", "with", "at", "by",
+    "from", "is", "are", "was", "were", "be", "been", "it", "this", "that", "these", "those", "i",
+    "me", "my", "we", "our", "you", "your", "he", "she", "they", "them", "his", "her", "their",
+    "what", "which", "who", "how", "when", "where", "why", "do", "does", "did", "can", "could",
+    "should", "would", "will", "shall", "may", "not", "no", "so", "as", "any", "all", "there",
+    "has", "have", "had", "about", "into", "than", "then", "such", "under", "said",
+}
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?।])\s+|\n{2,}")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_MARKDOWN = re.compile(r"[*#_`>]+|^\s*[-\u2022]\s+")
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def split_sentences(text):
+    sentences = []
+    for raw in _SENTENCE_SPLIT.split(text):
+        sentence = " ".join(_MARKDOWN.sub(" ", raw).split())
+        if MIN_SENTENCE_CHARS <= len(sentence) <= MAX_SENTENCE_CHARS:
+            sentences.append(sentence)
+    return sentences
+
+
+def rank_sentences(question, passages, top_n=MAX_PLAN_STEPS):
+    """Ranks sentences from (source, text) passages by TF-IDF overlap with the question.
+
+    Returns a list of (score, sentence, source), best first, without near-duplicates.
+    """
+    candidates = []
+    for source, text in passages:
+        for sentence in split_sentences(text):
+            candidates.append((sentence, source, tokenize(sentence)))
+    if not candidates:
+        return []
+
+    query_terms = set(tokenize(question))
+    doc_freq = Counter()
+    for _, _, tokens in candidates:
+        doc_freq.update(set(tokens))
+    n = len(candidates)
+
+    scored = []
+    for position, (sentence, source, tokens) in enumerate(candidates):
+        if not tokens:
+            continue
+        tf = Counter(tokens)
+        score = sum(
+            (tf[term] / len(tokens)) * math.log(1 + n / doc_freq[term])
+            for term in query_terms if term in tf
+        )
+        # Tie-breaker favouring earlier sentences: retrieved chunks arrive best-first.
+        score += 0.01 / (1 + position)
+        scored.append((score, sentence, source, set(tokens)))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    picked = []
+    for score, sentence, source, token_set in scored:
+        if any(len(token_set & other) / max(1, len(token_set | other)) > 0.6 for _, _, _, other in picked):
+            continue
+        picked.append((score, sentence, source, token_set))
+        if len(picked) == top_n:
+            break
+    return [(score, sentence, source) for score, sentence, source, _ in picked]
+
+
+def _source_name(source):
+    name = str(source).replace("\\", "/").rsplit("/", 1)[-1]
+    return name.rsplit(".", 1)[0] if name.endswith(".txt") else name
+
+
+def build_action_plan(question, docs, language, document_context=None):
+    """Templates the top-ranked sentences into the usual 'simple action plan' shape.
+
+    Returns (answer_text, used_document).
+    """
+    passages = [(doc.metadata.get("source", "Legal guide"), doc.page_content) for doc in docs]
+    if document_context:
+        passages.append(("Your uploaded document", document_context))
+
+    ranked = [item for item in rank_sentences(question, passages) if item[0] > 0.01]
+    if not ranked:
+        return "I'm sorry, I don't have enough information on that. Please contact NALSA.", False
+
+    lines = ["**Quick answer (taken directly from the legal guides):**", ""]
+    for step, (_, sentence, source) in enumerate(ranked, start=1):
+        lines.append(f"{step}. {sentence} _(Source: {_source_name(source)})_")
+    lines.append(f"{len(ranked) + 1}. Keep copies of all your papers and write down dates and names.")
+    lines.append(f"{len(ranked) + 2}. For free help, contact your nearest NALSA / District Legal Services Authority.")
+    if language != "Simple English":
+        lines.extend(["", f"_(Quick mode could not translate this into {language}. Please ask again for a full answer.)_"])
+
+    used_document = any(source == "Your uploaded document" for _, _, source in ranked)
+    return "\n".join(lines), used_document
@@ -0,0 +1,110 @@
+import hashlib
+import io
+
+from PIL import Image, ImageFilter, ImageOps
+
+from memory_cache import MemoryLRU
+
+# --- UPLOAD PHOTO PREPROCESSING ---
+# Phone photos are several MB; Gemini reads documents just as well at ~200 dpi in grayscale.
+# Cropping and re-encoding a full-size photo is the slow part, so the result (JPEG,
+# preview thumbnail and the upload's SHA-256) is kept for the last CACHE_ENTRIES photos.
+
+MAX_SIDE = 1800           # px, long side (~200 dpi for an A4 page)
+JPEG_QUALITY = 80
+THUMBNAIL_SIDE = 600
+CACHE_ENTRIES = 32
+MIN_CROP_AREA = 0.25      # don't crop to a region smaller than this share of the photo
+
+_cache = MemoryLRU(CACHE_ENTRIES)
+
+
+def _otsu_threshold(histogram):
+    total = sum(histogram)
+    sum_all = sum(i * h for i, h in enumerate(histogram))
+    sum_bg, weight_bg, best, threshold = 0.0, 0, 0.0, 127
+    for i, h in enumerate(histogram):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
+
+
+def find_document_box(gray):
+    """Bounding box of the bright paper region, or None if the photo is (nearly) all paper."""
+    small = gray.copy()
+    small.thumbnail((400, 400))
+    threshold = _otsu_threshold(small.histogram())
+    mask = small.point(lambda p: 255 if p > threshold else 0).filter(ImageFilter.MinFilter(5))
+    box = mask.getbbox()
+    if box is None:
+        return None
+    sx, sy = gray.width / small.width, gray.height / small.height
+    left, top, right, bottom = box
+    area = (right - left) * (bottom - top) / (small.width * small.height)
+    if area < MIN_CROP_AREA or area > 0.95:
+        return None
+    margin_x, margin_y = int(0.01 * gray.width), int(0.01 * gray.height)
+    return (
+        max(0, int(left * sx) - margin_x),
+        max(0, int(top * sy) - margin_y),
+        min(gray.width, int(right * sx) + margin_x),
+        min(gray.height, int(bottom * sy) + margin_y),
+    )
+
+
+def _encode(image, quality=JPEG_QUALITY):
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _process(file_bytes):
+    image = Image.open(io.BytesIO(file_bytes))
+    image = ImageOps.exif_transpose(image)
+    gray = image.convert("L")
+
+    box = find_document_box(gray)
+    if box is not None:
+        gray = gray.crop(box)
+    gray.thumbnail((MAX_SIDE, MAX_SIDE), Image.LANCZOS)
+    gray = ImageOps.autocontrast(gray, cutoff=1)
+
+    thumbnail = gray.copy()
+    thumbnail.thumbnail((THUMBNAIL_SIDE, THUMBNAIL_SIDE))
+    return {
+        "bytes": _encode(gray),
+        "mime_type": "image/jpeg",
+        "thumbnail": _encode(thumbnail, quality=70),
+        "size": gray.size,
+        "cropped": box is not None,
+        "original_bytes": len(file_bytes),
+    }
+
+
+def preprocess_image(file_bytes):
+    """Returns the processed upload (see _process), cached by SHA-256 of the original bytes.
+
+    If Pillow cannot read the image, the original bytes are passed through unchanged.
+    """
+    key = hashlib.sha256(file_bytes).hexdigest()
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        result = _process(file_bytes)
+    except Exception:
+        result = {"bytes": file_bytes, "mime_type": None, "thumbnail": None, "size": None,
+                  "cropped": False, "original_bytes": len(file_bytes)}
+    result["sha256"] = key
+    _cache.set(key, result)
+    return result
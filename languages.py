@@ -0,0 +1,16 @@
+# --- APP LANGUAGES ---
+# The languages offered in the app, with the ISO 639-1 code used for speech (gTTS,
+# Whisper, espeak-ng) and the plain name used in the lawyer directory. Kept free of
+# heavy imports so any module can use it.
+
+APP_LANGUAGES = {
+    "Simple English": {"code": "en", "name": "English"},
+    "Hindi (in Roman script)": {"code": "hi", "name": "Hindi"},
+    "Kannada": {"code": "kn", "name": "Kannada"},
+    "Tamil": {"code": "ta", "name": "Tamil"},
+    "Telugu": {"code": "te", "name": "Telugu"},
+    "Marathi": {"code": "mr", "name": "Marathi"},
+}
+
+lang_code_map = {language: info["code"] for language, info in APP_LANGUAGES.items()}
+language_name_map = {language: info["name"] for language, info in APP_LANGUAGES.items()}
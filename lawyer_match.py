@@ -0,0 +1,96 @@
+import json
+
+from case_brief import BRIEF_WAIT_SECONDS
+from lawyer_store import get_lawyer_store
+from rag_pipeline import NO_DOCUMENT
+from session_index import document_passages
+
+FALLBACK_BRIEF = "User needs legal assistance based on recent inquiries."
+BRIEF_DOCUMENT_QUERY = "parties, dates, amounts, demands, deadlines and the legal issue in this document"
+
+
+# --- CASE ANALYSIS ---
+def case_inputs(messages, document_context, memory=None, document_index=None):
+    """(chat summary, document summary) that the brief is written from."""
+    if memory is not None:
+        chat_summary = memory.render()
+    else:
+        chat_summary = "\n".join([m["content"] for m in messages])
+    # Relevant passages from the session index, else the first 2000 chars
+    doc_summary = document_passages(document_index, document_context, chat_summary or BRIEF_DOCUMENT_QUERY,
+                                    NO_DOCUMENT, fallback_chars=2000)
+    return chat_summary, doc_summary
+
+
+def build_match_prompt(chat_summary, doc_summary):
+    return f"""
+    Analyze this user's legal situation based on their chat and documents.
+
+    Chat History: {chat_summary}
+    Document Context: {doc_summary}
+
+    Output a JSON object with these 2 fields:
+    1. "summary": A 3-sentence professional summary of the legal issue for a lawyer to read.
+    2. "category": ONE of these exact categories: "Family Law", "Property Dispute", "Criminal Law", "Consumer Rights", "Corporate Law", "Cyber Crime". If unsure, use "General".
+
+    JSON:
+    """
+
+
+def build_brief_prompt(chat_summary, doc_summary, category):
+    return f"""
+    Summarize this user's {category} matter based on their chat and documents.
+
+    Chat History: {chat_summary}
+    Document Context: {doc_summary}
+
+    Write a 3-sentence professional summary of the legal issue for a lawyer to read.
+    Output only the summary.
+    """
+
+
+def brief_document_text(document_context, document_index=None):
+    """The document passages a case brief is built from."""
+    return document_passages(document_index, document_context, BRIEF_DOCUMENT_QUERY, NO_DOCUMENT,
+                             fallback_chars=2000)
+
+
+def analyze_case(model, messages, document_context, memory=None, document_index=None, classifier=None,
+                 running_brief=None, wait_seconds=BRIEF_WAIT_SECONDS):
+    """Returns (summary, category). Raises on model or JSON errors.
+
+    A RunningCaseBrief that has caught up (waiting up to `wait_seconds` for an update
+    in progress) is returned as-is, with no LLM call. Otherwise, with a CaseClassifier
+    that decides locally (NYAY_LOCAL_CATEGORY), a confident category is picked locally
+    and the LLM only writes the brief as plain text; other cases ask the LLM for the
+    category.
+    """
+    if running_brief is not None and running_brief.wait(timeout=wait_seconds):
+        return running_brief.snapshot()
+
+    chat_summary, doc_summary = case_inputs(messages, document_context, memory, document_index)
+    if classifier is not None:
+        pieces = [m["content"] for m in messages if m["role"] == "user"]
+        if doc_summary != NO_DOCUMENT:
+            pieces.append(doc_summary)
+        category = classifier.decide(pieces)
+        if category is not None:
+            response = model.generate_content(build_brief_prompt(chat_summary, doc_summary, category))
+            return response.text.strip(), category
+
+    response = model.generate_content(build_match_prompt(chat_summary, doc_summary))
+    cleaned_json = response.text.strip().replace("```json", "").replace("```", "")
+    data = json.loads(cleaned_json)
+    return data["summary"], data["category"]
+
+
+# --- MATCHING ---
+def find_lawyers(category, fallback_count=2, place=None, language=None, limit=3, store=None):
+    """Returns (lawyers, exact_match), ranked by distance to `place`, `language` and experience."""
+    store = store or get_lawyer_store()
+    found_lawyers = store.match(category, place=place, language=language, limit=limit) if category != "General" else []
+
+    # If no one has this specialization, show the best-ranked lawyers of any kind (Fallback)
+    if not found_lawyers:
+        return store.match(None, place=place, language=language, limit=fallback_count), False
+    return found_lawyers, True
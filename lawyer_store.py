@@ -0,0 +1,268 @@
+import csv
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+
+from disk_cache import CACHE_DIR
+from languages import language_name_map
+
+# --- LAWYER DIRECTORY STORE ---
+# Empanelled advocates and legal-aid panels live in a SQLite file with indexes on
+# specialization, city/district, language and availability, so a match reads a few
+# hundred rows at most even with 100k+ lawyers. NYAY_LAWYER_DB points at a maintained
+# database; otherwise one is built from NYAY_LAWYER_CSV (rebuilt when the CSV changes).
+#
+# Ranking: when the user's city or district is known, the candidates are the lawyers in
+# the smallest box around it (doubling from 2 km) that holds CANDIDATES_PER_QUERY of them.
+# They are ordered by distance, with a penalty for not speaking the user's language and
+# a small bonus per year of experience.
+
+LAWYER_CSV = os.environ.get("NYAY_LAWYER_CSV", "data/lawyers.csv")
+LAWYER_DB = os.environ.get("NYAY_LAWYER_DB")
+SEARCH_RADII_KM = (2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+CANDIDATES_PER_QUERY = 24
+LANGUAGE_MISS_KM = 150     # a lawyer who does not speak the user's language ranks as if this much farther away
+EXPERIENCE_KM_PER_YEAR = 2
+MAX_EXPERIENCE_BONUS_YEARS = 25
+KM_PER_DEGREE = 111.2
+
+CSV_COLUMNS = ["name", "specialization", "city", "district", "state", "lat", "lon",
+               "experience_years", "languages", "phone", "available"]
+
+SCHEMA = """
+CREATE TABLE lawyers (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, specialization TEXT NOT NULL,
+    city TEXT, district TEXT, state TEXT, city_key TEXT, district_key TEXT,
+    lat REAL, lon REAL, experience_years INTEGER NOT NULL DEFAULT 0,
+    languages TEXT, phone TEXT, available INTEGER NOT NULL DEFAULT 1
+);
+-- One row per (lawyer, language), with the filter columns copied in so language
+-- matches are answered from the index alone.
+CREATE TABLE lawyer_languages (
+    lawyer_id INTEGER NOT NULL, language TEXT NOT NULL, specialization TEXT NOT NULL,
+    available INTEGER NOT NULL, experience_years INTEGER NOT NULL,
+    PRIMARY KEY (lawyer_id, language)
+) WITHOUT ROWID;
+CREATE TABLE places (key TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL) WITHOUT ROWID;
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+INDEXES = """
+CREATE INDEX lawyers_specialization_geo ON lawyers (specialization, available, lat, lon);
+CREATE INDEX lawyers_specialization_experience ON lawyers (specialization, available, experience_years);
+CREATE INDEX lawyers_geo ON lawyers (available, lat, lon);
+CREATE INDEX lawyers_experience ON lawyers (available, experience_years);
+CREATE INDEX lawyers_city ON lawyers (city_key, specialization, available);
+CREATE INDEX lawyers_district ON lawyers (district_key, specialization, available);
+CREATE INDEX lawyer_languages_match ON lawyer_languages (language, specialization, available, experience_years);
+"""
+
+
+def _key(place):
+    return " ".join(str(place or "").casefold().split())
+
+
+def _split_languages(languages):
+    return [part.strip().title() for part in str(languages or "").replace("/", ",").split(",") if part.strip()]
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LawyerStore:
+    """Read-only lawyer directory over one SQLite file; safe to share across sessions."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+    @classmethod
+    def build(cls, rows, path, source_hash=""):
+        """Writes `rows` (dicts with CSV_COLUMNS) to a new SQLite file at `path` and opens it."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        conn.executescript(SCHEMA)
+        lawyers, languages, places = [], [], {}
+        for i, row in enumerate(rows, start=1):
+            lat, lon = _float(row.get("lat")), _float(row.get("lon"))
+            experience = int(_float(row.get("experience_years")) or 0)
+            available = 0 if str(row.get("available", "1")).strip().lower() in ("0", "false", "no") else 1
+            lawyers.append((i, row["name"], row["specialization"], row.get("city"), row.get("district"),
+                            row.get("state"), _key(row.get("city")), _key(row.get("district")), lat, lon,
+                            experience, row.get("languages"), row.get("phone"), available))
+            for language in _split_languages(row.get("languages")):
+                languages.append((i, language, row["specialization"], available, experience))
+            if lat is not None and lon is not None:
+                for place in (row.get("city"), row.get("district")):
+                    if place:
+                        places.setdefault(_key(place), []).append((lat, lon))
+        conn.executemany("INSERT INTO lawyers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", lawyers)
+        conn.executemany("INSERT OR IGNORE INTO lawyer_languages VALUES (?, ?, ?, ?, ?)", languages)
+        # A place's location is the mean of its lawyers' coordinates.
+        conn.executemany("INSERT INTO places VALUES (?, ?, ?)", [
+            (key, sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+            for key, points in places.items()
+        ])
+        conn.execute("INSERT INTO meta VALUES ('source_hash', ?)", (source_hash,))
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def source_hash(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'source_hash'").fetchone()
+        return row[0] if row else None
+
+    def place_location(self, place):
+        """(lat, lon) of a city or district in the directory, else None."""
+        with self._lock:
+            row = self._conn.execute("SELECT lat, lon FROM places WHERE key = ?", (_key(place),)).fetchone()
+        return (row["lat"], row["lon"]) if row else None
+
+    # --- CANDIDATES ---
+    def _near(self, specialization, lat, lon, language):
+        """The CANDIDATES_PER_QUERY lawyers nearest (lat, lon), from growing boxes around it.
+
+        Boxes are scanned on the (specialization, available, lat, lon) index alone; full
+        rows are read only for the nearest candidates.
+        """
+        spec_filter = "specialization = ? AND " if specialization else ""
+        box_sql = (f"SELECT id, lat, lon FROM lawyers WHERE {spec_filter}available = 1"
+                   " AND lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?")
+        lon_scale = max(math.cos(math.radians(lat)), 0.01)
+        points = []
+        for radius in SEARCH_RADII_KM:
+            dlat = radius / KM_PER_DEGREE
+            dlon = dlat / lon_scale
+            params = ([specialization] if specialization else []) + [lat - dlat, lat + dlat, lon - dlon, lon + dlon]
+            points = self._conn.execute(box_sql, params).fetchall()
+            if len(points) >= CANDIDATES_PER_QUERY:
+                break
+        # Equirectangular distance is enough to pick the nearest few inside one box.
+        points.sort(key=lambda p: (p[1] - lat) ** 2 + ((p[2] - lon) * lon_scale) ** 2)
+        ids = [p[0] for p in points[:CANDIDATES_PER_QUERY]]
+        if not ids:
+            return []
+        return self._conn.execute(
+            "SELECT l.*, EXISTS(SELECT 1 FROM lawyer_languages ll WHERE ll.lawyer_id = l.id AND ll.language = ?)"
+            f" AS speaks FROM lawyers l WHERE id IN ({', '.join('?' * len(ids))})",
+            [language or ""] + ids,
+        ).fetchall()
+
+    def _most_experienced(self, specialization, language):
+        """Most experienced lawyers, and separately the most experienced who speak `language`."""
+        spec_filter = "specialization = ? AND " if specialization else ""
+        params = [specialization] if specialization else []
+        rows = self._conn.execute(
+            "SELECT l.*, EXISTS(SELECT 1 FROM lawyer_languages ll WHERE ll.lawyer_id = l.id AND ll.language = ?)"
+            f" AS speaks FROM lawyers l WHERE {spec_filter}available = 1"
+            f" ORDER BY experience_years DESC LIMIT {CANDIDATES_PER_QUERY}",
+            [language or ""] + params,
+        ).fetchall()
+        if language:
+            rows += self._conn.execute(
+                "SELECT l.*, 1 AS speaks FROM lawyer_languages ll JOIN lawyers l ON l.id = ll.lawyer_id"
+                f" WHERE ll.language = ? AND {spec_filter.replace('specialization', 'll.specialization')}"
+                f"ll.available = 1 ORDER BY ll.experience_years DESC LIMIT {CANDIDATES_PER_QUERY}",
+                [language] + params,
+            ).fetchall()
+        return rows
+
+    # --- MATCHING ---
+    def match(self, specialization=None, place=None, language=None, limit=3):
+        """Best `limit` available lawyers as dicts, ranked by distance, language and experience.
+
+        `specialization` None (or "General") matches any specialization. `place` is a city
+        or district name, `language` an app or directory language name.
+        """
+        if specialization == "General":
+            specialization = None
+        language = language_name_map.get(language, language)
+        origin = self.place_location(place) if place else None
+        with self._lock:
+            if origin is not None:
+                rows = self._near(specialization, origin[0], origin[1], language)
+            else:
+                rows = self._most_experienced(specialization, language)
+
+        ranked, seen = [], set()
+        for row in rows:
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            distance = None
+            if origin is not None and row["lat"] is not None:
+                distance = _distance_km(origin, (row["lat"], row["lon"]))
+            score = (distance or 0.0) + (LANGUAGE_MISS_KM if language and not row["speaks"] else 0)
+            score -= EXPERIENCE_KM_PER_YEAR * min(row["experience_years"], MAX_EXPERIENCE_BONUS_YEARS)
+            ranked.append((score, row["id"], row, distance))
+        ranked.sort(key=lambda item: item[:2])
+        return [_as_card(row, distance) for _, _, row, distance in ranked[:limit]]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _distance_km(a, b):
+    """Great-circle distance between two (lat, lon) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def _as_card(row, distance):
+    """The dict shape the Find Lawyer cards render."""
+    return {
+        "name": row["name"],
+        "location": row["city"] or row["district"] or "",
+        "district": row["district"],
+        "specialization": row["specialization"],
+        "experience": f"{row['experience_years']} Years",
+        "languages": row["languages"] or "",
+        "phone": row["phone"] or "",
+        "distance_km": round(distance, 1) if distance is not None else None,
+    }
+
+
+# --- SHARED STORE ---
+_store = None
+_store_lock = threading.Lock()
+
+
+def read_lawyer_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def get_lawyer_store(csv_path=LAWYER_CSV, db_path=LAWYER_DB):
+    """The process-wide store: NYAY_LAWYER_DB if set, else built from the CSV and kept under NYAY_CACHE_DIR."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if db_path:
+                _store = LawyerStore(db_path)
+            else:
+                with open(csv_path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                path = os.path.join(CACHE_DIR, "lawyers.sqlite3")
+                store = LawyerStore(path) if os.path.exists(path) else None
+                if store is None or store.source_hash() != digest:
+                    if store is not None:
+                        store.close()
+                    store = LawyerStore.build(read_lawyer_csv(csv_path), path, source_hash=digest)
+                _store = store
+        return _store
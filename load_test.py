@@ -0,0 +1,447 @@
+"""Load-test harness for Nyay-Saathi.
+
+Drives the same flows the Streamlit tabs call (Explain upload, multi-turn
+"What to do" chat, document generation, voice and lawyer match) for N
+simulated sessions in parallel threads, the way Streamlit serves one script
+run per session thread. Gemini and gTTS are replaced by deterministic local
+stand-ins with configurable latency, so the numbers measure our own code.
+
+Usage:
+    python load_test.py --sessions 50 --concurrency 10 --llm-latency 0.8
+    python load_test.py --stub-retriever --json results.json
+"""
+import argparse
+import atexit
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+import wave
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Stub audio and explanations must never land in the app's caches (.nyay_cache), and
+# every run should start cold. Set before the app modules read NYAY_CACHE_DIR.
+os.environ["NYAY_CACHE_DIR"] = tempfile.mkdtemp(prefix="nyay-load-test-")
+atexit.register(shutil.rmtree, os.environ["NYAY_CACHE_DIR"], ignore_errors=True)
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+import tts
+from coalesce import SingleFlight
+from conversation_memory import ConversationMemory
+from session_index import SessionDocumentIndex
+from rag_pipeline import ANSWER_MODE, NO_DOCUMENT, load_embeddings, load_retriever, build_rag_chain, answer_question
+from explain_pipeline import explain_document
+from voice_pipeline import answer_voice_question
+from audio_preprocess import preprocess_audio
+from lawyer_match import analyze_case, brief_document_text, find_lawyers
+from case_brief import RunningCaseBrief
+from case_classifier import CaseClassifier
+from doc_templates import DOC_CONFIG, render_document
+from pdf_engine import create_pdf_bytes
+
+LANGUAGES = ["Simple English", "Hindi (in Roman script)", "Kannada", "Tamil", "Telugu", "Marathi"]
+
+QUESTIONS = [
+    "My landlord is not returning my security deposit. What should I do?",
+    "The police arrested my brother without telling us why.",
+    "A shop sold me a broken phone and refuses to replace it.",
+    "How do I get a copy of my land records under RTI?",
+    "My employer has not paid salary for three months.",
+    "Someone is threatening me online with my photos.",
+]
+
+FOLLOW_UPS = [
+    "What documents do I need?",
+    "How long will it take?",
+    "Do I need a lawyer for this?",
+    "What if they still refuse?",
+]
+
+
+# --- DETERMINISTIC STAND-INS ---
+def _digest(value):
+    return hashlib.sha256(repr(value).encode("utf-8")).hexdigest()
+
+
+class Latency:
+    """Fixed latency plus optional jitter, seeded so runs are repeatable."""
+
+    def __init__(self, seconds, jitter=0.0, seed=0):
+        self.seconds = seconds
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        with self._lock:
+            extra = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        time.sleep(max(0.0, self.seconds + extra))
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Stands in for genai.GenerativeModel; replies are a pure function of the prompt."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        self.latency.sleep()
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt = next((p for p in parts if isinstance(p, str)), "")
+        tag = _digest(parts)[:8]
+
+        if "raw_text" in prompt:
+            return _StubResponse(json.dumps({
+                "raw_text": f"NOTICE {tag}. You are hereby directed to vacate the premises within 30 days. " * 20,
+                "explanation": f"This is a notice ({tag}) asking you to leave the house in 30 days.",
+            }))
+        if "Transcribe" in prompt:
+            return _StubResponse(f"SCANNED PAGE {tag}. The tenant shall pay the rent on time.")
+        if '"category"' in prompt:
+            return _StubResponse("```json\n" + json.dumps({
+                "summary": f"Client reports a dispute ({tag}). Facts are summarised from chat. Advice is required.",
+                "category": ["Family Law", "Property Dispute", "Consumer Rights", "General"][int(tag, 16) % 4],
+            }) + "\n```")
+        if "CATEGORY:" in prompt:
+            category = ["Family Law", "Property Dispute", "Consumer Rights", "General"][int(tag, 16) % 4]
+            return _StubResponse(f"CATEGORY: {category}\nBRIEF: Client reports a dispute ({tag}). "
+                                 "Facts are summarised from chat. Advice is required.")
+        if "auditor" in prompt:
+            return _StubResponse("NO")
+        return _StubResponse(f"Stub answer {tag}. 1. Stay calm. 2. Collect your papers. 3. Contact NALSA.")
+
+
+def make_stub_chat_llm(latency):
+    """A Runnable that replaces ChatGoogleGenerativeAI inside the RAG chain."""
+    def _respond(prompt_value):
+        latency.sleep()
+        tag = _digest(prompt_value.to_string())[:8]
+        return f"Plan {tag}:\n1. Write down what happened.\n2. Keep copies of all papers.\n3. Visit the nearest legal aid clinic."
+    return RunnableLambda(_respond)
+
+
+def make_stub_retriever(data_path="data"):
+    """Keyword-overlap retriever over a handful of guide snippets, for trees without a FAISS index."""
+    import glob
+    import os
+    docs = []
+    for path in sorted(glob.glob(os.path.join(data_path, "*.txt")))[:20]:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            text = f.read(2000)
+        docs.append(Document(page_content=text[:500], metadata={"source": path}))
+
+    def _search(question):
+        words = set(question.lower().split())
+        scored = sorted(docs, key=lambda d: -len(words & set(d.page_content.lower().split())))
+        return scored[:3]
+    return RunnableLambda(_search)
+
+
+class StubEmbeddings:
+    """Hashed bag-of-words vectors with MiniLM's dimension, for runs without the HF model."""
+    dim = 384
+
+    def _vector(self, text):
+        vec = [0.0] * self.dim
+        for word in text.lower().split():
+            vec[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dim] += 1.0
+        return vec
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+class StubGTTS:
+    """Stands in for gtts.gTTS: writes ~1 KB of fake MP3 per 16 characters after a delay."""
+    latency = Latency(0.0)
+
+    def __init__(self, text, lang="en", slow=False, **kwargs):
+        self.text = text
+        self.lang = lang
+
+    def write_to_fp(self, fp):
+        self.latency.sleep()
+        seed = hashlib.sha256(f"{self.lang}:{self.text}".encode("utf-8")).digest()
+        fp.write(b"ID3" + seed * max(1, len(self.text) // 16 * 32))
+
+
+# --- SAMPLE UPLOADS ---
+def sample_image_bytes(seed):
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    image = Image.new("RGB", (2400, 3200), (250, 250, 245))
+    draw = ImageDraw.Draw(image)
+    for y in range(200, 3000, 60):
+        draw.line([(200, y), (200 + rng.randint(800, 2000), y)], fill=(20, 20, 20), width=8)
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def sample_pdf_bytes(seed):
+    text = f"LEGAL NOTICE {seed}\n\n" + "You are hereby called upon to pay the outstanding rent within fifteen days. " * 40
+    return create_pdf_bytes(text, "Legal Notice (General)")
+
+
+def sample_wav_bytes(seconds=4.0, rate=44100):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        frames = bytearray()
+        for i in range(int(seconds * rate)):
+            value = int(8000 * math.sin(2 * math.pi * 220 * i / rate)) if rate * 0.5 < i < rate * (seconds - 0.5) else 0
+            frames += value.to_bytes(2, "little", signed=True)
+        w.writeframes(bytes(frames))
+    return buf.getvalue()
+
+
+def sample_field_values(doc_type):
+    values = {}
+    for field in DOC_CONFIG[doc_type]["fields"]:
+        ftype = field.get("type", "text")
+        if ftype == "number":
+            values[field["id"]] = 15000
+        elif ftype == "date":
+            values[field["id"]] = "2026-01-01"
+        else:
+            values[field["id"]] = f"Sample {field['label']}"
+    values["date"] = "January 01, 2026"
+    return values
+
+
+# --- SIMULATED SESSION ---
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def time(self, stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors[stage] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timings[stage].append(elapsed)
+
+
+def run_session(session_id, ctx, recorder, turns, uploads):
+    """One user's journey through all five tabs, mirroring the order in app.py."""
+    rng = random.Random(session_id)
+    language = LANGUAGES[session_id % len(LANGUAGES)]
+    state = {"messages": [], "document_context": NO_DOCUMENT, "memory": ConversationMemory(), "index": None,
+             "brief": RunningCaseBrief()}
+
+    # Tab 1: Explain upload
+    file_bytes, file_type = uploads[session_id % len(uploads)]
+    try:
+        explanation, raw_text = recorder.time(
+            "explain", explain_document, ctx["model"], file_bytes, file_type, language,
+            singleflight=ctx["singleflight"]
+        )
+        state["document_context"] = raw_text
+        state["index"] = recorder.time("doc_index", SessionDocumentIndex.build, raw_text, ctx["embeddings"])
+        state["brief"].add_document(brief_document_text(raw_text, state["index"]), ctx["model"], ctx["classifier"])
+        recorder.time("tts_explain", tts.synthesize, explanation, language)
+    except Exception:
+        pass
+
+    # Tab 2: multi-turn "What to do"
+    question = rng.choice(QUESTIONS)
+    for turn in range(turns):
+        prompt = question if turn == 0 else rng.choice(FOLLOW_UPS)
+        state["messages"].append({"role": "user", "content": prompt})
+        try:
+            message = recorder.time(
+                "chat_turn", answer_question, ctx["chain"], ctx["model"], prompt, language,
+                state["messages"], state["document_context"], singleflight=ctx["singleflight"],
+                retriever=ctx["retriever"], mode=ctx["answer_mode"], memory=state["memory"],
+                document_index=state["index"]
+            )
+            state["messages"].append(message)
+            state["memory"].add_turn(prompt, message["content"], ctx["model"])
+            state["brief"].add_turn(prompt, message["content"], ctx["model"], ctx["classifier"])
+        except Exception:
+            state["messages"].pop()
+
+    # Tab 3: document generation
+    doc_type = rng.choice(list(DOC_CONFIG.keys()))
+    try:
+        values = sample_field_values(doc_type)
+        recorder.time("docgen", lambda: create_pdf_bytes(render_document(doc_type, values), doc_type))
+    except Exception:
+        pass
+
+    # Tab 4: voice
+    try:
+        clip = recorder.time("voice_preprocess", preprocess_audio, ctx["wav"])
+        answer = recorder.time("voice", answer_voice_question, ctx["model"], clip["bytes"], language, clip["mime_type"])
+        recorder.time("tts_voice", tts.synthesize, answer, language)
+    except Exception:
+        pass
+
+    # Tab 5: lawyer match
+    try:
+        summary, category = recorder.time(
+            "lawyer_match", analyze_case, ctx["model"], state["messages"], state["document_context"],
+            memory=state["memory"], document_index=state["index"], classifier=ctx["classifier"],
+            running_brief=state["brief"]
+        )
+        recorder.time("lawyer_lookup", find_lawyers, category)
+    except Exception:
+        pass
+
+    return state
+
+
+# --- REPORTING ---
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(recorder, wall_seconds, sessions, mem_samples, extra=None):
+    stages = {}
+    for stage, values in recorder.timings.items():
+        stages[stage] = {
+            "count": len(values),
+            "errors": recorder.errors.get(stage, 0),
+            "ops_per_sec": len(values) / wall_seconds if wall_seconds else 0.0,
+            "mean_ms": statistics.fmean(values) * 1000,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    growth = 0.0
+    if len(mem_samples) > 1:
+        growth = (mem_samples[-1] - mem_samples[0]) / (len(mem_samples) - 1)
+    report = {
+        "sessions": sessions,
+        "wall_seconds": wall_seconds,
+        "sessions_per_sec": sessions / wall_seconds if wall_seconds else 0.0,
+        "memory_growth_kb_per_session": growth / 1024,
+        "peak_traced_mb": (max(mem_samples) if mem_samples else 0) / (1024 * 1024),
+        "stages": stages,
+    }
+    if extra:
+        report.update(extra)
+    return report
+
+
+def print_report(report):
+    print(f"\nSessions: {report['sessions']}  wall: {report['wall_seconds']:.2f}s  "
+          f"throughput: {report['sessions_per_sec']:.2f} sessions/s")
+    print(f"Memory growth: {report['memory_growth_kb_per_session']:.1f} KB/session  "
+          f"peak traced: {report['peak_traced_mb']:.1f} MB")
+    for key in ("singleflight", "llm_calls"):
+        if key in report:
+            print(f"{key}: {report[key]}")
+    header = f"{'stage':<15}{'count':>7}{'err':>5}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    for stage, s in report["stages"].items():
+        print(f"{stage:<15}{s['count']:>7}{s['errors']:>5}{s['ops_per_sec']:>9.2f}"
+              f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+
+
+# --- MAIN ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent Nyay-Saathi sessions against stubbed Gemini/gTTS.")
+    parser.add_argument("--sessions", type=int, default=20, help="Number of simulated user sessions.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions running at the same time.")
+    parser.add_argument("--turns", type=int, default=3, help="'What to do' chat turns per session.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub Gemini latency in seconds.")
+    parser.add_argument("--tts-latency", type=float, default=0.2, help="Stub gTTS latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- uniform jitter added to stub latencies.")
+    parser.add_argument("--answer-mode", choices=["llm", "auto", "extractive"], default=ANSWER_MODE,
+                        help="'What to do' answer mode, as NYAY_ANSWER_MODE in the app.")
+    parser.add_argument("--stub-retriever", action="store_true", help="Use a keyword retriever instead of the FAISS index.")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    llm_latency = Latency(args.llm_latency, args.jitter, seed=1)
+    StubGTTS.latency = Latency(args.tts_latency, args.jitter, seed=2)
+    tts.gTTS = StubGTTS
+
+    model = StubGenerativeModel(llm_latency)
+    if args.stub_retriever:
+        embeddings, retriever = StubEmbeddings(), make_stub_retriever()
+    else:
+        embeddings = load_embeddings()
+        retriever = load_retriever(embeddings)
+    ctx = {
+        "model": model,
+        "chain": build_rag_chain(retriever, make_stub_chat_llm(llm_latency)),
+        "singleflight": SingleFlight(),
+        "retriever": retriever,
+        "embeddings": embeddings,
+        "classifier": CaseClassifier(embeddings),
+        "answer_mode": args.answer_mode,
+        "wav": sample_wav_bytes(),
+    }
+    uploads = [(sample_image_bytes(i), "image/jpeg") for i in range(2)] + \
+              [(sample_pdf_bytes(i), "application/pdf") for i in range(2)]
+
+    recorder = Recorder()
+    mem_samples = []
+    mem_lock = threading.Lock()
+    tracemalloc.start()
+    mem_samples.append(tracemalloc.get_traced_memory()[0])
+
+    def _session(i):
+        state = run_session(i, ctx, recorder, args.turns, uploads)
+        with mem_lock:
+            mem_samples.append(tracemalloc.get_traced_memory()[0])
+        return state
+
+    # Keep finished session states alive, as Streamlit keeps session_state until the tab closes.
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        states = list(pool.map(_session, range(args.sessions)))
+    wall = time.perf_counter() - start
+    tracemalloc.stop()
+
+    report = summarize(recorder, wall, len(states), mem_samples, extra={
+        "singleflight": ctx["singleflight"].stats(),
+        "llm_calls": model.calls,
+    })
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import threading
+from collections import OrderedDict
+
+# --- IN-PROCESS LRU ---
+# Small per-process caches (processed uploads, transcripts, rendered PDFs) that are
+# cheap to rebuild and not worth a disk round trip.
+
+
+class MemoryLRU:
+    """Thread-safe key -> value map holding at most `max_entries`, evicting least recently used."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
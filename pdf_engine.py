@@ -0,0 +1,296 @@
+import copy
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import re
+import threading
+
+from fontTools import subset, ttLib
+from fpdf import FPDF, FPDF_VERSION
+from fpdf.enums import TextEmphasis
+from fpdf.fonts import SubsetMap
+
+from disk_cache import CACHE_DIR
+from memory_cache import MemoryLRU
+
+# --- PDF RENDERING ---
+# Drafts are rendered with Noto TTF fonts so names and addresses typed in Hindi, Marathi,
+# Kannada, Tamil or Telugu come out as written. Fonts are looked up in NYAY_FONT_DIR, then
+# where Debian's fonts-noto-core package installs them. Each
+# file is first cut down to the scripts we render (kept under NYAY_CACHE_DIR), then parsed
+# once per process; every document gets a cheap copy of the parsed font, and fpdf2 embeds
+# only the glyphs that document uses. Without NotoSans-Regular.ttf the old core-font
+# (latin-1) rendering is used. Install uharfbuzz for correct conjuncts and vowel signs.
+# packages.txt installs fonts-noto-core on Streamlit Cloud.
+
+logger = logging.getLogger("nyay.pdf")
+
+FONT_DIRS = [os.environ.get("NYAY_FONT_DIR", "fonts"), "/usr/share/fonts/truetype/noto"]
+BASE_FAMILY = "notosans"
+
+# family -> {style: file name}; a missing bold file falls back to the regular one.
+FONT_FILES = {
+    "notosans": {"": "NotoSans-Regular.ttf", "B": "NotoSans-Bold.ttf", "I": "NotoSans-Italic.ttf"},
+    "notodevanagari": {"": "NotoSansDevanagari-Regular.ttf", "B": "NotoSansDevanagari-Bold.ttf"},
+    "notokannada": {"": "NotoSansKannada-Regular.ttf", "B": "NotoSansKannada-Bold.ttf"},
+    "nototamil": {"": "NotoSansTamil-Regular.ttf", "B": "NotoSansTamil-Bold.ttf"},
+    "nototelugu": {"": "NotoSansTelugu-Regular.ttf", "B": "NotoSansTelugu-Bold.ttf"},
+}
+
+# Code points kept when a font is cut down. Shaped forms (conjuncts) reachable from these
+# through the font's layout tables are kept too.
+_COMMON = [(0x20, 0x7E), (0xA0, 0xFF), (0x200C, 0x206F), (0x20B9, 0x20B9), (0x25CC, 0x25CC)]
+FONT_UNICODES = {
+    "notosans": _COMMON + [(0x100, 0x17F)],
+    "notodevanagari": _COMMON + [(0x900, 0x97F), (0x1CD0, 0x1CFF), (0xA8E0, 0xA8FF)],
+    "notokannada": _COMMON + [(0xC80, 0xCFF)],
+    "nototamil": _COMMON + [(0xB80, 0xBFF)],
+    "nototelugu": _COMMON + [(0xC00, 0xC7F)],
+}
+
+# Only the script fonts a document's text needs are added; fpdf2 embeds every added font.
+SCRIPT_PATTERNS = {
+    "notodevanagari": re.compile("[ऀ-ॿ꣠-ꣿ]"),
+    "notokannada": re.compile("[ಀ-೿]"),
+    "nototamil": re.compile("[஀-௿]"),
+    "nototelugu": re.compile("[ఀ-౿]"),
+}
+
+_SHAPED_TEXT = re.compile("|".join(pattern.pattern for pattern in SCRIPT_PATTERNS.values()))
+
+TEXT_SHAPING = importlib.util.find_spec("uharfbuzz") is not None
+
+WIDTH_CACHE_ENTRIES = 20000
+
+# The cheap per-document copy in _attach_font fills in fpdf2's TTFFont attributes by
+# hand, so it only runs on the fpdf2 versions it was checked against (fpdf2 is pinned in
+# requirements.txt). Other versions parse the reduced font for every document.
+CACHED_FONT_FPDF_VERSIONS = ("2.8.",)
+
+_cached_fonts_enabled = FPDF_VERSION.startswith(CACHED_FONT_FPDF_VERSIONS)
+if not _cached_fonts_enabled:
+    logger.warning("fpdf2 %s is not a version the cached font copy was checked against; "
+                   "fonts are parsed for every document", FPDF_VERSION)
+
+_parsed = {}  # path -> (parsed TTFFont, font file bytes)
+# (font, size, shaping, word) -> width. Drafts share most of their words, and every
+# document gets the same parsed fonts, so widths carry over between documents.
+_widths = MemoryLRU(WIDTH_CACHE_ENTRIES)
+_parsed_lock = threading.Lock()
+
+
+def _font_path(family, style):
+    files = FONT_FILES[family]
+    for name in (files.get(style), files[""]):
+        for font_dir in FONT_DIRS:
+            path = os.path.join(font_dir, name or "")
+            if name and os.path.exists(path):
+                return path
+    return None
+
+
+def unicode_fonts_available():
+    return _font_path(BASE_FAMILY, "") is not None
+
+
+def is_latin1(text):
+    """True if the core-font (no Noto) rendering can print `text` without '?' substitutes."""
+    try:
+        text.encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _reduced_font(family, path):
+    """Path of `path` cut down to FONT_UNICODES[family], created once and kept on disk."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    out_dir = os.path.join(CACHE_DIR, "fonts")
+    out_path = os.path.join(out_dir, f"{family}-{digest}.ttf")
+    if not os.path.exists(out_path):
+        os.makedirs(out_dir, exist_ok=True)
+        font = ttLib.TTFont(path, recalcTimestamp=False)
+        options = subset.Options(layout_features=["*"], name_IDs=["*"], notdef_outline=True)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=[c for lo, hi in FONT_UNICODES[family] for c in range(lo, hi + 1)])
+        subsetter.subset(font)
+        tmp_path = f"{out_path}.{os.getpid()}.tmp"
+        font.save(tmp_path)
+        os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _parse(family, path):
+    """Parses a (reduced) font file once per process: cmap, widths, metrics."""
+    with _parsed_lock:
+        if path not in _parsed:
+            reduced = _reduced_font(family, path)
+            holder = FPDF()
+            holder.add_font("template", "", reduced)
+            with open(reduced, "rb") as f:
+                _parsed[path] = (holder.fonts["template"], f.read())
+        return _parsed[path]
+
+
+def _attach_font(pdf, family, style, path):
+    """Adds a copy of the cached parsed font to `pdf` instead of re-parsing the file."""
+    if not _cached_fonts_enabled:
+        pdf.add_font(family, style, _reduced_font(family, path))
+        return
+    template, data = _parse(family, path)
+    font = copy.copy(template)
+    font.i = len(pdf.fonts) + 1
+    font.fontkey = f"{family}{style}"
+    font.emphasis = TextEmphasis.coerce(style)
+    # Output subsets ttfont and fills in desc in place, so those are per document.
+    font.ttfont = ttLib.TTFont(io.BytesIO(data), recalcBBoxes=False, recalcTimestamp=False, lazy=True)
+    font.desc = copy.copy(template.desc)
+    font.cw = copy.copy(template.cw)
+    font.subset = SubsetMap(font)
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    font._hbfont = None
+    pdf.fonts[font.fontkey] = font
+
+
+def add_fallback_fonts(pdf, text):
+    """Registers the script fonts `text` needs and returns their families."""
+    fallbacks = []
+    for family, pattern in SCRIPT_PATTERNS.items():
+        path = _font_path(family, "")
+        if path is not None and pattern.search(text):
+            _attach_font(pdf, family, "", path)
+            fallbacks.append(family)
+    return fallbacks
+
+
+class PDF(FPDF):
+    font_family_name = "Arial"
+
+    def set_font(self, family=None, style="", size=0):
+        # Cached fonts are attached on first use, so unused styles are never embedded.
+        if family and family.lower() in FONT_FILES:
+            emphasis = "".join(c for c in TextEmphasis.coerce(style).style if c in "BI")
+            if family.lower() + emphasis not in self.fonts:
+                _attach_font(self, family.lower(), emphasis, _font_path(family.lower(), emphasis))
+        super().set_font(family, style, size)
+
+    def header(self):
+        self.set_font(self.font_family_name, 'B', 12)
+        self.cell(0, 10, 'Nyay-Saathi Legal Draft', 0, 1, 'C')
+        self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        # Every TTF style is embedded as a separate font, so the footer reuses the body font.
+        self.set_font(self.font_family_name, 'I' if self.font_family_name == "Arial" else '', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+
+
+def break_lines(paragraph, width, measure):
+    """Word-wraps one paragraph into lines (lists of words) no wider than `width`.
+
+    Words wider than a whole line are split by character onto lines of their own,
+    as multi_cell does; the rest of such a word starts the next line.
+    """
+    space = measure(" ")
+    lines, line, line_width = [], [], 0.0
+    for word in paragraph.split(" "):
+        word_width = measure(word)
+        if word_width > width:
+            if line:
+                lines.append(line)
+            piece, piece_width = "", 0.0
+            for ch in word:
+                ch_width = measure(ch)
+                if piece and piece_width + ch_width > width:
+                    lines.append([piece])
+                    piece, piece_width = "", 0.0
+                piece += ch
+                piece_width += ch_width
+            word, word_width, line, line_width = piece, piece_width, [], 0.0
+        elif line and line_width + space + word_width > width:
+            lines.append(line)
+            line, line_width = [], 0.0
+        line_width += (space if line else 0.0) + word_width
+        line.append(word)
+    lines.append(line)
+    return lines
+
+
+def write_justified(pdf, h, text, shaped=False):
+    """Same layout as pdf.multi_cell(0, h, text), with linear-time line breaking.
+
+    fpdf2's multi_cell re-measures the line for every character it adds (with text
+    shaping, a HarfBuzz call each time), which is most of the render time for a
+    two-page draft. Here each word is measured once and placed on its own: with
+    pdf.text(), or, when the document is `shaped` (text shaping and fallback fonts
+    are on), with pdf.cell() for the words in an Indic script, since pdf.text()
+    applies neither.
+    """
+    left = pdf.l_margin + pdf.c_margin
+    width = pdf.epw - 2 * pdf.c_margin
+    font = (pdf.current_font.fontkey, pdf.font_size_pt, bool(pdf.text_shaping))
+
+    def measure(word):
+        key = font + (word,)
+        word_width = _widths.get(key)
+        if word_width is None:
+            word_width = pdf.get_string_width(word)
+            _widths.set(key, word_width)
+        return word_width
+
+    def draw(x, y, words):
+        if not words:
+            return
+        if shaped and _SHAPED_TEXT.search(words):
+            pdf.set_xy(x - pdf.c_margin, y)
+            pdf.cell(h=h, text=words)
+        else:
+            pdf.text(x, y + 0.5 * h + 0.3 * pdf.font_size, words)
+
+    for paragraph in text.split("\n"):
+        lines = break_lines(paragraph, width, measure)
+        for i, line in enumerate(lines):
+            if pdf.will_page_break(h):
+                pdf.add_page(same=True)
+            y = pdf.y
+            if i == len(lines) - 1 or len(line) < 2:
+                draw(left, y, " ".join(line))
+            else:
+                gap = (width - sum(measure(word) for word in line)) / (len(line) - 1)
+                x = left
+                for word in line:
+                    draw(x, y, word)
+                    x += measure(word) + gap
+            pdf.set_xy(pdf.l_margin, y + h)
+
+
+def create_pdf_bytes(doc_text, doc_type):
+    pdf = PDF()
+    fallbacks = []
+    if unicode_fonts_available():
+        fallbacks = add_fallback_fonts(pdf, doc_text)
+        pdf.font_family_name = BASE_FAMILY
+        if fallbacks:
+            pdf.set_fallback_fonts(fallbacks, exact_match=False)
+            # Only the Indic scripts need shaping (and pdf.cell() to apply it); Latin-only
+            # drafts are written with the cheaper pdf.text().
+            if TEXT_SHAPING:
+                pdf.set_text_shaping(True)
+    else:
+        doc_text = doc_text.encode('latin-1', 'replace').decode('latin-1')
+    family = pdf.font_family_name
+
+    pdf.add_page()
+    pdf.set_font(family, 'B', 14)
+    pdf.cell(0, 10, doc_type.upper(), 0, 1, 'C')
+    pdf.ln(10)
+
+    pdf.set_font(family, size=11)
+    write_justified(pdf, 7, doc_text, shaped=bool(fallbacks))
+
+    return bytes(pdf.output())
@@ -0,0 +1,158 @@
+import io
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pypdf import PdfReader, PdfWriter
+
+# --- LOCAL PDF TEXT-LAYER EXTRACTION ---
+# Most notices and agreements are digitally generated PDFs that already carry text.
+# We read that locally and only send pages without a text layer to Gemini for OCR.
+
+MIN_PAGE_CHARS = 40  # below this a page is treated as scanned (no usable text layer)
+OCR_PAGE_SEPARATOR = "=== PAGE BREAK ==="
+
+# Scanned pages are OCR'd in small batches, several at once, so a 40-page scan is
+# many short requests instead of one long one that fails as a whole.
+OCR_PAGES_PER_BATCH = 4
+OCR_MAX_WORKERS = 4
+OCR_MAX_RETRIES = 2
+OCR_RETRY_BACKOFF_SECONDS = 1.0
+UNREADABLE_PAGE = "[Page {number} could not be read.]"
+_UNREADABLE_PAGE_RE = re.compile(re.escape(UNREADABLE_PAGE).replace(r"\{number\}", r"\d+"))
+
+
+def has_unreadable_pages(text):
+    """True if `text` contains an UNREADABLE_PAGE placeholder (a page whose OCR failed)."""
+    return bool(_UNREADABLE_PAGE_RE.search(text or ""))
+
+
+def read_pdf(pdf_bytes):
+    return PdfReader(io.BytesIO(pdf_bytes))
+
+
+def extract_pages(pdf_bytes):
+    """Returns one entry per page: the embedded text, or None if the page needs OCR."""
+    reader = read_pdf(pdf_bytes)
+    pages = []
+    for page in reader.pages:
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            text = ""
+        text = text.strip()
+        pages.append(text if len(text) >= MIN_PAGE_CHARS else None)
+    return pages
+
+
+def subset_pdf(pdf_bytes, page_numbers):
+    """A new PDF containing only `page_numbers` (0-based), for sending scanned pages to OCR."""
+    reader = read_pdf(pdf_bytes)
+    writer = PdfWriter()
+    for number in page_numbers:
+        writer.add_page(reader.pages[number])
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def build_ocr_prompt(page_count):
+    return f"""
+    Transcribe ALL the text from the {page_count} attached document page(s) exactly as written.
+    Do not explain or summarize.
+    Respond with ONLY the text. Separate pages with a line containing exactly: {OCR_PAGE_SEPARATOR}
+    """
+
+
+def ocr_pages(model, scanned_pdf_bytes, page_numbers):
+    """OCRs a PDF holding only the scanned pages. Returns {original_page_number: text}.
+
+    Raises ValueError if a multi-page reply cannot be split back into pages.
+    """
+    data_part = {'mime_type': 'application/pdf', 'data': scanned_pdf_bytes}
+    response = model.generate_content([build_ocr_prompt(len(page_numbers)), data_part])
+    texts = [t.strip() for t in response.text.split(OCR_PAGE_SEPARATOR)]
+    if len(page_numbers) == 1:
+        texts = ["\n\n".join(texts)]
+    if len(texts) != len(page_numbers):
+        raise ValueError(f"expected {len(page_numbers)} pages from OCR, got {len(texts)}")
+    return dict(zip(page_numbers, texts))
+
+
+def ocr_batch_with_retry(model, pdf_bytes, batch, on_pages=None):
+    """OCRs one batch with retries; if it keeps failing, retries its pages one by one.
+
+    Returns ({page_number: text}, bytes_uploaded). Pages that never succeed get a placeholder.
+    `on_pages`, if given, is called with {page_number: text} as each page (or the whole
+    batch) is resolved, so one-by-one retries are reported page by page.
+    """
+    uploaded = 0
+    for attempt in range(OCR_MAX_RETRIES + 1):
+        try:
+            scanned = subset_pdf(pdf_bytes, batch)
+            uploaded += len(scanned)
+            texts = ocr_pages(model, scanned, batch)
+            break
+        except Exception:
+            if attempt < OCR_MAX_RETRIES:
+                time.sleep(OCR_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+    else:
+        if len(batch) > 1:
+            texts = {}
+            for number in batch:
+                page_texts, page_bytes = ocr_batch_with_retry(model, pdf_bytes, [number], on_pages)
+                texts.update(page_texts)
+                uploaded += page_bytes
+            return texts, uploaded
+        texts = {batch[0]: UNREADABLE_PAGE.format(number=batch[0] + 1)}
+    if on_pages:
+        on_pages(texts)
+    return texts, uploaded
+
+
+def extract_pdf_text(model, pdf_bytes, progress=None):
+    """Full document text: local text layer where present, Gemini OCR for the rest.
+
+    Scanned pages are OCR'd in batches of OCR_PAGES_PER_BATCH with at most
+    OCR_MAX_WORKERS in flight and merged back in page order. `progress`, if
+    given, is called as progress(pages_done, total_pages) from the calling thread,
+    once for every page as its OCR result (or placeholder) comes in.
+
+    Returns (text, stats) where stats records how many pages needed OCR, how
+    many bytes were uploaded for it, and which pages (1-based) OCR could not read;
+    those pages appear in the text as UNREADABLE_PAGE placeholders.
+    """
+    pages = extract_pages(pdf_bytes)
+    missing = [i for i, text in enumerate(pages) if text is None]
+    total = len(pages)
+    done = total - len(missing)
+    if progress:
+        progress(done, total)
+
+    uploaded = 0
+    if missing:
+        batches = [missing[i:i + OCR_PAGES_PER_BATCH] for i in range(0, len(missing), OCR_PAGES_PER_BATCH)]
+        results = queue.Queue()  # {page_number: text} from the workers, as pages resolve
+        with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="pdf-ocr") as pool:
+            futures = [pool.submit(ocr_batch_with_retry, model, pdf_bytes, batch, results.put) for batch in batches]
+            pending = set(missing)
+            while pending:
+                try:
+                    texts = results.get(timeout=0.2)
+                except queue.Empty:
+                    for future in futures:
+                        if future.done() and future.exception() is not None:
+                            raise future.exception()
+                    continue
+                for number, text in texts.items():
+                    pages[number] = text
+                    pending.discard(number)
+                    done += 1
+                    if progress:
+                        progress(done, total)
+            uploaded = sum(future.result()[1] for future in futures)
+
+    unreadable = [n + 1 for n in missing if pages[n] == UNREADABLE_PAGE.format(number=n + 1)]
+    text = "\n\n".join(p for p in pages if p)
+    return text, {"pages": total, "ocr_pages": len(missing), "ocr_bytes": uploaded, "unreadable_pages": unreadable}
@@ -0,0 +1,197 @@
+import logging
+import math
+import os
+import re
+from collections import Counter
+
+from fast_answer import tokenize
+
+logger = logging.getLogger("nyay.prompt")
+
+# --- TOKEN BUDGET ---
+# Ceiling for the whole RAG prompt, and the share of it each section may use.
+# Whatever a section leaves unused is handed on to the next one in BUDGET_ORDER.
+PROMPT_TOKEN_BUDGET = int(os.environ.get("NYAY_PROMPT_TOKEN_BUDGET", "6000"))
+SECTION_SHARES = {
+    "question": 0.10,
+    "chat_history": 0.15,
+    "guides": 0.40,
+    "document": 0.35,
+}
+BUDGET_ORDER = ["question", "chat_history", "guides", "document"]
+DOCUMENT_CHUNK_CHARS = 600
+
+
+def count_tokens(text):
+    """Cheap local estimate of Gemini tokens: ~4 ASCII chars or ~2 non-ASCII chars per token.
+
+    Indic scripts tokenize much less densely than English, so they are counted separately.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4 + non_ascii / 2)
+
+
+def truncate_to_tokens(text, budget):
+    """Cuts `text` to at most `budget` estimated tokens, on a word boundary where possible."""
+    if count_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= budget - 1:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    space = cut.rfind(" ")
+    if space > lo * 0.8:
+        cut = cut[:space]
+    return cut + "…"
+
+
+def split_document(text, chunk_chars=DOCUMENT_CHUNK_CHARS):
+    """Splits raw document text into ~chunk_chars pieces along paragraph, then sentence, breaks."""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?।;])\s+", paragraph):
+            while len(sentence) > chunk_chars:
+                pieces.append(sentence[:chunk_chars])
+                sentence = sentence[chunk_chars:]
+            if sentence:
+                pieces.append(sentence)
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > chunk_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def rank_by_relevance(question, chunks):
+    """Indices of `chunks` ordered by TF-IDF overlap with the question (ties keep document order)."""
+    query_terms = set(tokenize(question))
+    chunk_tokens = [tokenize(c) for c in chunks]
+    doc_freq = Counter()
+    for tokens in chunk_tokens:
+        doc_freq.update(set(tokens))
+    n = len(chunks)
+
+    def score(i):
+        tokens = chunk_tokens[i]
+        if not tokens:
+            return 0.0
+        tf = Counter(tokens)
+        return sum((tf[t] / len(tokens)) * math.log(1 + n / doc_freq[t]) for t in query_terms if t in tf)
+
+    return sorted(range(n), key=lambda i: (-score(i), i))
+
+
+def select_document_text(question, document_text, budget):
+    """Keeps the chunks most relevant to the question that fit `budget`, in original order."""
+    if count_tokens(document_text) <= budget:
+        return document_text
+    chunks = split_document(document_text)
+    chosen, used = [], 0
+    for i in rank_by_relevance(question, chunks):
+        cost = count_tokens(chunks[i]) + 1
+        if used + cost > budget:
+            continue
+        chosen.append(i)
+        used += cost
+    return "\n...\n".join(chunks[i] for i in sorted(chosen))
+
+
+def select_guides(docs, budget):
+    """Keeps retrieved guide chunks best-first until the budget is spent; trims the last one to fit."""
+    kept, texts, used = [], [], 0
+    for doc in docs:
+        remaining = budget - used
+        if remaining <= 20:
+            break
+        text = truncate_to_tokens(doc.page_content, remaining)
+        kept.append(doc)
+        texts.append(text)
+        used += count_tokens(text) + 1
+    return kept, "\n\n".join(texts)
+
+
+def keep_recent(history, budget):
+    """Trims chat history from the front so the most recent part survives."""
+    if count_tokens(history) <= budget:
+        return history
+    lines = history.split("\n")
+    kept, used = [], 0
+    for line in reversed(lines):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+
+# --- PACKER ---
+def pack_rag_inputs(inputs, template_tokens=0, budget=PROMPT_TOKEN_BUDGET, no_document=None):
+    """Fits retrieved guides, document text, history and question into the prompt budget.
+
+    `inputs` holds "context" (retrieved Documents), "question", "language",
+    "chat_history" and "document_context". Returns a dict with the prompt
+    "variables", the guide "docs" actually used and a per-section "tokens" breakdown.
+    """
+    question = inputs["question"]
+    available = max(0, budget - template_tokens)
+    allowance = {name: int(available * share) for name, share in SECTION_SHARES.items()}
+
+    packed, spare = {}, 0
+
+    def take(name, cost):
+        nonlocal spare
+        left = allowance[name] + spare - cost
+        spare = max(0, left)
+
+    packed["question"] = truncate_to_tokens(question, allowance["question"] + spare)
+    take("question", count_tokens(packed["question"]))
+
+    packed["chat_history"] = keep_recent(inputs["chat_history"], allowance["chat_history"] + spare)
+    take("chat_history", count_tokens(packed["chat_history"]))
+
+    docs, packed["context"] = select_guides(inputs["context"], allowance["guides"] + spare)
+    take("guides", count_tokens(packed["context"]))
+
+    document_text = inputs["document_context"]
+    if document_text != no_document:
+        document_text = select_document_text(question, document_text, allowance["document"] + spare)
+    packed["document_context"] = document_text
+    packed["language"] = inputs["language"]
+
+    tokens = {
+        "template": template_tokens,
+        "question": count_tokens(packed["question"]),
+        "chat_history": count_tokens(packed["chat_history"]),
+        "guides": count_tokens(packed["context"]),
+        "document": count_tokens(packed["document_context"]),
+    }
+    tokens["total"] = sum(tokens.values())
+    tokens["budget"] = budget
+    tokens["document_raw"] = count_tokens(inputs["document_context"])
+    logger.info(
+        "prompt tokens total=%(total)d/%(budget)d template=%(template)d question=%(question)d "
+        "history=%(chat_history)d guides=%(guides)d document=%(document)d (raw document=%(document_raw)d)",
+        tokens,
+    )
+    return {"variables": packed, "docs": docs, "tokens": tokens}
@@ -0,0 +1,208 @@
+"""Headless JSON API for the "What to do" RAG pipeline (WhatsApp bot, IVR, partners).
+
+Uses the same retriever, prompt and chain as the Streamlit app (rag_pipeline).
+
+    GET  /health
+    POST /v1/answer          -> {"answer", "sources", "answer_mode", "source_from_document"}
+    POST /v1/answer/stream   -> NDJSON events: {"type": "token", "text"}..., {"type": "sources"}, {"type": "done"}
+
+Request body:
+    {"question": "...", "language": "Hindi (in Roman script)",
+     "chat_history": [{"role": "user", "content": "..."}, ...],   # optional, oldest first
+     "document_context": "text of an uploaded notice"}              # optional
+
+Needs GOOGLE_API_KEY and the FAISS index from ingest.py. Set NYAY_QA_API_KEY to require
+an "X-API-Key" header. Each worker process loads its own retriever and model at startup.
+
+Usage:
+    pip install -r api_requirements.txt
+    python qa_api.py --workers 4 --port 8503
+"""
+import argparse
+import contextlib
+import json
+import os
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from coalesce import SingleFlight
+from rag_pipeline import (ANSWER_MODE, NO_DOCUMENT, answer_question, build_rag_chain, load_retriever,
+                          source_metadata, stream_answer)
+
+QA_API_HOST = os.environ.get("NYAY_QA_API_HOST", "127.0.0.1")
+QA_API_PORT = int(os.environ.get("NYAY_QA_API_PORT", "8503"))
+QA_API_KEY = os.environ.get("NYAY_QA_API_KEY")
+QA_API_WORKERS = int(os.environ.get("NYAY_QA_API_WORKERS", "1"))
+MODEL_NAME = os.environ.get("NYAY_MODEL_NAME", "gemini-2.5-flash")
+MAX_BODY_BYTES = 512 * 1024
+
+
+# --- PIPELINE ---
+def load_components():
+    """Retriever, RAG chain and Gemini model, as app.py builds them."""
+    import google.generativeai as genai
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    retriever = load_retriever()
+    llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.5)
+    return {
+        "retriever": retriever,
+        "chain": build_rag_chain(retriever, llm),
+        "model": genai.GenerativeModel(MODEL_NAME),
+        "singleflight": SingleFlight(),
+    }
+
+
+def parse_request(body):
+    """(question, language, messages, document_context); raises ValueError on a bad body."""
+    data = json.loads(body or b"{}")
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    question = str(data.get("question") or "").strip()
+    if not question:
+        raise ValueError("'question' is required")
+    history = data.get("chat_history") or []
+    if not isinstance(history, list) or not all(isinstance(m, dict) and "content" in m for m in history):
+        raise ValueError("'chat_history' must be a list of {\"role\", \"content\"} objects")
+    messages = [{"role": m.get("role", "user"), "content": str(m["content"])} for m in history]
+    messages.append({"role": "user", "content": question})
+    document_context = data.get("document_context") or NO_DOCUMENT
+    return question, data.get("language") or "Simple English", messages, str(document_context)
+
+
+def _ndjson(event):
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+# --- ENDPOINTS ---
+def _authorized(request):
+    return not QA_API_KEY or request.headers.get("x-api-key") == QA_API_KEY
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+async def _read_body(request):
+    """The request body; raises BodyTooLarge past MAX_BODY_BYTES without reading the rest."""
+    length = request.headers.get("content-length")
+    if length is not None:
+        if not (length.isascii() and length.isdigit()):
+            raise ValueError("Invalid Content-Length")
+        if int(length) > MAX_BODY_BYTES:
+            raise BodyTooLarge()
+    body = bytearray()
+    async for chunk in request.stream():  # chunked bodies have no Content-Length
+        body += chunk
+        if len(body) > MAX_BODY_BYTES:
+            raise BodyTooLarge()
+    return bytes(body)
+
+
+async def _parsed(request):
+    if not _authorized(request):
+        return None, JSONResponse({"error": "Missing or invalid X-API-Key"}, status_code=401)
+    try:
+        return parse_request(await _read_body(request)), None
+    except BodyTooLarge:
+        return None, JSONResponse({"error": f"Request body over {MAX_BODY_BYTES} bytes"}, status_code=413)
+    except ValueError as e:  # json.JSONDecodeError is a ValueError
+        return None, JSONResponse({"error": str(e)}, status_code=400)
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def answer(request):
+    parsed, error = await _parsed(request)
+    if error:
+        return error
+    question, language, messages, document_context = parsed
+    c = request.app.state.components
+    try:
+        message = await run_in_threadpool(
+            answer_question, c["chain"], c["model"], question, language, messages, document_context,
+            singleflight=c["singleflight"], retriever=c["retriever"], mode=ANSWER_MODE,
+        )
+    except Exception as e:
+        return JSONResponse({"error": f"Answering failed: {e}"}, status_code=502)
+    return JSONResponse({
+        "answer": message["content"],
+        "sources": source_metadata(message["sources_from_guides"]),
+        "answer_mode": message["answer_mode"],
+        "source_from_document": message["source_from_document"],
+    })
+
+
+async def answer_stream(request):
+    """Streams the answer as the LLM produces it, through rag_pipeline.stream_answer.
+
+    Same coalescing, timeout and extractive fallback as /v1/answer, without the
+    document-usage audit. An error after the first token ends the stream with an
+    "error" event.
+    """
+    parsed, error = await _parsed(request)
+    if error:
+        return error
+    question, language, messages, document_context = parsed
+    c = request.app.state.components
+
+    def events():
+        # A sync generator: Starlette iterates it in its threadpool, so waiting on the
+        # LLM does not block the event loop.
+        try:
+            for kind, value in stream_answer(c["chain"], question, language, messages, document_context,
+                                             singleflight=c["singleflight"], retriever=c["retriever"],
+                                             mode=ANSWER_MODE):
+                if kind == "token":
+                    yield _ndjson({"type": "token", "text": value})
+                else:
+                    message = value
+        except Exception as e:
+            yield _ndjson({"type": "error", "error": str(e)})
+            return
+        yield _ndjson({"type": "sources", "sources": source_metadata(message["sources_from_guides"])})
+        yield _ndjson({"type": "done", "answer_mode": message["answer_mode"]})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def create_app(components=None):
+    """The ASGI app. Without `components` (see load_components) they are loaded at startup."""
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        if app.state.components is None:
+            app.state.components = await run_in_threadpool(load_components)
+        yield
+
+    app = Starlette(routes=[
+        Route("/health", health),
+        Route("/v1/answer", answer, methods=["POST"]),
+        Route("/v1/answer/stream", answer_stream, methods=["POST"]),
+    ], lifespan=lifespan)
+    app.state.components = components
+    return app
+
+
+app = create_app()
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=QA_API_HOST)
+    parser.add_argument("--port", type=int, default=QA_API_PORT)
+    parser.add_argument("--workers", type=int, default=QA_API_WORKERS, help="Worker processes.")
+    args = parser.parse_args(argv)
+    uvicorn.run("qa_api:app", host=args.host, port=args.port, workers=args.workers,
+                access_log=False, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
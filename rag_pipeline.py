@@ -0,0 +1,339 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableParallel, RunnablePassthrough
+from langchain_core.output_parsers import StrOutputParser
+from operator import itemgetter
+
+from coalesce import make_key
+from fast_answer import build_action_plan
+from prompt_packer import PROMPT_TOKEN_BUDGET, count_tokens, pack_rag_inputs
+from session_index import document_passages
+
+DB_FAISS_PATH = "vectorstores/db_faiss"
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+NO_DOCUMENT = "No document uploaded."
+
+# "llm": always call Gemini. "auto": fall back to the extractive answer on errors or slow
+# responses. "extractive": never call Gemini (very low-latency deployments).
+ANSWER_MODE = os.environ.get("NYAY_ANSWER_MODE", "auto")
+LLM_TIMEOUT_SECONDS = float(os.environ.get("NYAY_LLM_TIMEOUT_SECONDS", "20"))
+RETRIEVER_K = 3
+RETRIEVER_SCORE_THRESHOLD = 0.3
+SNIPPET_CHARS = 300
+
+# Runs LLM calls in "auto" mode so we can stop waiting after LLM_TIMEOUT_SECONDS. Sized for
+# one call per concurrent session, so a call starts at once instead of queueing behind
+# others (and behind timed-out calls that are still running).
+LLM_WORKERS = int(os.environ.get("NYAY_LLM_WORKERS", "64"))
+_llm_pool = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="rag-llm")
+
+logger = logging.getLogger("nyay.rag")
+
+# --- RAG PROMPT TEMPLATE ---
+rag_prompt_template = """
+You are 'Nyay-Saathi,' a kind legal friend.
+A common Indian citizen is asking for help.
+You have two sources of information. Prioritize the MOST relevant one.
+1. CONTEXT_FROM_GUIDES: (General guides from a database)
+{context}
+
+2. DOCUMENT_CONTEXT: (Specific text from a document the user uploaded)
+{document_context}
+
+Answer the user's 'new question' based on the most relevant context.
+If the 'new question' is a follow-up, use the 'chat history' to understand it.
+Do not use any legal jargon.
+Give a simple, step-by-step action plan in the following language: {language}.
+If no context is relevant, just say "I'm sorry, I don't have enough information on that. Please contact NALSA."
+
+CHAT HISTORY:
+{chat_history}
+
+NEW QUESTION:
+{question}
+
+Your Simple, Step-by-Step Action Plan (in {language}):
+"""
+
+rag_prompt = PromptTemplate.from_template(rag_prompt_template)
+RAG_TEMPLATE_TOKENS = count_tokens(rag_prompt_template)
+
+
+# --- RETRIEVER ---
+def load_embeddings():
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME, model_kwargs={'device': 'cpu'})
+
+
+def load_vectorstore(embeddings=None, db_path=DB_FAISS_PATH):
+    from langchain_community.vectorstores import FAISS
+    embeddings = embeddings or load_embeddings()
+    return FAISS.load_local(db_path, embeddings, allow_dangerous_deserialization=True)
+
+
+def load_retriever(embeddings=None, db_path=DB_FAISS_PATH):
+    db = load_vectorstore(embeddings, db_path)
+    return db.as_retriever(
+        search_type="similarity_score_threshold",
+        search_kwargs={
+            "k": RETRIEVER_K,
+            "score_threshold": RETRIEVER_SCORE_THRESHOLD
+        }
+    )
+
+
+def format_docs(docs):
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+def source_metadata(docs):
+    """JSON-safe source list: each guide's metadata plus the start of the retrieved text."""
+    return [{**{k: v for k, v in doc.metadata.items() if isinstance(v, (str, int, float, bool))},
+             "snippet": doc.page_content[:SNIPPET_CHARS]} for doc in docs]
+
+
+# --- THE RAG CHAIN ---
+def build_rag_chain(retriever, llm, token_budget=PROMPT_TOKEN_BUDGET):
+    """Returns a runnable producing {"answer": str, "sources": [Document], "prompt_tokens": dict}.
+
+    Retrieved guides, document text and chat history are packed into
+    `token_budget` (see prompt_packer) before the prompt is rendered.
+    """
+    def pack(x):
+        return pack_rag_inputs(x, template_tokens=RAG_TEMPLATE_TOKENS, budget=token_budget,
+                               no_document=NO_DOCUMENT)
+
+    return RunnableParallel(
+        {
+            "context": itemgetter("question") | retriever,
+            "question": itemgetter("question"),
+            "language": itemgetter("language"),
+            "chat_history": itemgetter("chat_history"),
+            "document_context": itemgetter("document_context")
+        }
+    ) | RunnablePassthrough.assign(packed=pack) | {
+        "answer": (
+            (lambda x: x["packed"]["variables"])
+            | rag_prompt
+            | llm
+            | StrOutputParser()
+        ),
+        "sources": (lambda x: x["packed"]["docs"]),
+        "prompt_tokens": (lambda x: x["packed"]["tokens"])
+    }
+
+
+# --- "WHAT TO DO" FLOW ---
+def format_chat_history(messages):
+    """The last four messages before the newest one, as 'role: content' lines."""
+    return "\n".join([f"{m['role']}: {m['content']}" for m in messages[-5:-1]])
+
+
+def audit_document_usage(model, question, answer, document_context):
+    """Asks the model whether the answer came from the uploaded document."""
+    audit_prompt = f"""
+    You are an auditor.
+    Question: "{question}"
+    Answer: "{answer}"
+    Context: "{document_context[:2000]}"
+
+    Did the "Answer" come primarily from the "Context"?
+    Respond with ONLY the word 'YES' or 'NO'.
+    """
+    try:
+        audit_response = model.generate_content(audit_prompt)
+        return "YES" in audit_response.text.upper()
+    except Exception:
+        return False
+
+
+def extractive_answer(retriever, question, language, document_context):
+    """Builds the assistant message from retrieved sections only (no LLM call)."""
+    try:
+        docs = retriever.invoke(question)
+    except Exception:
+        docs = []
+    doc_text = document_context if document_context != NO_DOCUMENT else None
+    answer, used_document = build_action_plan(question, docs, language, doc_text)
+    return {
+        "role": "assistant",
+        "content": answer,
+        "sources_from_guides": docs,
+        "source_from_document": used_document,
+        "answer_mode": "extractive"
+    }
+
+
+def call_with_timeout(fn, timeout):
+    """fn() on the LLM pool; raises TimeoutError if it runs for more than `timeout` seconds.
+
+    The clock starts when a worker picks the call up, so time spent queued does not
+    count. A call still queued after another `timeout` seconds is cancelled.
+    """
+    started = threading.Event()
+
+    def run():
+        started.set()
+        return fn()
+
+    future = _llm_pool.submit(run)
+    if not started.wait(timeout) and future.cancel():
+        raise FutureTimeout(f"no free LLM worker after {timeout}s")
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise
+
+
+def _rag_payload(question, language, messages, document_context, memory):
+    return {
+        "question": question,
+        "language": language,
+        "chat_history": memory.render() if memory is not None else format_chat_history(messages),
+        "document_context": document_context,
+    }
+
+
+def _rag_key(payload):
+    return make_key("rag", payload["question"], payload["language"], payload["chat_history"],
+                    payload["document_context"])
+
+
+def answer_question(chain, model, question, language, messages, document_context, singleflight=None,
+                    retriever=None, mode=ANSWER_MODE, timeout=LLM_TIMEOUT_SECONDS, memory=None,
+                    document_index=None):
+    """Runs one chat turn. `messages` must already end with the user's question.
+
+    With a ConversationMemory, the chat history sent to the LLM is its running
+    summary plus the last turn instead of the last four messages. With a
+    SessionDocumentIndex, only the document passages relevant to the question
+    are sent instead of the whole document.
+
+    With a `retriever` and mode "auto", an LLM error or a response slower than
+    `timeout` seconds returns the extractive answer instead of raising.
+    Returns the assistant message dict that the UI appends to the history.
+    """
+    document_context = document_passages(document_index, document_context, question, NO_DOCUMENT)
+
+    if mode == "extractive" and retriever is not None:
+        return extractive_answer(retriever, question, language, document_context)
+
+    invoke_payload = _rag_payload(question, language, messages, document_context, memory)
+
+    def _invoke():
+        if singleflight is not None:
+            return singleflight.do(_rag_key(invoke_payload), chain.invoke, invoke_payload)
+        return chain.invoke(invoke_payload)
+
+    if mode == "auto" and retriever is not None:
+        try:
+            response_dict = call_with_timeout(_invoke, timeout)
+        except Exception:
+            # Covers both TimeoutError and upstream errors (quota, network).
+            logger.warning("LLM answer failed; falling back to the extractive answer", exc_info=True)
+            return extractive_answer(retriever, question, language, document_context)
+    else:
+        response_dict = _invoke()
+    response = response_dict["answer"]
+    docs = response_dict["sources"]
+
+    used_document = False
+    if not docs and document_context != NO_DOCUMENT:
+        used_document = audit_document_usage(model, question, response, document_context)
+
+    return {
+        "role": "assistant",
+        "content": response,
+        "sources_from_guides": docs,
+        "source_from_document": used_document,
+        "answer_mode": "llm",
+        "prompt_tokens": response_dict.get("prompt_tokens")
+    }
+
+
+def stream_answer(chain, question, language, messages, document_context, singleflight=None, retriever=None,
+                  mode=ANSWER_MODE, timeout=LLM_TIMEOUT_SECONDS, memory=None, document_index=None):
+    """answer_question for streaming clients: yields ("token", text) pieces, then ("done", message).
+
+    Same inputs, modes, coalescing and fallback as answer_question, except that the
+    document-usage audit (an extra LLM call after the answer) is skipped. `timeout`
+    applies to each wait for the next piece. A request that coalesces onto one
+    already in flight gets that answer in a single piece when it is complete.
+
+    With a `retriever` and mode "auto", an LLM error or timeout before the first
+    piece yields the extractive answer instead; later errors are raised.
+    """
+    document_context = document_passages(document_index, document_context, question, NO_DOCUMENT)
+
+    if mode == "extractive" and retriever is not None:
+        message = extractive_answer(retriever, question, language, document_context)
+        yield "token", message["content"]
+        yield "done", message
+        return
+
+    payload = _rag_payload(question, language, messages, document_context, memory)
+    pieces = queue.Queue()  # answer text as it arrives, then None
+    started = threading.Event()
+
+    def _stream():
+        response = {"answer": ""}
+        for chunk in chain.stream(payload):
+            for key, value in chunk.items():
+                if key == "answer":
+                    response["answer"] += value
+                    pieces.put(value)
+                else:
+                    response[key] = value
+        return response
+
+    def _run():
+        started.set()
+        try:
+            if singleflight is not None:
+                return singleflight.do(_rag_key(payload), _stream)
+            return _stream()
+        finally:
+            pieces.put(None)
+
+    future = _llm_pool.submit(_run)
+    sent = False
+    try:
+        # As in call_with_timeout, time spent waiting for a free LLM worker does not count.
+        if not started.wait(timeout) and future.cancel():
+            raise FutureTimeout(f"no free LLM worker after {timeout}s")
+        while True:
+            try:
+                piece = pieces.get(timeout=timeout)
+            except queue.Empty:
+                raise FutureTimeout(f"no answer text for {timeout}s") from None
+            if piece is None:
+                break
+            yield "token", piece
+            sent = True
+        response = future.result()
+        if not sent and response["answer"]:
+            yield "token", response["answer"]  # coalesced onto another request's call
+    except Exception:
+        if sent or mode != "auto" or retriever is None:
+            raise
+        logger.warning("LLM stream failed; falling back to the extractive answer", exc_info=True)
+        message = extractive_answer(retriever, question, language, document_context)
+        yield "token", message["content"]
+        yield "done", message
+        return
+
+    yield "done", {
+        "role": "assistant",
+        "content": response["answer"],
+        "sources_from_guides": response.get("sources", []),
+        "source_from_document": False,
+        "answer_mode": "llm",
+        "prompt_tokens": response.get("prompt_tokens"),
+    }
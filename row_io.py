@@ -0,0 +1,27 @@
+import csv
+import io
+import json
+
+# --- ROW FILES ---
+# Shared by the batch tools (bulk_documents, batch_qa) and the bulk upload in the
+# Document Generator: one row per CSV line, JSONL line or JSON array element.
+
+
+def read_rows(data, filename):
+    """Rows from CSV, JSON (an array of objects) or JSONL bytes; the format is taken from the file extension.
+
+    Rows are normally dicts. JSON values that are not objects are passed through as
+    rows, so callers can report them per row instead of failing the whole file.
+    """
+    text = data.decode("utf-8-sig")
+    name = filename.lower()
+    if name.endswith(".json"):
+        rows = json.loads(text)
+        if isinstance(rows, dict):
+            return [rows]
+        if not isinstance(rows, list):
+            raise ValueError("A .json file must hold an array of objects, one per row")
+        return rows
+    if name.endswith((".jsonl", ".ndjson")):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return list(csv.DictReader(io.StringIO(text)))
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# --- PER-SESSION DOCUMENT INDEX ---
+# The uploaded document is chunked and embedded once, after the Explain step, so
+# follow-up prompts carry only the passages relevant to each question.
+
+SESSION_INDEX_MAX_MB = float(os.environ.get("NYAY_SESSION_INDEX_MAX_MB", "8"))
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+DEFAULT_K = 4
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+
+
+class SessionDocumentIndex:
+    """Small in-memory cosine-similarity index over one uploaded document."""
+
+    def __init__(self, chunks, vectors, embeddings, truncated=False):
+        self.chunks = chunks
+        self.vectors = vectors
+        self.embeddings = embeddings
+        self.truncated = truncated
+
+    @classmethod
+    def build(cls, text, embeddings, max_mb=SESSION_INDEX_MAX_MB, dim=EMBEDDING_DIM):
+        """Chunks and embeds `text`, dropping trailing chunks beyond the per-session memory cap."""
+        splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        chunks = splitter.split_text(text)
+
+        budget = int(max_mb * 1024 * 1024)
+        kept, used = [], 0
+        for chunk in chunks:
+            cost = len(chunk.encode("utf-8")) + dim * 4
+            if used + cost > budget:
+                break
+            kept.append(chunk)
+            used += cost
+        truncated = len(kept) < len(chunks)
+
+        if not kept:
+            return cls([], np.zeros((0, 0), dtype=np.float32), embeddings, truncated)
+        vectors = np.asarray(embeddings.embed_documents(kept), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        return cls(kept, vectors, embeddings, truncated)
+
+    def search(self, query, k=DEFAULT_K):
+        """Returns up to k (index, score, chunk) tuples, best first."""
+        if not self.chunks or not query:
+            return []
+        q = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q /= norm
+        scores = self.vectors @ q
+        k = min(k, len(self.chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i]), self.chunks[i]) for i in top]
+
+    def relevant_text(self, query, k=DEFAULT_K):
+        """The top-k passages for `query`, joined in document order."""
+        hits = sorted(self.search(query, k), key=lambda hit: hit[0])
+        return "\n...\n".join(chunk for _, _, chunk in hits)
+
+    def memory_bytes(self):
+        return self.vectors.nbytes + sum(len(c.encode("utf-8")) for c in self.chunks)
+
+    def close(self):
+        self.chunks = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+
+
+def document_passages(index, document_context, query, no_document, k=DEFAULT_K, fallback_chars=None):
+    """Document text for a prompt: relevant passages from the index, else the (optionally clipped) full text."""
+    if document_context == no_document:
+        return document_context
+    if index is not None and index.chunks:
+        text = index.relevant_text(query, k)
+        if text:
+            return text
+    return document_context[:fallback_chars] if fallback_chars else document_context
@@ -0,0 +1,154 @@
+import json
+
+# --- INCREMENTAL JSON OBJECT PARSER ---
+# Reads a streamed top-level JSON object chunk by chunk and exposes its string
+# fields while they are still arriving, so the UI can render them progressively
+# and a cut-off stream still yields whatever text was received.
+
+_BEFORE, _KEY_OR_END, _KEY, _COLON, _VALUE, _STRING, _OTHER, _AFTER_VALUE, _DONE = range(9)
+
+
+def _trim_partial_escape(raw):
+    """Drops an escape sequence still being streamed: "\\", "\\u12" or a lone high surrogate."""
+    i = raw.rfind("\\")
+    if i == -1:
+        return raw
+    j = i
+    while j >= 0 and raw[j] == "\\":
+        j -= 1
+    if (i - j) % 2 == 0:
+        return raw  # the last backslash is itself escaped
+    tail = raw[i + 1:]
+    if not tail or (tail[0] == "u" and len(tail) < 5):
+        return raw[:i]
+    if tail[0] == "u" and len(tail) == 5 and 0xD800 <= int(tail[1:], 16) <= 0xDBFF:
+        return raw[:i]
+    return raw
+
+
+def _decode(raw, partial):
+    if partial:
+        # Twice: "\ud83d\ude0" loses the cut low half, then the now-dangling high half.
+        raw = _trim_partial_escape(_trim_partial_escape(raw))
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+
+class IncrementalJSONObject:
+    """Push parser for one JSON object whose interesting values are strings.
+
+    Text before the opening brace (e.g. a ```json fence) is ignored. Non-string
+    values are skipped. `values()` returns every string field seen so far,
+    including the one currently being streamed.
+    """
+
+    def __init__(self):
+        self._state = _BEFORE
+        self._key = []
+        self._raw = []
+        self._escaped = False
+        self._depth = 0
+        self._in_nested_string = False
+        self._current_key = None
+        self._fields = {}
+        self.completed = set()
+
+    @property
+    def done(self):
+        return self._state == _DONE
+
+    def feed(self, chunk):
+        for ch in chunk:
+            self._step(ch)
+
+    def _step(self, ch):
+        state = self._state
+        if state == _BEFORE:
+            if ch == "{":
+                self._state = _KEY_OR_END
+        elif state == _KEY_OR_END:
+            if ch == '"':
+                self._key, self._escaped, self._state = [], False, _KEY
+            elif ch == "}":
+                self._state = _DONE
+        elif state == _KEY:
+            if self._escaped:
+                self._key.append(ch)
+                self._escaped = False
+            elif ch == "\\":
+                self._key.append(ch)
+                self._escaped = True
+            elif ch == '"':
+                self._current_key = _decode("".join(self._key), partial=False)
+                self._state = _COLON
+            else:
+                self._key.append(ch)
+        elif state == _COLON:
+            if ch == ":":
+                self._state = _VALUE
+        elif state == _VALUE:
+            if ch == '"':
+                self._raw, self._escaped, self._state = [], False, _STRING
+                self._fields[self._current_key] = self._raw
+            elif not ch.isspace():
+                self._depth, self._in_nested_string, self._escaped = 0, False, False
+                self._state = _OTHER
+                self._step_other(ch)
+        elif state == _STRING:
+            if self._escaped:
+                self._raw.append(ch)
+                self._escaped = False
+            elif ch == "\\":
+                self._raw.append(ch)
+                self._escaped = True
+            elif ch == '"':
+                self.completed.add(self._current_key)
+                self._state = _AFTER_VALUE
+            else:
+                self._raw.append(ch)
+        elif state == _OTHER:
+            self._step_other(ch)
+        elif state == _AFTER_VALUE:
+            if ch == ",":
+                self._state = _KEY_OR_END
+            elif ch == "}":
+                self._state = _DONE
+
+    def _step_other(self, ch):
+        """Skips a number, literal, array or nested object."""
+        if self._in_nested_string:
+            if self._escaped:
+                self._escaped = False
+            elif ch == "\\":
+                self._escaped = True
+            elif ch == '"':
+                self._in_nested_string = False
+            return
+        if ch == '"':
+            self._in_nested_string = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            if self._depth == 0:
+                self._state = _DONE  # closing brace of the top-level object
+                return
+            self._depth -= 1
+            if self._depth == 0:
+                self._state = _AFTER_VALUE
+        elif ch == "," and self._depth == 0:
+            self._state = _KEY_OR_END
+
+    def values(self):
+        """{key: decoded string} for every string field seen so far."""
+        return {
+            key: _decode("".join(raw), partial=key not in self.completed)
+            for key, raw in self._fields.items()
+        }
+
+    def get(self, key, default=None):
+        raw = self._fields.get(key)
+        if raw is None:
+            return default
+        return _decode("".join(raw), partial=key not in self.completed)
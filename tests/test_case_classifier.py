@@ -0,0 +1,40 @@
+import math
+
+import numpy as np
+
+from case_classifier import CATEGORY_EXAMPLES, MIN_MARGIN, CaseClassifier
+
+LABELS = list(CATEGORY_EXAMPLES)
+
+
+class _Embeddings:
+    """Examples point at their own category's axis, plus seeded noise of scale `noise`."""
+
+    def __init__(self, noise):
+        self.noise = noise
+
+    def embed_documents(self, texts):
+        rows = []
+        for text in texts:
+            vector = np.random.default_rng(sum(map(ord, text))).normal(size=len(LABELS) + 4) * self.noise
+            for index, label in enumerate(LABELS):
+                if text in CATEGORY_EXAMPLES[label] or text.startswith(label):
+                    vector[index] += 1.0
+            rows.append(vector.tolist())
+        return rows
+
+
+def test_separable_embedder_decides_locally():
+    classifier = CaseClassifier(_Embeddings(noise=0.2), local_decisions=True)
+    assert MIN_MARGIN <= classifier.min_margin < 1
+    assert classifier.decide([f"{LABELS[0]} case"]) == LABELS[0]
+
+
+def test_noisy_embedder_defers_to_llm():
+    classifier = CaseClassifier(_Embeddings(noise=5.0), local_decisions=True)
+    assert math.isinf(classifier.min_margin)
+    assert classifier.decide([f"{LABELS[0]} case"]) is None
+
+
+def test_explicit_margin_is_not_calibrated():
+    assert CaseClassifier(_Embeddings(noise=5.0), min_margin=0.1).min_margin == 0.1
@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from doc_templates import AUTO_PLACEHOLDERS, DOC_CONFIG, TEMPLATES, CompiledTemplate, compile_templates
+
+
+def _values(doc_type):
+    values = {name: f"<{name}>" for name in AUTO_PLACEHOLDERS}
+    for field in DOC_CONFIG[doc_type]["fields"]:
+        values[field["id"]] = 15000 if field.get("type") == "number" else f"Value of {field['label']}"
+    return values
+
+
+@pytest.mark.parametrize("doc_type", list(TEMPLATES))
+def test_compiled_templates_match_str_format(doc_type):
+    values = _values(doc_type)
+    assert TEMPLATES[doc_type].render(values) == DOC_CONFIG[doc_type]["template"].format(**values)
+
+
+@pytest.mark.parametrize("template", [
+    "a{{b}}c{x}d",
+    "{{x}}",
+    "{x}}}{{",
+    "{{{x}}}",
+    "{x}{y}",
+    "no placeholders",
+    "",
+])
+def test_escaped_braces_match_str_format(template):
+    values = {"x": "X", "y": 2}
+    assert CompiledTemplate(template).render(values) == template.format(**values)
+
+
+def test_missing_value_raises_key_error():
+    with pytest.raises(KeyError):
+        CompiledTemplate("Dear {name},").render({})
+
+
+@pytest.mark.parametrize("template", ["{x:>10}", "{x!r}", "{0}", "{x.attr}"])
+def test_only_plain_placeholders(template):
+    with pytest.raises(ValueError):
+        CompiledTemplate(template)
+
+
+@pytest.mark.parametrize("template, message", [
+    ("Dear {name}, you owe {amount}.", "placeholders without a field: ['amount']"),
+    ("Dear Sir,", "fields never used in the template: ['name']"),
+])
+def test_config_mismatch_raises(template, message):
+    config = {"Notice": {"template": template, "fields": [{"id": "name", "label": "Name"}]}}
+    with pytest.raises(ValueError, match=re.escape(message)):
+        compile_templates(config)
@@ -0,0 +1,103 @@
+import io
+import os
+
+import pytest
+
+import pdf_engine
+from doc_templates import DOC_CONFIG, render_document
+from memory_cache import MemoryLRU
+from pdf_engine import PDF, break_lines
+
+LONG_TOKENS = [
+    "a" * 300,
+    "Pay to account 1234567890" + "0" * 120 + " before the due date mentioned above.",
+    "See https://example.org/" + "very-long-path/" * 30 + " for the full order text.",
+    "ನಮಸ್ಕಾರ" * 60,
+    "short words " * 40 + "x" * 250 + " and a tail",
+]
+
+
+def _pdf():
+    pdf = PDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=11)
+    return pdf
+
+
+def _line_counts(text):
+    pdf = _pdf()
+    expected = len(pdf.multi_cell(0, 7, text, dry_run=True, output="LINES"))
+    width = pdf.epw - 2 * pdf.c_margin
+    actual = sum(len(break_lines(paragraph, width, pdf.get_string_width)) for paragraph in text.split("\n"))
+    return expected, actual
+
+
+def _sample_values(doc_type):
+    values = {"date": "January 01, 2026"}
+    for field in DOC_CONFIG[doc_type]["fields"]:
+        values[field["id"]] = 15000 if field.get("type") == "number" else f"Sample {field['label']}"
+    return values
+
+
+@pytest.mark.parametrize("text", LONG_TOKENS)
+def test_overwide_words_wrap_like_multi_cell(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")  # core-font path
+    expected, actual = _line_counts(text)
+    assert actual == expected
+
+
+@pytest.mark.parametrize("doc_type", list(DOC_CONFIG))
+def test_templates_wrap_like_multi_cell(doc_type):
+    expected, actual = _line_counts(render_document(doc_type, _sample_values(doc_type)))
+    assert actual == expected
+
+
+def test_no_line_wider_than_the_page():
+    pdf = _pdf()
+    width = pdf.epw - 2 * pdf.c_margin
+    for text in LONG_TOKENS:
+        text = text.encode("latin-1", "replace").decode("latin-1")
+        for line in break_lines(text, width, pdf.get_string_width):
+            assert pdf.get_string_width(" ".join(line)) <= width + 1e-6
+
+
+# --- Unicode fonts (tests/fonts: small OFL subsets, see tests/fonts/README) ---
+FIXTURE_FONTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+UNICODE_TEXT = "Tenant: रमेश कुमार, किरायेदार।\nLandlord: రమేష్ కుమార్, అద్దెదారు।\nRent is due on the 5th."
+
+
+@pytest.fixture
+def fixture_fonts(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_engine, "FONT_DIRS", [FIXTURE_FONTS])
+    monkeypatch.setattr(pdf_engine, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_engine, "FONT_FILES", {
+        "notosans": {"": "NotoSans-Regular.ttf"},
+        "notodevanagari": {"": "Hind-Regular.ttf"},
+        "nototelugu": {"": "NotoSansTelugu-Regular.ttf"},
+    })
+    monkeypatch.setattr(pdf_engine, "SCRIPT_PATTERNS", {
+        family: pdf_engine.SCRIPT_PATTERNS[family] for family in ("notodevanagari", "nototelugu")
+    })
+    monkeypatch.setattr(pdf_engine, "_parsed", {})
+    monkeypatch.setattr(pdf_engine, "_widths", MemoryLRU(pdf_engine.WIDTH_CACHE_ENTRIES))
+
+
+def _page_fonts(page):
+    return [font.get_object() for font in page["/Resources"]["/Font"].values()]
+
+
+@pytest.mark.parametrize("cached", [True, False], ids=["cached-copy", "add_font"])
+def test_indic_text_renders_and_extracts(fixture_fonts, monkeypatch, cached):
+    pypdf = pytest.importorskip("pypdf")
+    monkeypatch.setattr(pdf_engine, "_cached_fonts_enabled", cached)
+    reader = pypdf.PdfReader(io.BytesIO(pdf_engine.create_pdf_bytes(UNICODE_TEXT, "Rent Agreement")))
+
+    text = "".join(page.extract_text() for page in reader.pages)
+    # Shaped clusters are positioned glyph by glyph, so extractors may insert spaces.
+    compact = "".join(text.split())
+    for line in UNICODE_TEXT.split("\n"):
+        assert "".join(line.split()) in compact
+
+    fonts = {str(font["/BaseFont"]) for font in _page_fonts(reader.pages[0])}
+    assert any("Hind" in name for name in fonts)
+    assert any("Telugu" in name for name in fonts)
@@ -0,0 +1,332 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from gtts import gTTS
+from gtts.version import __version__ as GTTS_VERSION
+
+from disk_cache import DiskLRU
+from languages import lang_code_map
+
+logger = logging.getLogger("nyay.tts")
+
+# Voice settings are part of the cache key, so changing them never serves stale audio.
+TTS_SLOW = False
+TTS_MEMORY_CACHE_MB = float(os.environ.get("NYAY_TTS_MEMORY_CACHE_MB", "32"))
+TTS_DISK_CACHE_MB = float(os.environ.get("NYAY_TTS_DISK_CACHE_MB", "256"))
+TTS_MAX_WORKERS = 4
+# "gtts" (Google, needs internet) or "espeak" (local espeak-ng, works air-gapped).
+TTS_BACKEND = os.environ.get("NYAY_TTS_BACKEND", "gtts")
+ESPEAK_BINARY = os.environ.get("NYAY_ESPEAK_BINARY", "espeak-ng")
+ESPEAK_WORDS_PER_MINUTE = 150
+SEGMENT_MAX_CHARS = 200
+
+
+# --- AUDIO CACHE ---
+class TTSCache:
+    """MP3 bytes by (text hash, language, voice settings): in-memory LRU over a disk LRU."""
+
+    def __init__(self, memory_mb=TTS_MEMORY_CACHE_MB, disk=None):
+        self.max_memory_bytes = int(memory_mb * 1024 * 1024)
+        self.disk = disk or DiskLRU("tts", int(TTS_DISK_CACHE_MB * 1024 * 1024))
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text, lang_code, slow=TTS_SLOW, backend="gtts"):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{digest}:{backend}:{lang_code}:slow={int(slow)}"
+
+    def get(self, key):
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+        audio = self.disk.get(key)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, audio)
+        return audio
+
+    def set(self, key, audio):
+        self._remember(key, audio)
+        self.disk.set(key, audio)
+
+    def _remember(self, key, audio):
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSCache()
+        return _cache
+
+
+# --- TEXT PREPARATION ---
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_MARKUP = re.compile(r"[*_`#>|~]+")
+_MD_BULLET = re.compile(r"^\s*[-+]\s+", re.MULTILINE)
+_SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+
+
+def strip_markdown(text):
+    """Removes markdown syntax so it is not read aloud."""
+    text = _MD_LINK.sub(r"\1", text)
+    text = _MD_BULLET.sub("", text)
+    return _MD_MARKUP.sub("", text)
+
+
+def split_segments(text, max_chars=SEGMENT_MAX_CHARS):
+    """Sentence-sized pieces (merged up to max_chars) for parallel synthesis."""
+    segments, current = [], ""
+    for sentence in _SENTENCE_END.split(text):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                segments.append(current)
+                current = ""
+            segments.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        segments.append(current)
+    return segments
+
+
+# --- POOLED HTTP FOR gTTS ---
+# gTTS opens a new requests.Session (new TLS handshake) for every request. We send its
+# prepared requests over one shared keep-alive session instead. This uses gTTS's private
+# _prepare_requests() and its response format, so it only runs on the gTTS versions it
+# was checked against (gtts is pinned in requirements.txt); otherwise, or once the
+# response no longer parses, gTTS's own request handling is used.
+POOLED_GTTS_VERSIONS = ("2.5.",)
+_AUDIO_LINE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+_pooled_enabled = GTTS_VERSION.startswith(POOLED_GTTS_VERSIONS) and hasattr(gTTS, "_prepare_requests")
+if not _pooled_enabled:
+    logger.warning("gTTS %s is not a version pooled TTS requests were checked against; "
+                   "using gTTS's own (slower) request handling", GTTS_VERSION)
+_http = None
+_http_lock = threading.Lock()
+_segment_pool = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts")
+
+
+def get_http_session():
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=TTS_MAX_WORKERS * 2)
+            _http.mount("https://", adapter)
+            _http.mount("http://", adapter)
+        return _http
+
+
+def _pooled_audio(engine):
+    """Runs a gTTS engine's requests over the shared session; returns MP3 bytes."""
+    session = get_http_session()
+    audio = b""
+    for request in engine._prepare_requests():
+        # Session.send() skips the environment (HTTPS_PROXY, NO_PROXY, REQUESTS_CA_BUNDLE)
+        # that Session.request() would apply; merge it in as requests itself does.
+        settings = session.merge_environment_settings(request.url, {}, None, None, None)
+        response = session.send(request, timeout=engine.timeout, **settings)
+        response.raise_for_status()
+        found = False
+        for line in response.iter_lines(chunk_size=1024):
+            match = _AUDIO_LINE.search(line.decode("utf-8"))
+            if match:
+                audio += base64.b64decode(match.group(1).encode("ascii"))
+                found = True
+        if not found:
+            raise RuntimeError("No audio in TTS response")
+    return audio
+
+
+def _engine_audio(text, lang_code):
+    global _pooled_enabled
+    engine = gTTS(text=text, lang=lang_code, slow=TTS_SLOW)
+    if _pooled_enabled and hasattr(engine, "_prepare_requests"):
+        try:
+            return _pooled_audio(engine)
+        except requests.RequestException:
+            logger.warning("Pooled TTS request failed; retrying with gTTS", exc_info=True)
+        except Exception:
+            # Not a network error: gTTS internals or its response format changed.
+            _pooled_enabled = False
+            logger.warning("Pooled TTS no longer works with gTTS %s; using gTTS's own requests from now on",
+                           GTTS_VERSION, exc_info=True)
+    fp = io.BytesIO()
+    engine.write_to_fp(fp)
+    return fp.getvalue()
+
+
+# --- BACKENDS ---
+class GTTSBackend:
+    """Google Translate voices over HTTPS. MP3 segments concatenate as-is."""
+
+    name = "gtts"
+    mime = "audio/mp3"
+
+    def synthesize(self, text, lang_code):
+        return _engine_audio(text, lang_code)
+
+    def join(self, parts):
+        return b"".join(parts)
+
+
+# espeak-ng voice names for the codes in lang_code_map.
+espeak_voice_map = {"en": "en", "hi": "hi", "kn": "kn", "ta": "ta", "te": "te", "mr": "mr"}
+
+
+class EspeakBackend:
+    """Local espeak-ng voice: no network, a few ms of CPU per sentence. Produces WAV."""
+
+    name = "espeak"
+    mime = "audio/wav"
+
+    def __init__(self, binary=ESPEAK_BINARY, words_per_minute=ESPEAK_WORDS_PER_MINUTE):
+        self.binary = shutil.which(binary)
+        if self.binary is None:
+            raise RuntimeError(f"{binary} not found; install espeak-ng or set NYAY_TTS_BACKEND=gtts")
+        self.words_per_minute = words_per_minute // 2 if TTS_SLOW else words_per_minute
+
+    def synthesize(self, text, lang_code):
+        result = subprocess.run(
+            [self.binary, "-v", espeak_voice_map.get(lang_code, "en"),
+             "-s", str(self.words_per_minute), "--stdout", "--stdin"],
+            input=text.encode("utf-8"), capture_output=True, timeout=30, check=True,
+        )
+        return result.stdout
+
+    def join(self, parts):
+        if len(parts) == 1:
+            return parts[0]
+        out = io.BytesIO()
+        with wave.open(out, "wb") as writer:
+            for i, part in enumerate(parts):
+                with wave.open(io.BytesIO(part), "rb") as reader:
+                    if i == 0:
+                        writer.setparams(reader.getparams())
+                    # espeak streams to stdout with a placeholder length; read what is there.
+                    writer.writeframes(reader.readframes(reader.getnframes()))
+        return out.getvalue()
+
+
+TTS_BACKENDS = {"gtts": GTTSBackend, "espeak": EspeakBackend}
+
+_backend = None
+
+
+def get_tts_backend():
+    """The backend selected by NYAY_TTS_BACKEND, created once per process."""
+    global _backend
+    with _cache_lock:
+        if _backend is None:
+            if TTS_BACKEND not in TTS_BACKENDS:
+                raise ValueError(f"Unknown NYAY_TTS_BACKEND {TTS_BACKEND!r}; use one of {sorted(TTS_BACKENDS)}")
+            _backend = TTS_BACKENDS[TTS_BACKEND]()
+        return _backend
+
+
+def audio_format():
+    """MIME type of the audio `synthesize` returns."""
+    return get_tts_backend().mime
+
+
+# --- TEXT TO SPEECH ---
+def synthesize_segment(segment, lang_code, backend):
+    """Audio bytes for one segment, via the cache."""
+    cache = get_tts_cache()
+    key = cache.key(segment, lang_code, backend=backend.name)
+    audio = cache.get(key)
+    if audio is None:
+        audio = backend.synthesize(segment, lang_code)
+        cache.set(key, audio)
+    return audio
+
+
+def synthesize(text, language, on_first_segment=None, on_rest=None):
+    """Converts text to an audio BytesIO (see `audio_format`), re-using cached audio for the same text.
+
+    Markdown is stripped and the text is split into sentence-sized segments that
+    are synthesized in parallel (each cached on its own) and stitched in order.
+    `on_first_segment(BytesIO)` is called from the calling thread as soon as the
+    first segment is ready, so playback can start early; `on_rest(BytesIO)` then
+    gets the audio after that segment. Neither is called for cached or one-segment
+    text. Raises on network/engine errors.
+    """
+    lang_code = lang_code_map.get(language, "en")
+    backend = get_tts_backend()
+    cache = get_tts_cache()
+    key = cache.key(text, lang_code, backend=backend.name)
+    audio = cache.get(key)
+    if audio is not None:
+        return io.BytesIO(audio)
+
+    segments = split_segments(strip_markdown(text))
+    if not segments:
+        raise ValueError("No text to speak")
+    futures = [_segment_pool.submit(synthesize_segment, segment, lang_code, backend) for segment in segments]
+    parts = []
+    for i, future in enumerate(futures):
+        parts.append(future.result())
+        if i == 0 and on_first_segment is not None and len(futures) > 1:
+            on_first_segment(io.BytesIO(parts[0]))
+    audio = backend.join(parts)
+    cache.set(key, audio)
+    if on_first_segment is not None and on_rest is not None and len(parts) > 1:
+        on_rest(io.BytesIO(backend.join(parts[1:])))
+    return io.BytesIO(audio)
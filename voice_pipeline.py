@@ -0,0 +1,77 @@
+import hashlib
+import os
+import threading
+
+from audio_preprocess import speech_samples
+from languages import lang_code_map
+from memory_cache import MemoryLRU
+from rag_pipeline import answer_question
+
+# --- SPEECH RECOGNITION ---
+# "gemini": the clip goes straight to Gemini with a generic prompt (no guides).
+# "whisper": a local faster-whisper model transcribes it on CPU and the text is
+# answered by the normal RAG chat turn, so voice answers are grounded and cacheable.
+ASR_BACKEND = os.environ.get("NYAY_ASR_BACKEND", "gemini")
+WHISPER_MODEL = os.environ.get("NYAY_WHISPER_MODEL", "base")
+WHISPER_COMPUTE_TYPE = "int8"
+TRANSCRIPT_CACHE_ENTRIES = 32
+
+_whisper = None
+_whisper_lock = threading.Lock()
+_transcripts = MemoryLRU(TRANSCRIPT_CACHE_ENTRIES)
+
+
+def get_whisper_model():
+    """Loads the faster-whisper model once per process (needs `pip install faster-whisper`)."""
+    global _whisper
+    with _whisper_lock:
+        if _whisper is None:
+            from faster_whisper import WhisperModel
+            _whisper = WhisperModel(WHISPER_MODEL, device="cpu", compute_type=WHISPER_COMPUTE_TYPE)
+        return _whisper
+
+
+def transcribe_clip(audio_bytes, language, whisper=None):
+    """Transcript of a WAV clip, cached by (clip hash, language)."""
+    key = (hashlib.sha256(audio_bytes).hexdigest(), language)
+    cached = _transcripts.get(key)
+    if cached is not None:
+        return cached
+    samples, _ = speech_samples(audio_bytes)
+    whisper = whisper or get_whisper_model()
+    segments, _ = whisper.transcribe(
+        samples, language=lang_code_map.get(language), beam_size=1, vad_filter=False
+    )
+    transcript = " ".join(segment.text.strip() for segment in segments).strip()
+    _transcripts.set(key, transcript)
+    return transcript
+
+
+# --- VOICE MODE FLOW ---
+def build_voice_prompt(language):
+    return f"Listen to this user audio. You are 'Nyay-Saathi', a helpful Indian legal assistant. Answer the user's question in simple {language}. Keep the answer short, helpful, and friendly."
+
+
+def answer_voice_question(model, audio_bytes, language, mime_type="audio/wav"):
+    """Sends the (preprocessed) clip to Gemini and returns the answer text."""
+    prompt_text = build_voice_prompt(language)
+    response = model.generate_content([prompt_text, {"mime_type": mime_type, "data": audio_bytes}])
+    return response.text
+
+
+def answer_voice_turn(chain, model, audio_bytes, language, messages, document_context, **answer_kwargs):
+    """Transcribes the clip locally and answers it as a normal chat turn.
+
+    Appends the transcript to `messages` (answer_question expects the history to end
+    with the question) and returns (transcript, assistant message dict).
+    """
+    transcript = transcribe_clip(audio_bytes, language)
+    if not transcript:
+        raise ValueError("Could not hear a question in the recording.")
+    messages.append({"role": "user", "content": transcript})
+    try:
+        message = answer_question(chain, model, transcript, language, messages, document_context, **answer_kwargs)
+    except Exception:
+        messages.pop()
+        raise
+    return transcript, message